@@ -0,0 +1,189 @@
+import os
+import sys
+import json
+import glob
+import time
+import queue
+import optparse
+import platform
+import multiprocessing
+
+import gol
+
+# Defaults
+DEFAULT_ENGINES = 'python,active,numpy,bitpacked,tiled,chunked,hashlife,sparse'
+DEFAULT_SIZES = '80x30,256x256,1024x1024,2048x2048,8192x8192'
+DEFAULT_DENSITIES = '0.1,0.5'
+DEFAULT_RULES = 'original,copyworld,23/36'
+DEFAULT_GENERATIONS = 20
+DEFAULT_TIME_LIMIT = 5.0
+
+
+def run_case(case: dict, generations: int, timeLimit: float) -> dict:
+    """Run one benchmark case and return its results
+    """
+    settings = gol.default_settings()
+    settings.update({
+        'engine': case['engine'],
+        'resolution': (case['width'], case['height']),
+        'ruleset': case['rule'],
+        'randomseed': 1,
+        'headless': True
+    })
+    if 'pattern' in case:
+        settings['initmethod'] = 'shape'
+        settings['fillshape'] = 'file'
+        settings['shapefile'] = case['pattern']
+    else:
+        settings['initmethod'] = 'random'
+        settings['randomthreshold'] = case['density']
+
+    game = gol.GameOfLife()
+    timeStart = time.perf_counter()
+    game.init(settings)
+    game.fill_grid()
+    setupTime = time.perf_counter() - timeStart
+
+    # Run until the number of generations or the time limit is reached
+    timeStart = time.perf_counter()
+    while game.generation < generations:
+        game.advance_grid()
+        if time.perf_counter() - timeStart > timeLimit:
+            break
+    elapsed = time.perf_counter() - timeStart
+    game.close()
+
+    result = dict(case)
+    result.update({
+        'generations': game.generation,
+        'setupSeconds': setupTime,
+        'seconds': elapsed,
+        'generationsPerSecond': game.generation / elapsed if elapsed > 0 else None,
+        'cellsPerSecond': game.generation * case['width'] * case['height'] / elapsed if elapsed > 0 else None,
+        'population': game.count_alive(),
+        'peakRss': gol.peak_rss()
+    })
+    return result
+
+
+def case_worker(case: dict, generations: int, timeLimit: float, results: multiprocessing.Queue):
+    """Run one benchmark case in a child process, always report back
+    """
+    result = dict(case)
+    try:
+        result = run_case(case, generations, timeLimit)
+    except SystemExit as e:
+        # Engines exit on unsupported settings
+        result['skipped'] = str(e)
+    except Exception as e:
+        result['skipped'] = 'Error: ' + repr(e)
+    results.put(result)
+
+
+def run_case_isolated(case: dict, generations: int, timeLimit: float) -> dict:
+    """Run one benchmark case in a fresh process, so peak memory
+    usage is measured for that case alone. A child that dies without
+    reporting back (e.g. killed when out of memory) is recorded as skipped.
+    """
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=case_worker, args=(case, generations, timeLimit, results))
+    process.start()
+    result = None
+    while result is None:
+        try:
+            result = results.get(timeout=1.0)
+        except queue.Empty:
+            if not process.is_alive():
+                # The result may still have been sent just before the exit
+                try:
+                    result = results.get(timeout=1.0)
+                except queue.Empty:
+                    result = dict(case)
+                    result['skipped'] = 'Error: The process exited with code ' + str(process.exitcode)
+    process.join()
+    return result
+
+
+def build_cases(options) -> list[dict]:
+    """Build the list of benchmark cases from the options
+    """
+    sizes = [tuple(int(n) for n in size.split('x')) for size in options.sizes.split(',')]
+    cases = []
+    for engine in options.engines.split(','):
+        for rule in options.rules.split(','):
+            for density in [float(d) for d in options.densities.split(',') if d]:
+                for width, height in sizes:
+                    cases.append({'engine': engine, 'rule': rule, 'density': density,
+                                  'width': width, 'height': height})
+        if options.patterns:
+            for pattern in sorted(glob.glob(os.path.join(options.patterns, '*.cells')) +
+                                  glob.glob(os.path.join(options.patterns, '*.rle'))):
+                for width, height in sizes:
+                    cases.append({'engine': engine, 'rule': 'original', 'pattern': pattern,
+                                  'width': width, 'height': height})
+    return cases
+
+
+def setup_options():
+    parser = optparse.OptionParser(usage='%prog [options]',
+                                   description='Benchmark the Game of Life engines and print the results as JSON')
+    parser.add_option('--engines', type='str', dest='engines',
+                      help='Comma separated list of engines', default=DEFAULT_ENGINES)
+    parser.add_option('--sizes', type='str', dest='sizes',
+                      help='Comma separated list of grid sizes', default=DEFAULT_SIZES, metavar='WxH,...')
+    parser.add_option('--densities', type='str', dest='densities',
+                      help='Comma separated list of random fill densities', default=DEFAULT_DENSITIES)
+    parser.add_option('--rules', type='str', dest='rules',
+                      help='Comma separated list of rule sets', default=DEFAULT_RULES)
+    parser.add_option('--patterns', type='str', dest='patterns',
+                      help='Folder with pattern files to benchmark ("" to skip)', default='cells', metavar='FOLDER')
+    parser.add_option('--generations', type='int', dest='generations',
+                      help='Number of generations per case', default=DEFAULT_GENERATIONS)
+    parser.add_option('--time-limit', type='float', dest='timelimit',
+                      help='Maximum number of seconds per case', default=DEFAULT_TIME_LIMIT, metavar='SECONDS')
+    parser.add_option('--output', type='str', dest='output',
+                      help='Write results to a JSON file instead of the console', default='', metavar='FILE')
+    return parser
+
+
+def main():
+    parser = setup_options()
+    options, _ = parser.parse_args()
+
+    results = []
+    # Cases that were too slow at a smaller size are not run at larger sizes
+    tooSlow = set()
+    for case in build_cases(options):
+        key = tuple((k, v) for k, v in case.items() if k not in ('width', 'height'))
+        if key in tooSlow:
+            result = dict(case)
+            result['skipped'] = 'Too slow at a smaller size'
+        else:
+            result = run_case_isolated(case, options.generations, options.timelimit)
+            if 'skipped' not in result and \
+               result['setupSeconds'] + result['seconds'] > options.timelimit and result['generations'] <= 1:
+                tooSlow.add(key)
+        print(json.dumps(result), file=sys.stderr)
+        results.append(result)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'generations': options.generations,
+        'timeLimit': options.timelimit,
+        'results': results
+    }
+    if options.output:
+        with open(options.output, 'w') as outputFile:
+            json.dump(report, outputFile, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print('Cancelled.')
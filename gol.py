@@ -1,18 +1,3578 @@
 import os
+import re
 import sys
+import csv
+import json
+import mmap
+import zlib
+import queue
+import struct
+import tempfile
 import time
 import random
+import itertools
+import collections
 import optparse
 import platform
+import threading
+import contextlib
+import cProfile
+import multiprocessing
+from multiprocessing import shared_memory
 PLATFORM = platform.system().upper()
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
 # Defauls
 DEFAULT_GRID_WIDTH = 80
 DEFAULT_GRID_HEIGHT = 30
 DEFAULT_FPS = 25
+DEFAULT_ENGINE = 'python'
+DEFAULT_HASHLIFE_NODES = 1000000
+DEFAULT_CYCLE_HISTORY = 1000
+DEFAULT_TILE_SIZE = 8
+DEFAULT_TILE_CACHE = 65536
+DEFAULT_CHUNK_SIZE = 1024
+DEFAULT_CHUNK_CACHE = 256
+DEFAULT_STATS_HISTORY = 10000
+
+# Other constants
+HUD_COL_WIDTH = 25
+RATE_WINDOW = 0.5
+PACKED_RUN_PATTERN = re.compile(r'0+|1+')
+# RLE tokens by run of packed row characters, e.g. '000' -> '3b'
+RLE_RUN_TOKENS = {}
+RLE_LINE_PATTERN = re.compile(r'.{0,69}[a-z$!]')
+PLAINTEXT_TABLE = str.maketrans('01', '.O')
+ZOBRIST_MASK = (1 << 64) - 1
+# Larger RLE shape files are streamed into the grid instead of loaded as a Pattern
+STREAM_PATTERN_SIZE = 1 << 24
+
+
+########################################################
+# Rules
+########################################################
+
+class Rule:
+    """Cellular automaton rule, compiled into lookup tables.
+    A neighborhood is a 9 bit number, bit 3 * (dy + 1) + (dx + 1) is the cell at dx, dy:
+        0 1 2
+        3 4 5
+        6 7 8
+    Multi-state (Generations) rules have dying states from 2 up to states - 1.
+    Dying cells do not count as living neighbors, and can not be born or survive.
+    """
+    CENTER_BIT = 1 << 4
+    NEIGHBOR_MASK = 0x1ff ^ CENTER_BIT
+    NEIGHBOR_OFFSETS = [(dx, dy, 3 * (dy + 1) + (dx + 1)) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dx or dy]
+    # One neighborhood of each letter of isotropic non-totalistic (Hensel) rules,
+    # neighborhoods of 5 to 7 neighbors are the inverse of those of 3 to 1 neighbors
+    HENSEL_NEIGHBORHOODS = {
+        1: {'c': 1, 'e': 2},
+        2: {'c': 5, 'e': 10, 'a': 3, 'i': 40, 'k': 33, 'n': 68},
+        3: {'c': 69, 'e': 42, 'a': 11, 'i': 7, 'k': 98, 'n': 13, 'j': 14, 'q': 70, 'r': 41, 'y': 97},
+        4: {'c': 325, 'e': 170, 'a': 15, 'i': 45, 'k': 99, 'n': 71, 'j': 106, 'q': 102, 'r': 43,
+            't': 101, 'w': 105, 'y': 78, 'z': 108}
+    }
+    NAMED_RULES = {
+        'original': 'B3/S23',
+        'copyworld': 'B1357/S1357'
+    }
+    SPEC_PATTERN = re.compile(r'(\d)(-?)([a-z]*)')
+    # All neighborhoods (without the center bit) with 0 to 8 living neighbors
+    NEIGHBORHOODS_BY_COUNT = [frozenset(n for n in range(512) if not n & 0x10 and bin(n).count('1') == count)
+                              for count in range(9)]
+
+    def __init__(self, birth: frozenset, survive: frozenset, states: int=2):
+        # Neighborhoods (without the center bit) that give birth to or keep a cell alive
+        self.birthNeighborhoods = frozenset(birth)
+        self.surviveNeighborhoods = frozenset(survive)
+        self.states = states
+        # Neighbor counts that give birth to or keep a cell alive in some neighborhood
+        self.birth = sorted({bin(n).count('1') for n in self.birthNeighborhoods})
+        self.survive = sorted({bin(n).count('1') for n in self.surviveNeighborhoods})
+        self.totalistic = all(neighborhoods >= Rule.NEIGHBORHOODS_BY_COUNT[count] or
+                              not neighborhoods & Rule.NEIGHBORHOODS_BY_COUNT[count]
+                              for neighborhoods in (self.birthNeighborhoods, self.surviveNeighborhoods)
+                              for count in range(9))
+        # State of a cell that dies, and the next state of all dying states
+        self.deathState = 2 if states > 2 else 0
+        self.decayTable = [0, 0] + [(state + 1) % states for state in range(2, states)]
+        # Neighborhood -> next state, the center bit is the current state (alive or not)
+        self.neighborhoodTable = bytes(
+            (1 if (neighborhood & Rule.NEIGHBOR_MASK) in self.surviveNeighborhoods else self.deathState)
+            if neighborhood & Rule.CENTER_BIT else
+            (1 if neighborhood in self.birthNeighborhoods else 0)
+            for neighborhood in range(512))
+        # State, neighbor count -> next state, only for totalistic rules
+        self.table = None
+        if self.totalistic:
+            self.table = [[1 if count in self.birth else 0 for count in range(9)],
+                          [1 if count in self.survive else self.deathState for count in range(9)]]
+            self.table += [[self.decayTable[state]] * 9 for state in range(2, states)]
+        self.birthWithoutNeighbors = 0 in self.birthNeighborhoods
+        self.blockTable = None
+        self.name = self.describe()
+
+    @staticmethod
+    def transform(neighborhood: int, symmetry: int) -> int:
+        """Rotate and/or reflect a neighborhood, symmetry is one of 0 to 7
+        """
+        result = 0
+        for bit in range(9):
+            if neighborhood >> bit & 1:
+                dx, dy = bit % 3 - 1, bit // 3 - 1
+                if symmetry & 1:
+                    dx = -dx
+                if symmetry & 2:
+                    dy = -dy
+                if symmetry & 4:
+                    dx, dy = dy, dx
+                result |= 1 << (3 * (dy + 1) + (dx + 1))
+        return result
+
+    @staticmethod
+    def hensel_neighborhoods(count: int, letter: str) -> frozenset:
+        """Get all neighborhoods of a Hensel letter, None if the letter does not exist
+        """
+        if 5 <= count <= 7:
+            inverse = Rule.hensel_neighborhoods(8 - count, letter)
+            return None if inverse is None else frozenset(n ^ Rule.NEIGHBOR_MASK for n in inverse)
+        representative = Rule.HENSEL_NEIGHBORHOODS.get(count, {}).get(letter)
+        if representative is None:
+            return None
+        return frozenset(Rule.transform(representative, symmetry) for symmetry in range(8))
+
+    @staticmethod
+    def parse_spec(spec: str, ruleString: str) -> frozenset:
+        """Parse the birth or survival part of a rule, e.g. "23" or "2-a3ij"
+        """
+        if Rule.SPEC_PATTERN.sub('', spec):
+            sys.exit('Error: Could not parse "' + spec + '" in rule "' + ruleString + '"!')
+        neighborhoods = set()
+        for match in Rule.SPEC_PATTERN.finditer(spec):
+            count, negate, letters = int(match.group(1)), match.group(2), match.group(3)
+            if count > 8:
+                sys.exit('Error: There are at most 8 neighbors, in rule "' + ruleString + '"!')
+            if not letters:
+                if negate:
+                    sys.exit('Error: Missing letters after "-" in rule "' + ruleString + '"!')
+                neighborhoods |= Rule.NEIGHBORHOODS_BY_COUNT[count]
+                continue
+            selected = set()
+            for letter in letters:
+                letterNeighborhoods = Rule.hensel_neighborhoods(count, letter)
+                if letterNeighborhoods is None:
+                    sys.exit('Error: Unknown neighborhood "' + str(count) + letter + '" in rule "' + ruleString + '"!')
+                selected |= letterNeighborhoods
+            neighborhoods |= (Rule.NEIGHBORHOODS_BY_COUNT[count] - selected) if negate else selected
+        return frozenset(neighborhoods)
+
+    @staticmethod
+    def parse(ruleString: str) -> 'Rule':
+        """Compile a rule string. Accepted are the names "original" and "copyworld",
+        survival/birth numbers like "23/3", B/S notation like "B3/S23", Hensel
+        letters like "B2-a/S12", and Generations rules like "B2/S/C3" or "/2/3".
+        """
+        ruleSet = ruleString.strip().lower()
+        ruleSet = Rule.NAMED_RULES.get(ruleSet, ruleSet).lower()
+        parts = ruleSet.split('/')
+        birth, survive, states = None, None, '2'
+        if any(part[:1] in ('b', 's', 'c', 'g') for part in parts):
+            for part in parts:
+                if part[:1] == 'b' and birth is None:
+                    birth = part[1:]
+                elif part[:1] == 's' and survive is None:
+                    survive = part[1:]
+                elif part[:1] in ('c', 'g'):
+                    states = part[1:]
+                elif part.isdigit() and birth is not None and survive is not None:
+                    states = part
+                else:
+                    sys.exit('Error: Could not parse rule "' + ruleString + '"! (Format B[birth]/S[survival])')
+        elif len(parts) in (2, 3):
+            survive, birth = parts[0], parts[1]
+            if len(parts) == 3:
+                states = parts[2]
+        if birth is None or survive is None or not states.isdigit() or int(states) < 2:
+            sys.exit('Error: Could not parse rule "' + ruleString +
+                     '"! (Format [survival]/[birth], B[birth]/S[survival] or B[birth]/S[survival]/C[states])')
+        return Rule(Rule.parse_spec(birth, ruleString), Rule.parse_spec(survive, ruleString), int(states))
+
+    @staticmethod
+    def describe_spec(neighborhoods: frozenset) -> str:
+        """Get the shortest Hensel notation of a birth or survival part
+        """
+        spec = ''
+        for count in range(9):
+            included = neighborhoods & Rule.NEIGHBORHOODS_BY_COUNT[count]
+            if not included:
+                continue
+            spec += str(count)
+            if included == Rule.NEIGHBORHOODS_BY_COUNT[count]:
+                continue
+            letters = [letter for letter in Rule.HENSEL_NEIGHBORHOODS[min(count, 8 - count)]
+                       if Rule.hensel_neighborhoods(count, letter) <= included]
+            others = [letter for letter in Rule.HENSEL_NEIGHBORHOODS[min(count, 8 - count)] if letter not in letters]
+            spec += ''.join(letters) if len(letters) <= len(others) else '-' + ''.join(others)
+        return spec
+
+    def describe(self) -> str:
+        """Get the rule in B/S notation
+        """
+        name = 'B' + Rule.describe_spec(self.birthNeighborhoods) + '/S' + Rule.describe_spec(self.surviveNeighborhoods)
+        if self.states > 2:
+            name += '/C' + str(self.states)
+        return name
+
+    def get_block_table(self) -> bytes:
+        """Get the table of 4x4 cells -> next state of the center 2x2 cells.
+        Bit 4 * y + x of the index is the cell at x, y. Bit 2 * (y - 1) + (x - 1)
+        of the value is the next state of the cell at x, y.
+        Only for rules with two states, built when needed.
+        """
+        if self.blockTable is None:
+            # 3 rows of 4 cells -> next state of the 2 cells in the middle
+            stripTable = [self.neighborhoodTable[(strip & 7) | (strip >> 4 & 7) << 3 | (strip >> 8 & 7) << 6] |
+                          self.neighborhoodTable[(strip >> 1 & 7) | (strip >> 5 & 7) << 3 | (strip >> 9 & 7) << 6] << 1
+                          for strip in range(4096)]
+            self.blockTable = bytes(stripTable[block & 0xfff] | stripTable[block >> 4] << 2 for block in range(65536))
+        return self.blockTable
+
+
+
+########################################################
+# Hashing
+########################################################
+
+def zobrist_key(x: int, y: int) -> int:
+    """Get the pseudo-random 64 bit key of a cell, by mixing
+    its coordinates with the SplitMix64 finalizer
+    """
+    key = (((x & 0xffffffff) << 32) | (y & 0xffffffff)) * 0x9e3779b97f4a7c15 & ZOBRIST_MASK
+    key = (key ^ (key >> 30)) * 0xbf58476d1ce4e5b9 & ZOBRIST_MASK
+    key = (key ^ (key >> 27)) * 0x94d049bb133111eb & ZOBRIST_MASK
+    return key ^ (key >> 31)
+
+
+def zobrist_hash(cells) -> int:
+    """Get the Zobrist hash of a set of cells, the XOR of their keys.
+    Toggling a cell toggles its key in the hash, so the hash of a grid
+    can be updated by hashing just the cells that changed.
+    """
+    result = 0
+    for x, y in cells:
+        result ^= zobrist_key(x, y)
+    return result
+
+
+def zobrist_state_hash(cells) -> int:
+    """Get the Zobrist hash of cells given as (x, y, state) for multi-state
+    rules. The key of a cell is multiplied by 2 * state - 1, so living
+    cells have the same keys as in zobrist_hash().
+    """
+    result = 0
+    for x, y, state in cells:
+        result ^= zobrist_key(x, y) * (2 * state - 1) & ZOBRIST_MASK
+    return result
+
+
+########################################################
+# Instrumentation
+########################################################
+
+def current_rss() -> int:
+    """Get the resident set size of this process in bytes,
+    None if it can not be determined on this platform
+    """
+    try:
+        with open('/proc/self/statm', 'rb') as statmFile:
+            return int(statmFile.read().split()[1]) * mmap.PAGESIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss() -> int:
+    """Get the peak resident set size of this process in bytes,
+    None if it can not be determined on this platform
+    """
+    if resource is None:
+        return None
+    maxRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return maxRss if PLATFORM == 'DARWIN' else maxRss * 1024
+
+
+class Profiler:
+    """Collects the time spent in each phase of the main loop, and
+    counters of the cells evaluated and changed per generation.
+    Phases are timed with the monotonic high resolution clock. The rule
+    phase is part of the step phase, and only timed by engines that
+    look up the rules of all cells in a separate pass.
+    """
+    PHASES = ('step', 'rule', 'hash', 'io', 'render', 'clear')
+    HUD_NAMES = {'step': 'Step', 'rule': 'Rule', 'hash': 'Hash', 'io': 'IO', 'render': 'Draw', 'clear': 'Clear'}
+
+    def __init__(self):
+        self.phaseSeconds = {}
+        self.phaseCalls = {}
+        self.lastPhaseSeconds = {}
+        self.generations = 0
+        self.cellsEvaluated = 0
+        self.lastCellsEvaluated = 0
+        self.cellsChanged = 0
+        self.lastCellsChanged = None
+        self.timeStart = 0.0
+        self.rateSamples = collections.deque()
+        self.reset()
+
+    def reset(self):
+        """Forget everything measured so far
+        """
+        self.phaseSeconds = dict.fromkeys(Profiler.PHASES, 0.0)
+        self.phaseCalls = dict.fromkeys(Profiler.PHASES, 0)
+        self.lastPhaseSeconds = dict.fromkeys(Profiler.PHASES, 0.0)
+        self.generations = 0
+        self.cellsEvaluated = 0
+        self.lastCellsEvaluated = 0
+        self.cellsChanged = 0
+        self.lastCellsChanged = None
+        self.timeStart = time.perf_counter()
+        self.rateSamples = collections.deque()
+
+    @contextlib.contextmanager
+    def measure(self, phase: str):
+        """Add the time spent in this context to a phase
+        """
+        timeStart = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - timeStart)
+
+    def add_time(self, phase: str, seconds: float):
+        self.phaseSeconds[phase] += seconds
+        self.phaseCalls[phase] += 1
+        self.lastPhaseSeconds[phase] = seconds
+
+    def record_generations(self, generation: int, count: int, cellsEvaluated: int, cellsChanged: int):
+        """Count the generations computed by one step. cellsChanged is
+        None if the engine does not track changed cells.
+        """
+        now = time.perf_counter()
+        self.generations += count
+        self.cellsEvaluated += cellsEvaluated
+        self.lastCellsEvaluated = cellsEvaluated
+        if cellsChanged is not None:
+            self.cellsChanged += cellsChanged
+        self.lastCellsChanged = cellsChanged
+        # Keep the samples of the last RATE_WINDOW seconds, but at least two
+        self.rateSamples.append((now, generation))
+        while len(self.rateSamples) > 2 and now - self.rateSamples[1][0] >= RATE_WINDOW:
+            self.rateSamples.popleft()
+
+    def get_rate(self) -> float:
+        """Get the generations per second over the last RATE_WINDOW seconds
+        """
+        if len(self.rateSamples) < 2:
+            return 0.0
+        (timeFirst, generationFirst), (timeLast, generationLast) = self.rateSamples[0], self.rateSamples[-1]
+        return (generationLast - generationFirst) / (timeLast - timeFirst) if timeLast > timeFirst else 0.0
+
+    def get_stats(self) -> dict:
+        """Get everything measured so far as a dictionary
+        """
+        elapsed = time.perf_counter() - self.timeStart
+        return {
+            'generations': self.generations,
+            'seconds': elapsed,
+            'generationsPerSecond': self.generations / elapsed if elapsed > 0 else None,
+            'rollingGenerationsPerSecond': self.get_rate(),
+            'phases': {phase: {
+                'seconds': self.phaseSeconds[phase],
+                'calls': self.phaseCalls[phase],
+                'meanSeconds': self.phaseSeconds[phase] / self.phaseCalls[phase] if self.phaseCalls[phase] else None,
+                'lastSeconds': self.lastPhaseSeconds[phase]
+            } for phase in Profiler.PHASES},
+            'cellsEvaluated': self.cellsEvaluated,
+            'cellsEvaluatedPerGeneration': self.cellsEvaluated / self.generations if self.generations else None,
+            'lastCellsEvaluated': self.lastCellsEvaluated,
+            'cellsChanged': self.cellsChanged if self.lastCellsChanged is not None else None,
+            'lastCellsChanged': self.lastCellsChanged,
+            'rss': current_rss(),
+            'peakRss': peak_rss()
+        }
+
+    def get_hud_line(self) -> str:
+        """Get a heads-up display line with the mean phase times and counters
+        """
+        columns = []
+        for phase in Profiler.PHASES:
+            if self.phaseCalls[phase]:
+                columns.append(Profiler.HUD_NAMES[phase] + ': ' +
+                               '{:0.2f}'.format(1000.0 * self.phaseSeconds[phase] / self.phaseCalls[phase]) + ' ms')
+        columns.append('Evaluated: ' + str(self.lastCellsEvaluated))
+        if self.lastCellsChanged is not None:
+            columns.append('Changed: ' + str(self.lastCellsChanged))
+        columns.append('Rate: ' + '{:0.1f}'.format(self.get_rate()) + ' gen/s')
+        rss = current_rss()
+        if rss is not None:
+            columns.append('Memory: ' + '{:0.1f}'.format(rss / 1048576) + ' MB')
+        return ''.join(column.ljust(HUD_COL_WIDTH) for column in columns)
+
+
+class StatsRecorder:
+    """Records one row per step: the population, births, deaths and changed
+    cells, the evaluated cells and the bounding box. The counts come from
+    counters the engines keep during the step. The bounding box is tracked
+    by the steps as well, except by the python and numpy engines, which look
+    at every cell in each step anyway. The last rows are kept in a ring
+    buffer, and all rows can be written to a CSV file as well.
+    """
+    COLUMNS = ('generation', 'population', 'births', 'deaths', 'active', 'evaluated',
+               'left', 'top', 'right', 'bottom')
+
+    def __init__(self, historySize: int=DEFAULT_STATS_HISTORY, filename: str=''):
+        self.history = collections.deque(maxlen=historySize)
+        self.rows = 0
+        self.dataFile = None
+        self.writer = None
+        if filename:
+            self.dataFile = open(filename, 'w', newline='')
+            self.writer = csv.writer(self.dataFile, lineterminator='\n')
+            self.writer.writerow(StatsRecorder.COLUMNS)
+
+    def record(self, generation: int, engine: 'GridEngine'):
+        """Add a row for the generation the engine has just computed. Births,
+        deaths and active cells are totals over all generations of a jump.
+        """
+        births, deaths = engine.births, engine.deaths
+        if births is None:
+            active = None
+        elif engine.rule.states > 2:
+            # Dying cells change without being born or dying
+            active = engine.count_changed()
+        else:
+            active = births + deaths
+        boundingBox = engine.get_bounding_box() or (None, None, None, None)
+        row = (generation, engine.count_alive(), births, deaths, active, engine.cellsEvaluated) + tuple(boundingBox)
+        self.history.append(row)
+        self.rows += 1
+        if self.writer is not None:
+            self.writer.writerow(row)
+
+    def get_history(self) -> list[dict]:
+        """Get the rows in the ring buffer, oldest first
+        """
+        return [dict(zip(StatsRecorder.COLUMNS, row)) for row in self.history]
+
+    def close(self):
+        if self.dataFile is not None:
+            self.dataFile.close()
+            self.dataFile = None
+            self.writer = None
+
+
+########################################################
+# Engines
+########################################################
+
+class GridEngine:
+    """Base class for grid storage and stepping engines.
+    Coordinates passed to a bounded engine are always inside the grid.
+    Unbounded engines simulate an infinite plane and accept any coordinates,
+    their grid size is only the size of the viewport.
+    """
+    unbounded = False
+    # Set if whole rows can be read and written faster than single cells
+    packedRows = False
+
+    def __init__(self, width: int, height: int, wrap: bool, rule: Rule):
+        self.width = width
+        self.height = height
+        self.wrap = wrap
+        self.rule = rule
+        # Number of cells evaluated by the last advance() or advance_by()
+        self.cellsEvaluated = 0
+        # Living cells, kept up to date by the steps, None if unknown
+        self.population = None
+        # Cells born and died in the last advance() or advance_by(), None if unknown
+        self.births = None
+        self.deaths = None
+        self.profiler = None
+
+    def configure(self, settings: dict):
+        """Read engine specific settings
+        """
+        if settings['workers'] > 1:
+            sys.exit('Error: The ' + type(self).__name__ + ' does not support --workers!')
+
+    def measure(self, phase: str):
+        """Time a phase of a generation, if profiling is enabled
+        """
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.measure(phase)
+
+    def close(self):
+        """Release resources held by the engine
+        """
+        pass
+
+    def get_stats(self) -> dict:
+        """Get engine specific counters for the profile
+        """
+        return {}
+
+    def describe_stats(self) -> str:
+        """Describe the most important engine specific counter for the HUD
+        """
+        return ''
+
+    def get_cell(self, x: int, y: int) -> bool:
+        """Get the value of a cell
+        """
+        raise NotImplementedError
+
+    def get_cell_changed(self, x: int, y: int) -> bool:
+        """Look up if the value of a cell has changed
+        """
+        raise NotImplementedError
+
+    def set_cell(self, x: int, y: int, value: bool):
+        """Set value of a cell
+        """
+        raise NotImplementedError
+
+    def set_run(self, x: int, y: int, length: int, value: bool):
+        """Set value of a horizontal run of cells
+        """
+        for runX in range(x, x + length):
+            self.set_cell(runX, y, value)
+
+    def advance(self):
+        """Compute a new generation of the grid
+        """
+        raise NotImplementedError
+
+    def advance_by(self, generations: int):
+        """Compute the given number of generations
+        """
+        cellsEvaluated = births = deaths = 0
+        for _ in range(0, generations):
+            self.advance()
+            cellsEvaluated += self.cellsEvaluated
+            births += self.births
+            deaths += self.deaths
+        self.cellsEvaluated = cellsEvaluated
+        self.births = births
+        self.deaths = deaths
+
+    def record_births_and_deaths(self, births: int, deaths: int):
+        """Keep the population up to date with the births and deaths of a generation
+        """
+        self.births = births
+        self.deaths = deaths
+        if self.population is not None:
+            self.population += births - deaths
+
+    def count_alive(self) -> int:
+        """Count all living cells on the grid. The grid is only scanned
+        when the population is unknown, e.g. after cells were set.
+        """
+        if self.population is None:
+            self.population = self.scan_alive()
+        return self.population
+
+    def scan_alive(self) -> int:
+        """Count all living cells by looking at every cell
+        """
+        alive = 0
+        for y in range(0, self.height):
+            alive += sum(self.get_row(y))
+        return alive
+
+    def count_changed(self) -> int:
+        """Count the cells that changed in the last generation,
+        None if the engine does not keep track of them
+        """
+        return sum(1 for _ in self.get_changed_cells())
+
+    def count_alive_in(self, left: int, top: int, right: int, bottom: int) -> int:
+        """Count living cells inside a rectangle, right and bottom are exclusive
+        """
+        alive = 0
+        for y in range(top, bottom):
+            alive += sum(self.get_row(y, left, right - left))
+        return alive
+
+    def get_bounding_box(self) -> tuple[int, int, int, int]:
+        """Get the rectangle (left, top, right, bottom) around all living cells,
+        right and bottom are exclusive. Returns None if there are no living cells.
+        """
+        left, top, right, bottom = self.width, self.height, 0, 0
+        for y in range(0, self.height):
+            row = self.get_row(y)
+            if True in row:
+                left = min(left, row.index(True))
+                right = max(right, self.width - row[::-1].index(True))
+                top = min(top, y)
+                bottom = y + 1
+        if right == 0:
+            return None
+        return (left, top, right, bottom)
+
+    def get_row(self, y: int, left: int = 0, width: int = None) -> list[bool]:
+        """Get one row of the grid, or a part of it, as a list of booleans
+        """
+        if width is None:
+            width = self.width - left
+        return [self.get_cell(x, y) for x in range(left, left + width)]
+
+    def get_changed_row(self, y: int, left: int = 0, width: int = None) -> list[bool]:
+        """Get the change flags of one row of the grid, or a part of it
+        """
+        if width is None:
+            width = self.width - left
+        return [self.get_cell_changed(x, y) for x in range(left, left + width)]
+
+    def get_packed_row(self, y: int, left: int = 0, width: int = None) -> bytes:
+        """Get one row of the grid, or a part of it, packed into bytes.
+        Bit x of the result (little-endian) is cell left + x.
+        """
+        row = self.get_row(y, left, width)
+        bits = int(''.join('1' if cell else '0' for cell in reversed(row)) or '0', 2)
+        return bits.to_bytes((len(row) + 7) // 8, 'little')
+
+    def set_packed_row(self, y: int, data: bytes, left: int = 0, width: int = None):
+        """Set one row of the grid, or a part of it, from packed bytes
+        """
+        if width is None:
+            width = self.width - left
+        if width <= 0:
+            return
+        bits = format(int.from_bytes(data, 'little') & ((1 << width) - 1), '0' + str(width) + 'b')[::-1]
+        for match in PACKED_RUN_PATTERN.finditer(bits):
+            self.set_run(left + match.start(), y, match.end() - match.start(), match.group(0)[0] == '1')
+
+    def get_state_row(self, y: int, left: int = 0, width: int = None) -> bytes:
+        """Get the states of one row of the grid, or a part of it, one byte per cell.
+        Engines without multi-state rules only have states 0 and 1.
+        """
+        return bytes(self.get_row(y, left, width))
+
+    def set_state_row(self, y: int, data: bytes, left: int = 0, width: int = None):
+        """Set the states of one row of the grid, or a part of it, from one byte per cell
+        """
+        if width is None:
+            width = self.width - left
+        bits = int(''.join('1' if state == 1 else '0' for state in reversed(data[:width])) or '0', 2)
+        self.set_packed_row(y, bits.to_bytes((width + 7) // 8, 'little'), left, width)
+
+    def stamp_rows(self, rows):
+        """Write rows given as (y, left, alive, defined) tuples. Cells where
+        defined has a set bit are set to the value of the bit in alive,
+        bit x is cell left + x. Other cells are unchanged.
+        """
+        for y, left, alive, defined in rows:
+            for byteIndex, value in enumerate(defined.to_bytes((defined.bit_length() + 7) // 8, 'little')):
+                if value:
+                    for bit in BitEngine.BIT_POSITIONS[value]:
+                        x = (byteIndex << 3) + bit
+                        self.set_cell(left + x, y, alive >> x & 1 == 1)
+
+    def get_alive_cells(self):
+        """Iterate over the coordinates of all living cells
+        """
+        for y in range(0, self.height):
+            for x, cell in enumerate(self.get_row(y)):
+                if cell:
+                    yield (x, y)
+
+    def get_changed_cells(self):
+        """Iterate over the coordinates of all cells that changed in the last generation
+        """
+        for y in range(0, self.height):
+            for x, changed in enumerate(self.get_changed_row(y)):
+                if changed:
+                    yield (x, y)
+
+    def get_hash(self) -> int:
+        """Get the Zobrist hash of the grid, including the states
+        of dying cells for multi-state rules
+        """
+        if self.rule.states > 2:
+            return zobrist_state_hash((x, y, state) for y in range(0, self.height)
+                                      for x, state in enumerate(self.get_state_row(y)) if state)
+        return zobrist_hash(self.get_alive_cells())
+
+    def get_changed_hash(self) -> int:
+        """Get the Zobrist hash of the cells that changed in the last generation.
+        XOR it with the hash of the previous generation to get the current hash.
+        """
+        return zobrist_hash(self.get_changed_cells())
+
+
+class ListEngine(GridEngine):
+    """Reference engine, stores the grid as a flat list of cell states
+    and checks every cell in Python
+    """
+    def __init__(self, width: int, height: int, wrap: bool, rule: Rule):
+        super().__init__(width, height, wrap, rule)
+        self.grid = GameOfLife.new_grid(width, height)
+        self.changeGrid = GameOfLife.new_grid(width, height, defaultValue=True)
+
+    def get_cell(self, x: int, y: int) -> bool:
+        return self.grid[self.width * y + x] == 1
+
+    def get_cell_changed(self, x: int, y: int) -> bool:
+        return self.changeGrid[self.width * y + x]
+
+    def set_cell(self, x: int, y: int, value: bool):
+        cellIndex = self.width * y + x
+        if self.grid[cellIndex] != value:
+            self.grid[cellIndex] = value
+            self.changeGrid[cellIndex] = True
+            self.population = None
+        else:
+            self.changeGrid[cellIndex] = False
+
+    def set_run(self, x: int, y: int, length: int, value: bool):
+        start = self.width * y + x
+        self.changeGrid[start:start + length] = [cell != value for cell in self.grid[start:start + length]]
+        self.grid[start:start + length] = [value] * length
+        self.population = None
+
+    def count_alive_neighbors(self, x: int, y: int) -> int:
+        """Count living neighbor cells of given cell
+        """
+        aliveNeighbors = 0
+        for ny in (y - 1, y, y + 1):
+            if self.wrap:
+                ny = ny % self.height
+            elif ny < 0 or ny >= self.height:
+                continue
+            for nx in (x - 1, x, x + 1):
+                if self.wrap:
+                    nx = nx % self.width
+                elif nx < 0 or nx >= self.width:
+                    continue
+                if self.grid[self.width * ny + nx] == 1:
+                    aliveNeighbors += 1
+        # The cell itself was counted, too
+        if self.grid[self.width * y + x] == 1:
+            aliveNeighbors -= 1
+        return aliveNeighbors
+
+    def get_neighborhood(self, x: int, y: int) -> int:
+        """Get the living cells around and including given cell as a 9 bit neighborhood
+        """
+        neighborhood = 0
+        bit = 1
+        for ny in (y - 1, y, y + 1):
+            for nx in (x - 1, x, x + 1):
+                if self.wrap:
+                    if self.grid[self.width * (ny % self.height) + nx % self.width] == 1:
+                        neighborhood |= bit
+                elif 0 <= nx < self.width and 0 <= ny < self.height and self.grid[self.width * ny + nx] == 1:
+                    neighborhood |= bit
+                bit <<= 1
+        return neighborhood
+
+    def next_cell_state(self, x: int, y: int) -> int:
+        """Look up the next state of a cell in the rule tables,
+        1 if it should be alive and 0 if it should be dead
+        """
+        state = self.grid[self.width * y + x]
+        if self.rule.table is not None:
+            return self.rule.table[state][self.count_alive_neighbors(x, y)]
+        if state > 1:
+            return self.rule.decayTable[state]
+        return self.rule.neighborhoodTable[self.get_neighborhood(x, y)]
+
+    def advance(self):
+        tmpGrid = GameOfLife.new_grid(self.width, self.height)
+        changeGrid = GameOfLife.new_grid(self.width, self.height)
+        births = deaths = 0
+        for y in range(0, self.height):
+            for x in range(0, self.width):
+                cellIndex = self.width * y + x
+                tmpGrid[cellIndex] = self.next_cell_state(x, y)
+                if tmpGrid[cellIndex] != self.grid[cellIndex]:
+                    changeGrid[cellIndex] = True
+                    if tmpGrid[cellIndex] == 1:
+                        births += 1
+                    elif self.grid[cellIndex] == 1:
+                        deaths += 1
+        self.grid = tmpGrid
+        self.changeGrid = changeGrid
+        self.cellsEvaluated = self.width * self.height
+        self.record_births_and_deaths(births, deaths)
+
+    def scan_alive(self) -> int:
+        return self.grid.count(True)
+
+    def count_changed(self) -> int:
+        return self.changeGrid.count(True)
+
+    def get_bounding_box(self) -> tuple[int, int, int, int]:
+        left, top, right, bottom = self.width, self.height, 0, 0
+        for y in range(0, self.height):
+            row = self.grid[self.width * y:self.width * (y + 1)]
+            # Dying cells of multi-state rules are not alive
+            if 1 in row:
+                left = min(left, row.index(1))
+                right = max(right, self.width - row[::-1].index(1))
+                top = min(top, y)
+                bottom = y + 1
+        if right == 0:
+            return None
+        return (left, top, right, bottom)
+
+    def get_row(self, y: int, left: int = 0, width: int = None) -> list[bool]:
+        if width is None:
+            width = self.width - left
+        row = self.grid[self.width * y + left:self.width * y + left + width]
+        if self.rule.states > 2:
+            # Dying cells are not alive
+            return [cell == 1 for cell in row]
+        return row
+
+    def get_changed_row(self, y: int, left: int = 0, width: int = None) -> list[bool]:
+        if width is None:
+            width = self.width - left
+        return self.changeGrid[self.width * y + left:self.width * y + left + width]
+
+    def get_state_row(self, y: int, left: int = 0, width: int = None) -> bytes:
+        if width is None:
+            width = self.width - left
+        return bytes(self.grid[self.width * y + left:self.width * y + left + width])
+
+    def set_state_row(self, y: int, data: bytes, left: int = 0, width: int = None):
+        if width is None:
+            width = self.width - left
+        start = self.width * y + left
+        states = list(data[:width])
+        self.changeGrid[start:start + width] = [cell != state for cell, state in zip(self.grid[start:start + width], states)]
+        self.grid[start:start + width] = states
+        self.population = None
+
+
+class ActiveEngine(ListEngine):
+    """List based engine that only re-evaluates cells next to cells
+    that changed in the last generation
+    """
+    def __init__(self, width: int, height: int, wrap: bool, rule: Rule):
+        super().__init__(width, height, wrap, rule)
+        # Indices of cells that changed since the last evaluation
+        self.changedCells = set()
+        # Untouched cells stay dead, unless cells are born without neighbors
+        self.evaluateAll = rule.birthWithoutNeighbors
+        self.initialChanges = True
+        # Living cells per row and per column, kept up to date by the steps so
+        # the bounding box does not need a scan of the grid, None if unknown
+        self.rowCounts = None
+        self.columnCounts = None
+
+    def set_cell(self, x: int, y: int, value: bool):
+        super().set_cell(x, y, value)
+        cellIndex = self.width * y + x
+        if self.changeGrid[cellIndex]:
+            self.changedCells.add(cellIndex)
+            self.rowCounts = self.columnCounts = None
+
+    def set_run(self, x: int, y: int, length: int, value: bool):
+        super().set_run(x, y, length, value)
+        start = self.width * y + x
+        self.changedCells.update(cellIndex for cellIndex in range(start, start + length) if self.changeGrid[cellIndex])
+        self.rowCounts = self.columnCounts = None
+
+    def set_state_row(self, y: int, data: bytes, left: int = 0, width: int = None):
+        if width is None:
+            width = self.width - left
+        super().set_state_row(y, data, left, width)
+        start = self.width * y + left
+        self.changedCells.update(cellIndex for cellIndex in range(start, start + width) if self.changeGrid[cellIndex])
+        self.rowCounts = self.columnCounts = None
+
+    def get_changed_cells(self):
+        width = self.width
+        return ((cellIndex % width, cellIndex // width) for cellIndex in self.changedCells)
+
+    def get_active_cells(self) -> set[int]:
+        """Get indices of all cells that changed, and their neighbors
+        """
+        activeCells = set()
+        for cellIndex in self.changedCells:
+            y, x = divmod(cellIndex, self.width)
+            for ny in (y - 1, y, y + 1):
+                if self.wrap:
+                    ny = ny % self.height
+                elif ny < 0 or ny >= self.height:
+                    continue
+                for nx in (x - 1, x, x + 1):
+                    if self.wrap:
+                        nx = nx % self.width
+                    elif nx < 0 or nx >= self.width:
+                        continue
+                    activeCells.add(self.width * ny + nx)
+        return activeCells
+
+    def advance(self):
+        if self.evaluateAll:
+            super().advance()
+            self.changedCells = {i for i, changed in enumerate(self.changeGrid) if changed}
+            self.evaluateAll = False
+            self.initialChanges = False
+            self.rowCounts = self.columnCounts = None
+            return
+
+        # Evaluate before changing anything
+        newChanges = []
+        activeCells = self.get_active_cells()
+        self.cellsEvaluated = len(activeCells)
+        for cellIndex in activeCells:
+            y, x = divmod(cellIndex, self.width)
+            state = self.next_cell_state(x, y)
+            if state != self.grid[cellIndex]:
+                newChanges.append((cellIndex, state))
+
+        # Only reset the change flags of the last generation
+        if self.initialChanges:
+            self.changeGrid = GameOfLife.new_grid(self.width, self.height)
+            self.initialChanges = False
+        else:
+            for cellIndex in self.changedCells:
+                self.changeGrid[cellIndex] = False
+        births = deaths = 0
+        rowCounts, columnCounts = self.rowCounts, self.columnCounts
+        for cellIndex, state in newChanges:
+            if state == 1:
+                births += 1
+                if rowCounts is not None:
+                    y, x = divmod(cellIndex, self.width)
+                    rowCounts[y] += 1
+                    columnCounts[x] += 1
+            elif self.grid[cellIndex] == 1:
+                deaths += 1
+                if rowCounts is not None:
+                    y, x = divmod(cellIndex, self.width)
+                    rowCounts[y] -= 1
+                    columnCounts[x] -= 1
+            self.grid[cellIndex] = state
+            self.changeGrid[cellIndex] = True
+        self.changedCells = {cellIndex for cellIndex, _ in newChanges}
+        self.record_births_and_deaths(births, deaths)
+
+    def count_changed(self) -> int:
+        if self.initialChanges:
+            return super().count_changed()
+        return len(self.changedCells)
+
+    def get_bounding_box(self) -> tuple[int, int, int, int]:
+        if self.rowCounts is None:
+            self.rowCounts = [0] * self.height
+            self.columnCounts = [0] * self.width
+            for y in range(0, self.height):
+                row = self.grid[self.width * y:self.width * (y + 1)]
+                self.rowCounts[y] = row.count(1)
+                if self.rowCounts[y]:
+                    for x, state in enumerate(row):
+                        if state == 1:
+                            self.columnCounts[x] += 1
+        rows = [y for y, count in enumerate(self.rowCounts) if count]
+        if not rows:
+            return None
+        columns = [x for x, count in enumerate(self.columnCounts) if count]
+        return (columns[0], rows[0], columns[-1] + 1, rows[-1] + 1)
+
+
+class NumpyEngine(GridEngine):
+    """Vectorized engine, stores the grid as a 2D NumPy array and
+    sums up shifted views of the grid to count neighbors
+    """
+    packedRows = True
+
+    def __init__(self, width: int, height: int, wrap: bool, rule: Rule):
+        if np is None:
+            sys.exit('Error: The numpy engine requires NumPy to be installed!')
+        super().__init__(width, height, wrap, rule)
+        self.grid = np.zeros((height, width), dtype=np.uint8)
+        self.changeGrid = np.ones((height, width), dtype=bool)
+        # Lookup tables: state, neighbor count -> next state, or neighborhood -> next state
+        self.table = np.array(rule.table, dtype=np.uint8) if rule.table is not None else None
+        self.neighborhoodTable = np.frombuffer(rule.neighborhoodTable, dtype=np.uint8)
+        self.decayTable = np.array(rule.decayTable, dtype=np.uint8)
+
+    def get_alive(self) -> 'np.ndarray':
+        """Get the grid with 1 for living cells and 0 for all other cells
+        """
+        if self.rule.states > 2:
+            return (self.grid == 1).view(np.uint8)
+        return self.grid
+
+    def get_cell(self, x: int, y: int) -> bool:
+        return self.grid[y, x] == 1
+
+    def get_cell_changed(self, x: int, y: int) -> bool:
+        return bool(self.changeGrid[y, x])
+
+    def set_cell(self, x: int, y: int, value: bool):
+        if self.grid[y, x] != value:
+            self.grid[y, x] = value
+            self.changeGrid[y, x] = True
+            self.population = None
+        else:
+            self.changeGrid[y, x] = False
+
+    def set_run(self, x: int, y: int, length: int, value: bool):
+        self.changeGrid[y, x:x + length] = self.grid[y, x:x + length] != value
+        self.grid[y, x:x + length] = value
+        self.population = None
+
+    def count_alive_neighbors(self, alive: 'np.ndarray') -> 'np.ndarray':
+        """Count living neighbor cells of all cells at once
+        """
+        padded = np.pad(alive, 1, mode='wrap' if self.wrap else 'constant')
+        counts = np.zeros((self.height, self.width), dtype=np.uint8)
+        for dy in (0, 1, 2):
+            for dx in (0, 1, 2):
+                if dx == 1 and dy == 1:
+                    continue
+                counts += padded[dy:dy + self.height, dx:dx + self.width]
+        return counts
+
+    def get_neighborhoods(self, alive: 'np.ndarray') -> 'np.ndarray':
+        """Get the 9 bit neighborhoods of all cells at once
+        """
+        padded = np.pad(alive, 1, mode='wrap' if self.wrap else 'constant').astype(np.uint16)
+        neighborhoods = np.zeros((self.height, self.width), dtype=np.uint16)
+        for dy in (0, 1, 2):
+            for dx in (0, 1, 2):
+                neighborhoods |= padded[dy:dy + self.height, dx:dx + self.width] << (3 * dy + dx)
+        return neighborhoods
+
+    def advance(self):
+        alive = self.get_alive()
+        if self.table is not None:
+            counts = self.count_alive_neighbors(alive)
+            with self.measure('rule'):
+                tmpGrid = self.table[self.grid, counts]
+        else:
+            neighborhoods = self.get_neighborhoods(alive)
+            with self.measure('rule'):
+                tmpGrid = self.neighborhoodTable[neighborhoods]
+                if self.rule.states > 2:
+                    tmpGrid = np.where(self.grid > 1, self.decayTable[self.grid], tmpGrid)
+        self.changeGrid = tmpGrid != self.grid
+        # Only the changed cells can be births or deaths
+        births = int(np.count_nonzero(self.changeGrid & (tmpGrid == 1)))
+        deaths = int(np.count_nonzero(self.changeGrid & (self.grid == 1)))
+        self.grid = tmpGrid
+        self.cellsEvaluated = self.width * self.height
+        self.record_births_and_deaths(births, deaths)
+
+    def scan_alive(self) -> int:
+        return int(np.count_nonzero(self.get_alive()))
+
+    def count_changed(self) -> int:
+        return int(np.count_nonzero(self.changeGrid))
+
+    def get_bounding_box(self) -> tuple[int, int, int, int]:
+        alive = self.get_alive()
+        ys = np.flatnonzero(alive.any(axis=1))
+        if ys.size == 0:
+            return None
+        xs = np.flatnonzero(alive.any(axis=0))
+        return (int(xs[0]), int(ys[0]), int(xs[-1]) + 1, int(ys[-1]) + 1)
+
+    def get_row(self, y: int, left: int = 0, width: int = None) -> list[bool]:
+        if width is None:
+            width = self.width - left
+        return (self.grid[y, left:left + width] == 1).tolist()
+
+    def get_changed_row(self, y: int, left: int = 0, width: int = None) -> list[bool]:
+        if width is None:
+            width = self.width - left
+        return self.changeGrid[y, left:left + width].tolist()
+
+    def get_packed_row(self, y: int, left: int = 0, width: int = None) -> bytes:
+        if width is None:
+            width = self.width - left
+        return np.packbits(self.grid[y, left:left + width] == 1, bitorder='little').tobytes()
+
+    def set_packed_row(self, y: int, data: bytes, left: int = 0, width: int = None):
+        if width is None:
+            width = self.width - left
+        row = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=width, bitorder='little')
+        self.changeGrid[y, left:left + width] = self.grid[y, left:left + width] != row
+        self.grid[y, left:left + width] = row
+        self.population = None
+
+    def get_state_row(self, y: int, left: int = 0, width: int = None) -> bytes:
+        if width is None:
+            width = self.width - left
+        return self.grid[y, left:left + width].tobytes()
+
+    def set_state_row(self, y: int, data: bytes, left: int = 0, width: int = None):
+        if width is None:
+            width = self.width - left
+        row = np.frombuffer(data, dtype=np.uint8, count=width)
+        self.changeGrid[y, left:left + width] = self.grid[y, left:left + width] != row
+        self.grid[y, left:left + width] = row
+        self.population = None
+
+    def stamp_rows(self, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        # Find the defined cells of all rows at once, as full grid rows
+        stride = (self.width + 7) // 8
+        ys = np.array([y for y, _, _, _ in rows], dtype=np.intp)
+        defined = b''.join((defined << left).to_bytes(stride, 'little') for _, left, _, defined in rows)
+        alive = b''.join((alive << left).to_bytes(stride, 'little') for _, left, alive, _ in rows)
+        rowIndices, xs = np.nonzero(np.unpackbits(np.frombuffer(defined, dtype=np.uint8).reshape(len(rows), stride),
+                                                  axis=1, count=self.width, bitorder='little'))
+        alive = np.frombuffer(alive, dtype=np.uint8).reshape(len(rows), stride)
+        values = (alive[rowIndices, xs >> 3] >> (xs & 7).astype(np.uint8)) & 1
+        ys = ys[rowIndices]
+        self.changeGrid[ys, xs] = self.grid[ys, xs] != values
+        self.grid[ys, xs] = values
+        self.population = None
+
+    def get_hash(self) -> int:
+        if self.rule.states > 2:
+            ys, xs = np.nonzero(self.grid)
+            return NumpyEngine.zobrist_hash_arrays(xs, ys, self.grid[ys, xs])
+        ys, xs = np.nonzero(self.get_alive())
+        return NumpyEngine.zobrist_hash_arrays(xs, ys)
+
+    def get_changed_hash(self) -> int:
+        ys, xs = np.nonzero(self.changeGrid)
+        return NumpyEngine.zobrist_hash_arrays(xs, ys)
+
+    @staticmethod
+    def zobrist_hash_arrays(xs: 'np.ndarray', ys: 'np.ndarray', states: 'np.ndarray' = None) -> int:
+        """Vectorized zobrist_hash() of the cells at the given coordinates,
+        or zobrist_state_hash() if their states are given
+        """
+        keys = (xs.astype(np.uint64) << np.uint64(32)) | ys.astype(np.uint64)
+        keys *= np.uint64(0x9e3779b97f4a7c15)
+        keys ^= keys >> np.uint64(30)
+        keys *= np.uint64(0xbf58476d1ce4e5b9)
+        keys ^= keys >> np.uint64(27)
+        keys *= np.uint64(0x94d049bb133111eb)
+        keys ^= keys >> np.uint64(31)
+        if states is not None:
+            keys *= states.astype(np.uint64) * np.uint64(2) - np.uint64(1)
+        return int(np.bitwise_xor.reduce(keys))
+
+
+class BitEngine(GridEngine):
+    """Bit-packed engine, stores one bit per cell and computes whole rows
+    at once with bit-sliced adders over the shifted neighbor rows.
+    With several workers, the grid lives in shared memory and each worker
+    process computes a band of rows.
+    """
+    packedRows = True
+    # Byte translation table that flips all bits
+    INVERT_TABLE = bytes(i ^ 0xff for i in range(256))
+    # Positions of the set bits of every byte value
+    BIT_POSITIONS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+    # Neighborhood bits of the shifted rows in next_row()
+    INPUT_BITS = (1, 7, 0, 2, 3, 5, 6, 8)
+
+    def __init__(self, width: int, height: int, wrap: bool, rule: Rule, allocate: bool = True):
+        if rule.states > 2:
+            sys.exit('Error: The bitpacked engine does not support multi-state rules!')
+        super().__init__(width, height, wrap, rule)
+        # Each row is padded to full bytes, bit x of a row is cell x
+        self.stride = (width + 7) // 8
+        self.mask = (1 << width) - 1
+        if allocate:
+            self.grid = bytearray(self.stride * height)
+            self.changeGrid = bytearray(b'\xff' * (self.stride * height))
+        self.surviveTerms = BitEngine.compile_terms(rule.surviveNeighborhoods)
+        self.birthTerms = BitEngine.compile_terms(rule.birthNeighborhoods)
+        # Totalistic rules only compare neighbor counts
+        self.totalistic = all(count is not None and not exceptions
+                              for count, exceptions in self.surviveTerms + self.birthTerms)
+        # Extent of the living cells as (columns, top, bottom), kept up to date
+        # by the steps, None if unknown. Bit x of columns is set if column x has
+        # living cells, top and bottom are None if there are none.
+        self.extent = None
+        # Worker processes
+        self.pool = None
+        self.sharedMemory = []
+        self.bands = []
+        self.sourceIndex = 0
+        self.nextGrid = None
+
+    @staticmethod
+    def compile_terms(neighborhoods: frozenset) -> list[tuple]:
+        """Split the neighborhoods of a rule into (count, exceptions) terms that match
+        all neighborhoods with count neighbors but the exceptions, and (None, neighborhoods)
+        terms that match single neighborhoods. Totalistic rules only have count terms.
+        """
+        terms = []
+        for count in range(9):
+            allNeighborhoods = Rule.NEIGHBORHOODS_BY_COUNT[count]
+            included = sorted(neighborhoods & allNeighborhoods)
+            if len(included) * 2 > len(allNeighborhoods):
+                terms.append((count, sorted(allNeighborhoods - neighborhoods)))
+            elif included:
+                terms.append((None, included))
+        return terms
+
+    def configure(self, settings: dict):
+        if settings['workers'] > 1:
+            self.start_workers(settings['workers'])
+
+    def start_workers(self, count: int):
+        """Move the grid to shared memory and start worker processes
+        """
+        size = self.stride * self.height
+        self.sharedMemory = [shared_memory.SharedMemory(create=True, size=max(1, size)) for _ in range(3)]
+        buffers = [memory.buf[:size] for memory in self.sharedMemory]
+        buffers[0][:] = self.grid
+        buffers[2][:] = self.changeGrid
+        self.grid, self.nextGrid, self.changeGrid = buffers
+        self.sourceIndex = 0
+        # Split the grid into bands of rows
+        count = max(1, min(count, self.height))
+        self.bands = [(self.height * i // count, self.height * (i + 1) // count) for i in range(count)]
+        self.pool = multiprocessing.Pool(
+            count, initializer=init_band_worker,
+            initargs=([memory.name for memory in self.sharedMemory], self.width, self.height,
+                      self.wrap, self.rule))
+
+    def close(self):
+        if self.pool is None:
+            return
+        self.pool.terminate()
+        self.pool.join()
+        self.pool = None
+        # Keep the cells, but move them back out of shared memory
+        grid, changeGrid = bytearray(self.grid), bytearray(self.changeGrid)
+        for buffer in (self.grid, self.nextGrid, self.changeGrid):
+            buffer.release()
+        self.grid, self.changeGrid, self.nextGrid = grid, changeGrid, None
+        for memory in self.sharedMemory:
+            memory.close()
+            memory.unlink()
+        self.sharedMemory = []
+
+    def get_cell(self, x: int, y: int) -> bool:
+        return (self.grid[self.stride * y + (x >> 3)] >> (x & 7)) & 1 == 1
+
+    def get_cell_changed(self, x: int, y: int) -> bool:
+        return (self.changeGrid[self.stride * y + (x >> 3)] >> (x & 7)) & 1 == 1
+
+    def set_cell(self, x: int, y: int, value: bool):
+        byteIndex = self.stride * y + (x >> 3)
+        bit = 1 << (x & 7)
+        if bool(self.grid[byteIndex] & bit) != value:
+            self.grid[byteIndex] ^= bit
+            self.changeGrid[byteIndex] |= bit
+            self.population = self.extent = None
+        else:
+            self.changeGrid[byteIndex] &= ~bit & 0xff
+
+    def set_run(self, x: int, y: int, length: int, value: bool):
+        end = x + length
+        # Cells in partial bytes at both ends of the run
+        headEnd = min(end, (x + 7) & ~7)
+        for runX in itertools.chain(range(x, headEnd), range(max(headEnd, end & ~7), end)):
+            self.set_cell(runX, y, value)
+        # Whole bytes in between
+        start = self.stride * y + ((x + 7) >> 3)
+        stop = self.stride * y + (end >> 3)
+        if start < stop:
+            oldBytes = bytes(self.grid[start:stop])
+            self.changeGrid[start:stop] = oldBytes.translate(BitEngine.INVERT_TABLE) if value else oldBytes
+            self.grid[start:stop] = (b'\xff' if value else b'\x00') * (stop - start)
+            self.population = self.extent = None
+
+    def get_row_bits(self, y: int) -> int:
+        """Get one row of the grid as an integer, bit x is cell x
+        """
+        return int.from_bytes(self.grid[self.stride * y:self.stride * (y + 1)], 'little')
+
+    def set_row_bits(self, y: int, bits: int):
+        """Set one row of the grid from an integer, bit x is cell x
+        """
+        self.grid[self.stride * y:self.stride * (y + 1)] = (bits & self.mask).to_bytes(self.stride, 'little')
+        self.population = self.extent = None
+
+    def get_packed_row(self, y: int, left: int = 0, width: int = None) -> bytes:
+        if width is None:
+            width = self.width - left
+        if left == 0 and width == self.width:
+            return bytes(self.grid[self.stride * y:self.stride * (y + 1)])
+        return ((self.get_row_bits(y) >> left) & ((1 << width) - 1)).to_bytes((width + 7) // 8, 'little')
+
+    def set_packed_row(self, y: int, data: bytes, left: int = 0, width: int = None):
+        if width is None:
+            width = self.width - left
+        fieldMask = ((1 << width) - 1) << left
+        oldBits = self.get_row_bits(y)
+        newBits = (oldBits & ~fieldMask) | ((int.from_bytes(data, 'little') << left) & fieldMask)
+        rowSlice = slice(self.stride * y, self.stride * (y + 1))
+        changeBits = int.from_bytes(self.changeGrid[rowSlice], 'little')
+        changeBits = (changeBits & ~fieldMask) | ((oldBits ^ newBits) & fieldMask)
+        self.changeGrid[rowSlice] = changeBits.to_bytes(self.stride, 'little')
+        self.set_row_bits(y, newBits)
+
+    def stamp_rows(self, rows):
+        for y, left, alive, defined in rows:
+            rowSlice = slice(self.stride * y, self.stride * (y + 1))
+            defined <<= left
+            oldBits = int.from_bytes(self.grid[rowSlice], 'little')
+            newBits = (oldBits & ~defined) | (alive << left)
+            changeBits = int.from_bytes(self.changeGrid[rowSlice], 'little')
+            changeBits = (changeBits & ~defined) | (oldBits ^ newBits)
+            self.grid[rowSlice] = newBits.to_bytes(self.stride, 'little')
+            self.changeGrid[rowSlice] = changeBits.to_bytes(self.stride, 'little')
+        self.population = self.extent = None
+
+    def get_set_bits(self, buffer):
+        """Iterate over the coordinates of all set bits of a bit-packed buffer
+        """
+        for y in range(0, self.height):
+            row = bytes(buffer[self.stride * y:self.stride * (y + 1)])
+            if not any(row):
+                continue
+            for byteIndex, value in enumerate(row):
+                if value:
+                    for bit in BitEngine.BIT_POSITIONS[value]:
+                        yield ((byteIndex << 3) + bit, y)
+
+    def get_alive_cells(self):
+        return self.get_set_bits(self.grid)
+
+    def get_changed_cells(self):
+        return self.get_set_bits(self.changeGrid)
+
+    def hash_set_bits(self, buffer) -> int:
+        """Get the Zobrist hash of the set bits of a bit-packed buffer,
+        vectorized if NumPy is available
+        """
+        if np is None:
+            return zobrist_hash(self.get_set_bits(buffer))
+        bits = np.unpackbits(np.frombuffer(buffer, dtype=np.uint8, count=self.stride * self.height).reshape(
+            self.height, self.stride), axis=1, count=self.width, bitorder='little')
+        ys, xs = np.nonzero(bits)
+        return NumpyEngine.zobrist_hash_arrays(xs, ys)
+
+    def get_hash(self) -> int:
+        return self.hash_set_bits(self.grid)
+
+    def get_changed_hash(self) -> int:
+        return self.hash_set_bits(self.changeGrid)
+
+    def next_row(self, above: int, current: int, below: int) -> int:
+        """Compute the next state of a row from the row and its two neighbor rows
+        """
+        mask = self.mask
+        shiftWidth = self.width - 1
+        # Neighbors to the left and right of each cell
+        if self.wrap:
+            inputs = [above, below]
+            for row in (above, current, below):
+                inputs.append(((row << 1) & mask) | (row >> shiftWidth))
+                inputs.append((row >> 1) | ((row & 1) << shiftWidth))
+        else:
+            inputs = [above, below,
+                      (above << 1) & mask, above >> 1,
+                      (current << 1) & mask, current >> 1,
+                      (below << 1) & mask, below >> 1]
+        i0, i1, i2, i3, i4, i5, i6, i7 = inputs
+
+        # Add up the eight inputs with a tree of full and half adders
+        # Weight 1
+        xa = i0 ^ i1
+        sa = xa ^ i2
+        ca = (i0 & i1) | (i2 & xa)
+        xb = i3 ^ i4
+        sb = xb ^ i5
+        cb = (i3 & i4) | (i5 & xb)
+        sc = i6 ^ i7
+        cc = i6 & i7
+        xd = sa ^ sb
+        bit0 = xd ^ sc
+        cd = (sa & sb) | (sc & xd)
+        # Weight 2
+        xe = ca ^ cb
+        se = xe ^ cc
+        ce = (ca & cb) | (cc & xe)
+        bit1 = se ^ cd
+        cf = se & cd
+        # Weight 4 and 8
+        bit2 = ce ^ cf
+        bit3 = ce & cf
+        countBits = (bit0, bit1, bit2, bit3)
+
+        def count_equals(n: int) -> int:
+            result = mask
+            for i, bit in enumerate(countBits):
+                result &= bit if (n >> i) & 1 else bit ^ mask
+            return result
+
+        result = 0
+        if self.totalistic:
+            if self.surviveTerms:
+                survive = 0
+                for count, _ in self.surviveTerms:
+                    survive |= count_equals(count)
+                result |= current & survive
+            if self.birthTerms:
+                birth = 0
+                for count, _ in self.birthTerms:
+                    birth |= count_equals(count)
+                result |= (current ^ mask) & birth
+            return result
+
+        def matches(neighborhoods: list[int]) -> int:
+            result = 0
+            for neighborhood in neighborhoods:
+                match = mask
+                for bit, row in zip(BitEngine.INPUT_BITS, inputs):
+                    match &= row if neighborhood >> bit & 1 else row ^ mask
+                result |= match
+            return result
+
+        def evaluate(terms: list[tuple]) -> int:
+            result = 0
+            for count, neighborhoods in terms:
+                if count is None:
+                    result |= matches(neighborhoods)
+                elif neighborhoods:
+                    result |= count_equals(count) & ~matches(neighborhoods)
+                else:
+                    result |= count_equals(count)
+            return result
+
+        if self.surviveTerms:
+            result |= current & evaluate(self.surviveTerms)
+        if self.birthTerms:
+            result |= (current ^ mask) & evaluate(self.birthTerms)
+        return result
+
+    def advance_rows(self, source, target, top: int, bottom: int) -> tuple[int, int, int, int, int]:
+        """Compute the rows from top to bottom (exclusive) of the next generation.
+        Rows are read one ahead, so source and target may be the same buffer
+        when all rows are computed at once. Returns the births, deaths and
+        extent (columns, first row, last row) of the computed rows.
+        """
+        stride = self.stride
+        births = deaths = columns = 0
+        firstY = lastY = None
+
+        def read_row(y: int) -> int:
+            if y < 0 or y >= self.height:
+                if not self.wrap:
+                    return 0
+                y = y % self.height
+            return int.from_bytes(source[stride * y:stride * (y + 1)], 'little')
+
+        above = read_row(top - 1)
+        current = read_row(top)
+        lastBelow = read_row(bottom)
+        for y in range(top, bottom):
+            below = read_row(y + 1) if y + 1 < bottom else lastBelow
+            newRow = self.next_row(above, current, below)
+            changes = newRow ^ current
+            target[stride * y:stride * (y + 1)] = newRow.to_bytes(stride, 'little')
+            self.changeGrid[stride * y:stride * (y + 1)] = changes.to_bytes(stride, 'little')
+            if changes:
+                births += (changes & newRow).bit_count()
+                deaths += (changes & current).bit_count()
+            if newRow:
+                columns |= newRow
+                if firstY is None:
+                    firstY = y
+                lastY = y
+            above, current = current, below
+        return (births, deaths, columns, firstY, lastY)
+
+    def advance(self):
+        self.cellsEvaluated = self.width * self.height
+        if self.pool is None:
+            self.record_bands([self.advance_rows(self.grid, self.grid, 0, self.height)])
+            return
+        # Workers read from one shared buffer and write to the other,
+        # only the band limits are sent to them
+        bands = self.pool.map(advance_band, [(self.sourceIndex, top, bottom) for top, bottom in self.bands])
+        self.sourceIndex = 1 - self.sourceIndex
+        self.grid, self.nextGrid = self.nextGrid, self.grid
+        self.record_bands(bands)
+
+    def record_bands(self, bands: list[tuple[int, int, int, int, int]]):
+        """Combine the births, deaths and extents returned by advance_rows()
+        for bands of rows, from top to bottom
+        """
+        births = deaths = columns = 0
+        top = bottom = None
+        for bandBirths, bandDeaths, bandColumns, firstY, lastY in bands:
+            births += bandBirths
+            deaths += bandDeaths
+            columns |= bandColumns
+            if firstY is not None:
+                if top is None:
+                    top = firstY
+                bottom = lastY + 1
+        self.extent = (columns, top, bottom)
+        self.record_births_and_deaths(births, deaths)
+
+    def scan_alive(self) -> int:
+        alive = 0
+        for y in range(0, self.height):
+            alive += self.get_row_bits(y).bit_count()
+        return alive
+
+    def get_bounding_box(self) -> tuple[int, int, int, int]:
+        if self.extent is None:
+            columns = 0
+            top = bottom = None
+            for y in range(0, self.height):
+                row = self.get_row_bits(y)
+                if row:
+                    columns |= row
+                    if top is None:
+                        top = y
+                    bottom = y + 1
+            self.extent = (columns, top, bottom)
+        columns, top, bottom = self.extent
+        if not columns:
+            return None
+        return ((columns & -columns).bit_length() - 1, top, columns.bit_length(), bottom)
+
+    def count_changed(self) -> int:
+        return int.from_bytes(self.changeGrid, 'little').bit_count()
+
+    def decode_row(self, buffer, y: int, left: int, width: int) -> list[bool]:
+        """Get a part of a row from a bit-packed buffer as a list of booleans
+        """
+        if width is None:
+            width = self.width - left
+        if width <= 0:
+            return []
+        rowBits = int.from_bytes(buffer[self.stride * y:self.stride * (y + 1)], 'little')
+        bits = format((rowBits >> left) & ((1 << width) - 1), '0' + str(width) + 'b')
+        return [c == '1' for c in reversed(bits)]
+
+    def get_row(self, y: int, left: int = 0, width: int = None) -> list[bool]:
+        return self.decode_row(self.grid, y, left, width)
+
+    def get_changed_row(self, y: int, left: int = 0, width: int = None) -> list[bool]:
+        return self.decode_row(self.changeGrid, y, left, width)
+
+
+# State of a band worker process
+bandWorker = {}
+
+
+def init_band_worker(names: list[str], width: int, height: int, wrap: bool, rule: Rule):
+    """Set up a worker process for BitEngine
+    """
+    memories = [shared_memory.SharedMemory(name=name) for name in names]
+    engine = BitEngine(width, height, wrap, rule, allocate=False)
+    size = engine.stride * height
+    buffers = [memory.buf[:size] for memory in memories]
+    engine.changeGrid = buffers[2]
+    bandWorker['memories'] = memories
+    bandWorker['buffers'] = buffers
+    bandWorker['engine'] = engine
+
+
+def advance_band(task: tuple[int, int, int]):
+    """Compute one band of rows in a worker process
+    """
+    sourceIndex, top, bottom = task
+    buffers = bandWorker['buffers']
+    return bandWorker['engine'].advance_rows(buffers[sourceIndex], buffers[1 - sourceIndex], top, bottom)
+
+
+class TileEngine(BitEngine):
+    """Bit-packed engine that splits the grid into square tiles and memoizes
+    the next state of every tile, keyed by the tile and its one cell border,
+    in an LRU cache. Empty tiles with an empty border are skipped.
+    """
+    def __init__(self, width: int, height: int, wrap: bool, rule: Rule):
+        super().__init__(width, height, wrap, rule)
+        self.tileSize = 0
+        self.tileStepper = None
+        self.cache = collections.OrderedDict()
+        self.maxCacheSize = DEFAULT_TILE_CACHE
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.set_tile_size(DEFAULT_TILE_SIZE)
+
+    def configure(self, settings: dict):
+        GridEngine.configure(self, settings)
+        if settings['tilesize'] < 1:
+            sys.exit('Error: The tile size must be at least 1!')
+        self.set_tile_size(settings['tilesize'])
+        self.maxCacheSize = settings['tilecache']
+
+    def set_tile_size(self, tileSize: int):
+        """Change the tile size, this clears the cache
+        """
+        self.tileSize = tileSize
+        # Computes the rows of one tile and its border, the border cells are discarded
+        self.tileStepper = BitEngine(tileSize + 2, tileSize + 2, False, self.rule)
+        self.cache.clear()
+
+    def step_tile(self, key: int) -> int:
+        """Compute the next state of a tile from the tile and its border,
+        both packed row by row into integers
+        """
+        tileSize = self.tileSize
+        borderWidth = tileSize + 2
+        borderMask = (1 << borderWidth) - 1
+        tileMask = (1 << tileSize) - 1
+        rows = [(key >> (borderWidth * i)) & borderMask for i in range(borderWidth)]
+        result = 0
+        for i in range(tileSize):
+            row = self.tileStepper.next_row(rows[i], rows[i + 1], rows[i + 2])
+            result |= ((row >> 1) & tileMask) << (tileSize * i)
+        return result
+
+    def advance(self):
+        tileSize = self.tileSize
+        width, height, stride = self.width, self.height, self.stride
+        borderWidth = tileSize + 2
+        borderMask = (1 << borderWidth) - 1
+        tileMask = (1 << tileSize) - 1
+        cache = self.cache
+        maxCacheSize = self.maxCacheSize
+        skipEmpty = not self.rule.birthWithoutNeighbors
+        tilesPerRow = (width + tileSize - 1) // tileSize
+
+        # Rows with the left border cell in bit 0 and the right one in bit width + 1
+        rows = [int.from_bytes(self.grid[stride * y:stride * (y + 1)], 'little') for y in range(height)]
+        if self.wrap:
+            paddedRows = [(row << 1) | (row >> (width - 1)) | ((row & 1) << (width + 1)) for row in rows]
+        else:
+            paddedRows = [row << 1 for row in rows]
+
+        newRows = [0] * height
+        hits = misses = skipped = 0
+        for top in range(0, height, tileSize):
+            bottom = min(top + tileSize, height)
+            # The rows of a band of tiles and the border rows above and below
+            band = []
+            for y in range(top - 1, top + tileSize + 1):
+                if 0 <= y < height:
+                    band.append(paddedRows[y])
+                elif self.wrap and (y == -1 or y == height):
+                    band.append(paddedRows[y % height])
+                else:
+                    band.append(0)
+            if skipEmpty and not any(band):
+                skipped += tilesPerRow
+                continue
+            missedKeys = []
+            for left in range(0, width, tileSize):
+                key = 0
+                shift = 0
+                for row in band:
+                    key |= ((row >> left) & borderMask) << shift
+                    shift += borderWidth
+                if key == 0 and skipEmpty:
+                    skipped += 1
+                    continue
+                result = cache.get(key)
+                if result is None:
+                    missedKeys.append((left, key))
+                    continue
+                hits += 1
+                cache.move_to_end(key)
+                if result:
+                    for y in range(top, bottom):
+                        newRows[y] |= (result & tileMask) << left
+                        result >>= tileSize
+            if not missedKeys:
+                continue
+            # Compute the whole band at once, that is cheaper than the missed tiles one by one
+            misses += len(missedKeys)
+            for y in range(top, bottom):
+                above = rows[y - 1] if y > 0 else (rows[height - 1] if self.wrap else 0)
+                below = rows[y + 1] if y + 1 < height else (rows[0] if self.wrap else 0)
+                newRows[y] = self.next_row(above, rows[y], below)
+            for left, key in missedKeys:
+                if bottom - top < tileSize or left + tileSize > width:
+                    # Tiles at the edges reach beyond the grid, but are cached as whole tiles
+                    result = self.step_tile(key)
+                else:
+                    result = 0
+                    for y in range(bottom - 1, top - 1, -1):
+                        result = (result << tileSize) | ((newRows[y] >> left) & tileMask)
+                cache[key] = result
+                if len(cache) > maxCacheSize:
+                    cache.popitem(last=False)
+
+        births = deaths = columns = 0
+        firstY = lastY = None
+        for y in range(height):
+            # Tiles at the right edge may reach beyond the grid
+            newRow = newRows[y] & self.mask
+            changes = newRow ^ rows[y]
+            self.grid[stride * y:stride * (y + 1)] = newRow.to_bytes(stride, 'little')
+            self.changeGrid[stride * y:stride * (y + 1)] = changes.to_bytes(stride, 'little')
+            if changes:
+                births += (changes & newRow).bit_count()
+                deaths += (changes & rows[y]).bit_count()
+            if newRow:
+                columns |= newRow
+                if firstY is None:
+                    firstY = y
+                lastY = y
+        self.record_bands([(births, deaths, columns, firstY, lastY)])
+        self.hits += hits
+        self.misses += misses
+        self.skipped += skipped
+        # Cells of the tiles that were not in the cache
+        self.cellsEvaluated = misses * tileSize * tileSize
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'tileSize': self.tileSize,
+            'tileCacheSize': len(self.cache),
+            'tileCacheHits': self.hits,
+            'tileCacheMisses': self.misses,
+            'tileCacheHitRate': self.hits / lookups if lookups else None,
+            'tilesSkipped': self.skipped
+        }
+
+    def describe_stats(self) -> str:
+        lookups = self.hits + self.misses
+        return 'Tile hits: ' + ('{:0.1f}'.format(100.0 * self.hits / lookups) + '%' if lookups else '-')
+
+
+class ChunkedEngine(GridEngine):
+    """Out-of-core engine for grids bigger than the memory. The grid is split
+    into square chunks, stored bit-packed in a memory-mapped temporary file
+    together with the next generation and the change flags. Edits go through
+    an LRU cache of chunks, dirty chunks are written back when they are evicted.
+    Generations are computed chunk by chunk from the chunk and the border cells
+    of its neighbors, chunks without living neighbors are skipped. Mapped pages
+    are released regularly, so the resident memory does not grow with the grid.
+    """
+    packedRows = True
+    # Mapped pages are released after this many bytes have been accessed
+    RELEASE_SIZE = 1 << 24
+
+    def __init__(self, width: int, height: int, wrap: bool, rule: Rule):
+        if rule.states > 2:
+            sys.exit('Error: The chunked engine does not support multi-state rules!')
+        super().__init__(width, height, wrap, rule)
+        self.dataFile = None
+        self.data = None
+        # Bit-packed chunks of the current generation, by chunk index
+        self.cache = collections.OrderedDict()
+        self.dirty = set()
+        self.maxCacheSize = DEFAULT_CHUNK_CACHE
+        # Steppers for the chunk widths, they compute the rows of a chunk and its border
+        self.steppers = {}
+        self.computed = 0
+        self.skipped = 0
+        self.writtenBack = 0
+        self.allocate(DEFAULT_CHUNK_SIZE)
+
+    def configure(self, settings: dict):
+        GridEngine.configure(self, settings)
+        if settings['chunksize'] < 8 or settings['chunksize'] % 8:
+            sys.exit('Error: The chunk size must be a multiple of 8!')
+        if settings['chunkcache'] < 1:
+            sys.exit('Error: The chunk cache must hold at least 1 chunk!')
+        self.maxCacheSize = settings['chunkcache']
+        self.allocate(settings['chunksize'], settings['chunkdir'] or None)
+
+    def allocate(self, chunkSize: int, directory: str = None):
+        """Create the chunk file, in the system's temporary folder if no
+        directory is given. This clears the grid.
+        """
+        self.close()
+        self.chunkSize = chunkSize
+        self.chunkStride = chunkSize // 8
+        self.chunkBytes = self.chunkStride * chunkSize
+        self.chunksX = (self.width + chunkSize - 1) // chunkSize
+        self.chunksY = (self.height + chunkSize - 1) // chunkSize
+        self.numChunks = self.chunksX * self.chunksY
+        # Two generations and the change flags, the file is sparse until chunks are written
+        self.fileSize = max(1, 3 * self.numChunks * self.chunkBytes)
+        self.dataFile = tempfile.TemporaryFile(dir=directory)
+        self.dataFile.truncate(self.fileSize)
+        self.data = mmap.mmap(self.dataFile.fileno(), self.fileSize)
+        self.accessedBytes = 0
+        # Index of the region with the current generation, the other one receives the next
+        self.current = 0
+        # Chunks that may have living cells or changes, all others are zero
+        self.occupied = [bytearray(self.numChunks), bytearray(self.numChunks)]
+        self.changedChunks = bytearray(self.numChunks)
+        self.changedCount = 0
+        self.population = 0
+        self.boundingBox = None
+        self.boundingBoxKnown = True
+
+    def close(self):
+        if self.data is not None:
+            # The population stays available for the profile
+            self.count_alive()
+            self.data.close()
+            self.dataFile.close()
+            self.data = self.dataFile = None
+        self.cache.clear()
+        self.dirty.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            'chunkSize': self.chunkSize,
+            'chunks': self.numChunks,
+            'chunksOccupied': self.occupied[self.current].count(1),
+            'chunkCacheSize': len(self.cache),
+            'chunksComputed': self.computed,
+            'chunksSkipped': self.skipped,
+            'chunksWrittenBack': self.writtenBack,
+            'chunkFileSize': self.fileSize
+        }
+
+    def describe_stats(self) -> str:
+        return 'Chunks: ' + str(self.occupied[self.current].count(1)) + ' / ' + str(self.numChunks)
+
+    def chunk_offset(self, region: int, index: int) -> int:
+        """Get the position of a chunk in the file. Regions 0 and 1
+        hold the generations, region 2 the change flags.
+        """
+        return (region * self.numChunks + index) * self.chunkBytes
+
+    def touch(self, size: int):
+        """Count bytes accessed through the mapping, and release
+        the mapped pages when enough have been accessed
+        """
+        self.accessedBytes += size
+        if self.accessedBytes >= ChunkedEngine.RELEASE_SIZE:
+            self.accessedBytes = 0
+            # Written pages stay in the page cache and reach the file, but leave the resident memory
+            if hasattr(mmap, 'MADV_DONTNEED'):
+                self.data.madvise(mmap.MADV_DONTNEED)
+
+    def read_chunk(self, index: int):
+        """Get the bit-packed cells of a chunk of the current generation
+        without caching it, None if the chunk is empty
+        """
+        chunk = self.cache.get(index)
+        if chunk is not None:
+            return chunk
+        if not self.occupied[self.current][index]:
+            return None
+        offset = self.chunk_offset(self.current, index)
+        self.touch(self.chunkBytes)
+        return self.data[offset:offset + self.chunkBytes]
+
+    def read_changes(self, index: int):
+        """Get the bit-packed change flags of a chunk, None if none are set
+        """
+        if not self.changedChunks[index]:
+            return None
+        offset = self.chunk_offset(2, index)
+        self.touch(self.chunkBytes)
+        return self.data[offset:offset + self.chunkBytes]
+
+    def get_chunk(self, index: int) -> bytearray:
+        """Get a chunk of the current generation for editing. The least
+        recently used chunk is evicted, and written back if it is dirty.
+        """
+        chunk = self.cache.get(index)
+        if chunk is not None:
+            self.cache.move_to_end(index)
+            return chunk
+        source = self.read_chunk(index)
+        chunk = bytearray(source) if source is not None else bytearray(self.chunkBytes)
+        self.cache[index] = chunk
+        if len(self.cache) > self.maxCacheSize:
+            evictedIndex, evicted = self.cache.popitem(last=False)
+            if evictedIndex in self.dirty:
+                self.write_back(evictedIndex, evicted)
+        return chunk
+
+    def write_back(self, index: int, chunk: bytearray):
+        """Write a dirty chunk of the current generation to the file
+        """
+        self.dirty.discard(index)
+        offset = self.chunk_offset(self.current, index)
+        self.data[offset:offset + self.chunkBytes] = chunk
+        self.touch(self.chunkBytes)
+        self.writtenBack += 1
+
+    def write_chunk(self, region: int, index: int, rows: list[int], flags: bytearray):
+        """Write the rows of a chunk to a region, and update the flag of the chunk
+        """
+        if any(rows):
+            stride = self.chunkStride
+            data = b''.join(row.to_bytes(stride, 'little') for row in rows)
+            offset = self.chunk_offset(region, index)
+            self.data[offset:offset + len(data)] = data
+            if len(data) < self.chunkBytes:
+                # Rows below a chunk at the bottom edge
+                self.data[offset + len(data):offset + self.chunkBytes] = bytes(self.chunkBytes - len(data))
+            self.touch(self.chunkBytes)
+            flags[index] = 1
+        elif flags[index]:
+            self.clear_chunk(region, index, flags)
+
+    def clear_chunk(self, region: int, index: int, flags: bytearray):
+        """Fill a chunk of a region with zeros
+        """
+        offset = self.chunk_offset(region, index)
+        self.data[offset:offset + self.chunkBytes] = bytes(self.chunkBytes)
+        self.touch(self.chunkBytes)
+        flags[index] = 0
+
+    def write_row(self, y: int, left: int, alive: int, defined: int):
+        """Set the cells of a row where defined has a set bit to the value
+        of the bit in alive, bit x is cell left + x. The changed cells are flagged.
+        """
+        if not defined:
+            return
+        size, stride = self.chunkSize, self.chunkStride
+        chunkY, row = divmod(y, size)
+        rowOffset = row * stride
+        # Split the row at the chunk borders, as bytes
+        firstX = left // size
+        shift = left - firstX * size
+        chunkCount = (shift + defined.bit_length() + size - 1) // size
+        definedBytes = (defined << shift).to_bytes(chunkCount * stride, 'little')
+        aliveBytes = ((alive & defined) << shift).to_bytes(chunkCount * stride, 'little')
+        for i in range(chunkCount):
+            chunkDefined = int.from_bytes(definedBytes[stride * i:stride * (i + 1)], 'little')
+            if not chunkDefined:
+                continue
+            chunkAlive = int.from_bytes(aliveBytes[stride * i:stride * (i + 1)], 'little')
+            index = self.chunksX * chunkY + firstX + i
+            chunk = self.get_chunk(index)
+            oldBits = int.from_bytes(chunk[rowOffset:rowOffset + stride], 'little')
+            newBits = (oldBits & ~chunkDefined) | chunkAlive
+            if newBits != oldBits:
+                chunk[rowOffset:rowOffset + stride] = newBits.to_bytes(stride, 'little')
+                self.dirty.add(index)
+                if newBits:
+                    self.occupied[self.current][index] = 1
+                self.population = None
+                self.boundingBoxKnown = False
+            # Change flags go straight to the file
+            if newBits != oldBits or self.changedChunks[index]:
+                offset = self.chunk_offset(2, index) + rowOffset
+                oldChanges = int.from_bytes(self.data[offset:offset + stride], 'little')
+                newChanges = (oldChanges & ~chunkDefined) | (oldBits ^ newBits)
+                if newChanges != oldChanges:
+                    self.data[offset:offset + stride] = newChanges.to_bytes(stride, 'little')
+                    if newChanges:
+                        self.changedChunks[index] = 1
+                self.touch(stride)
+        self.changedCount = None
+
+    def read_row(self, region: int, y: int, left: int, width: int) -> int:
+        """Get a part of a row of the current generation, or of the change
+        flags if region is 2, as an integer, bit x is cell left + x
+        """
+        if width <= 0:
+            return 0
+        size, stride = self.chunkSize, self.chunkStride
+        chunkY, row = divmod(y, size)
+        rowOffset = row * stride
+        flags = self.changedChunks if region == 2 else self.occupied[self.current]
+        firstX = left // size
+        lastX = (left + width - 1) // size
+        data = bytearray()
+        for index in range(self.chunksX * chunkY + firstX, self.chunksX * chunkY + lastX + 1):
+            chunk = self.cache.get(index) if region != 2 else None
+            if chunk is not None:
+                data += chunk[rowOffset:rowOffset + stride]
+            elif flags[index]:
+                offset = self.chunk_offset(region, index) + rowOffset
+                data += self.data[offset:offset + stride]
+                self.touch(stride)
+            else:
+                data += bytes(stride)
+        return (int.from_bytes(data, 'little') >> (left - firstX * size)) & ((1 << width) - 1)
+
+    @staticmethod
+    def decode_bits(bits: int, width: int) -> list[bool]:
+        """Get the lowest bits of an integer as a list of booleans
+        """
+        if width <= 0:
+            return []
+        return [c == '1' for c in reversed(format(bits, '0' + str(width) + 'b'))]
+
+    def get_cell(self, x: int, y: int) -> bool:
+        return self.read_row(self.current, y, x, 1) == 1
+
+    def get_cell_changed(self, x: int, y: int) -> bool:
+        return self.read_row(2, y, x, 1) == 1
+
+    def set_cell(self, x: int, y: int, value: bool):
+        self.write_row(y, x, 1 if value else 0, 1)
+
+    def set_run(self, x: int, y: int, length: int, value: bool):
+        runMask = (1 << length) - 1
+        self.write_row(y, x, runMask if value else 0, runMask)
+
+    def get_row(self, y: int, left: int = 0, width: int = None) -> list[bool]:
+        if width is None:
+            width = self.width - left
+        return ChunkedEngine.decode_bits(self.read_row(self.current, y, left, width), width)
+
+    def get_changed_row(self, y: int, left: int = 0, width: int = None) -> list[bool]:
+        if width is None:
+            width = self.width - left
+        return ChunkedEngine.decode_bits(self.read_row(2, y, left, width), width)
+
+    def get_packed_row(self, y: int, left: int = 0, width: int = None) -> bytes:
+        if width is None:
+            width = self.width - left
+        return self.read_row(self.current, y, left, width).to_bytes((width + 7) // 8, 'little')
+
+    def set_packed_row(self, y: int, data: bytes, left: int = 0, width: int = None):
+        if width is None:
+            width = self.width - left
+        fieldMask = (1 << width) - 1
+        self.write_row(y, left, int.from_bytes(data, 'little') & fieldMask, fieldMask)
+
+    def stamp_rows(self, rows):
+        for y, left, alive, defined in rows:
+            self.write_row(y, left, alive, defined)
+
+    def get_chunk_rows(self, chunk, index: int) -> list[tuple[int, int]]:
+        """Get the non-empty rows of a chunk as (y, bits) tuples,
+        bit x is the cell x to the right of the left edge of the chunk
+        """
+        size, stride = self.chunkSize, self.chunkStride
+        top = size * (index // self.chunksX)
+        rows = []
+        for row in range(min(size, self.height - top)):
+            bits = int.from_bytes(chunk[stride * row:stride * (row + 1)], 'little')
+            if bits:
+                rows.append((top + row, bits))
+        return rows
+
+    def get_set_cells(self, flags: bytearray, buffers):
+        """Iterate over the coordinates of the set bits of the flagged chunks
+        """
+        for index in itertools.compress(range(self.numChunks), flags):
+            chunk = buffers(index)
+            if chunk is None:
+                continue
+            left = self.chunkSize * (index % self.chunksX)
+            for y, bits in self.get_chunk_rows(chunk, index):
+                for byteIndex, value in enumerate(bits.to_bytes((bits.bit_length() + 7) // 8, 'little')):
+                    if value:
+                        for bit in BitEngine.BIT_POSITIONS[value]:
+                            yield (left + (byteIndex << 3) + bit, y)
+
+    def get_alive_cells(self):
+        return self.get_set_cells(self.occupied[self.current], self.read_chunk)
+
+    def get_changed_cells(self):
+        return self.get_set_cells(self.changedChunks, self.read_changes)
+
+    def scan_alive(self) -> int:
+        alive = 0
+        for index in itertools.compress(range(self.numChunks), self.occupied[self.current]):
+            chunk = self.read_chunk(index)
+            if chunk is not None:
+                alive += int.from_bytes(chunk, 'little').bit_count()
+        return alive
+
+    def count_changed(self) -> int:
+        if self.changedCount is None:
+            self.changedCount = 0
+            for index in itertools.compress(range(self.numChunks), self.changedChunks):
+                self.changedCount += int.from_bytes(self.read_changes(index), 'little').bit_count()
+        return self.changedCount
+
+    def get_bounding_box(self) -> tuple[int, int, int, int]:
+        if not self.boundingBoxKnown:
+            extent = None
+            for index in itertools.compress(range(self.numChunks), self.occupied[self.current]):
+                chunk = self.read_chunk(index)
+                if chunk is not None:
+                    extent = ChunkedEngine.extend(extent, self.chunkSize * (index % self.chunksX),
+                                                  self.get_chunk_rows(chunk, index))
+            self.boundingBox = extent
+            self.boundingBoxKnown = True
+        return self.boundingBox
+
+    @staticmethod
+    def extend(boundingBox: tuple[int, int, int, int], left: int,
+               rows: list[tuple[int, int]]) -> tuple[int, int, int, int]:
+        """Extend a bounding box, or None, to include the set bits of (y, bits) rows,
+        bit x of a row is cell left + x
+        """
+        if not rows:
+            return boundingBox
+        columns = 0
+        for _, bits in rows:
+            columns |= bits
+        left, right = left + (columns & -columns).bit_length() - 1, left + columns.bit_length()
+        top, bottom = rows[0][0], rows[-1][0] + 1
+        if boundingBox is None:
+            return (left, top, right, bottom)
+        return (min(left, boundingBox[0]), min(top, boundingBox[1]),
+                max(right, boundingBox[2]), max(bottom, boundingBox[3]))
+
+    def get_active_chunks(self) -> set[int]:
+        """Get the indices of the chunks that may change: the chunks
+        with living cells and their neighbors
+        """
+        chunksX, chunksY = self.chunksX, self.chunksY
+        activeChunks = set()
+        for index in itertools.compress(range(self.numChunks), self.occupied[self.current]):
+            chunkY, chunkX = divmod(index, chunksX)
+            for ny in (chunkY - 1, chunkY, chunkY + 1):
+                if self.wrap:
+                    ny = ny % chunksY
+                elif ny < 0 or ny >= chunksY:
+                    continue
+                for nx in (chunkX - 1, chunkX, chunkX + 1):
+                    if self.wrap:
+                        nx = nx % chunksX
+                    elif nx < 0 or nx >= chunksX:
+                        continue
+                    activeChunks.add(chunksX * ny + nx)
+        return activeChunks
+
+    def advance(self):
+        size, stride = self.chunkSize, self.chunkStride
+        width, height = self.width, self.height
+        chunksX = self.chunksX
+        target = 1 - self.current
+        targetOccupied = self.occupied[target]
+        if self.rule.birthWithoutNeighbors:
+            activeChunks = None
+            indices = range(self.numChunks)
+        else:
+            activeChunks = self.get_active_chunks()
+            indices = sorted(activeChunks)
+
+        births = deaths = cellsEvaluated = 0
+        boundingBox = None
+        for index in indices:
+            chunkY, chunkX = divmod(index, chunksX)
+            x0, y0 = size * chunkX, size * chunkY
+            chunkWidth = min(size, width - x0)
+            chunkHeight = min(size, height - y0)
+            rowMask = (1 << chunkWidth) - 1
+            # Chunks holding the cells left and right of the chunk, the cells on the
+            # right are always bit 0 of their chunk
+            if x0 > 0:
+                leftX, leftBit = chunkX - 1, size - 1
+            elif self.wrap:
+                leftX, leftBit = chunksX - 1, width - 1 - size * (chunksX - 1)
+            else:
+                leftX = leftBit = None
+            if x0 + chunkWidth < width:
+                rightX = chunkX + 1
+            elif self.wrap:
+                rightX = 0
+            else:
+                rightX = None
+            chunks = {}
+
+            def read_neighbor(chunkIndex: int):
+                if chunkIndex not in chunks:
+                    chunks[chunkIndex] = self.read_chunk(chunkIndex)
+                return chunks[chunkIndex]
+
+            def get_padded_rows(y: int, count: int) -> list[int]:
+                # Rows of one chunk row, with the left border cell in bit 0 and the right one in bit chunkWidth + 1
+                if y < 0 or y >= height:
+                    if not self.wrap:
+                        return [0] * count
+                    y = y % height
+                rowY, row = divmod(y, size)
+                start, end = stride * row, stride * (row + count)
+                chunk = read_neighbor(chunksX * rowY + chunkX)
+                if chunk is None:
+                    rows = [0] * count
+                else:
+                    rows = [int.from_bytes(chunk[offset:offset + stride], 'little') << 1
+                            for offset in range(start, end, stride)]
+                # The border cells are read as one column of bytes from the neighbor chunks
+                if leftX is not None:
+                    chunk = read_neighbor(chunksX * rowY + leftX)
+                    if chunk is not None:
+                        shift = leftBit & 7
+                        rows = [padded | (value >> shift & 1)
+                                for padded, value in zip(rows, chunk[start + (leftBit >> 3):end:stride])]
+                if rightX is not None:
+                    chunk = read_neighbor(chunksX * rowY + rightX)
+                    if chunk is not None:
+                        rows = [padded | (value & 1) << (chunkWidth + 1)
+                                for padded, value in zip(rows, chunk[start:end:stride])]
+                return rows
+
+            paddedRows = get_padded_rows(y0 - 1, 1) + get_padded_rows(y0, chunkHeight) + \
+                get_padded_rows(y0 + chunkHeight, 1)
+
+            stepper = self.steppers.get(chunkWidth)
+            if stepper is None:
+                stepper = BitEngine(chunkWidth + 2, 1, False, self.rule, allocate=False)
+                self.steppers[chunkWidth] = stepper
+            newRows = []
+            changeRows = []
+            for i in range(chunkHeight):
+                current = (paddedRows[i + 1] >> 1) & rowMask
+                newRow = (stepper.next_row(paddedRows[i], paddedRows[i + 1], paddedRows[i + 2]) >> 1) & rowMask
+                changes = newRow ^ current
+                if changes:
+                    births += (changes & newRow).bit_count()
+                    deaths += (changes & current).bit_count()
+                newRows.append(newRow)
+                changeRows.append(changes)
+            self.write_chunk(target, index, newRows, targetOccupied)
+            self.write_chunk(2, index, changeRows, self.changedChunks)
+            boundingBox = ChunkedEngine.extend(boundingBox, x0, [(y0 + i, row) for i, row in enumerate(newRows) if row])
+            cellsEvaluated += chunkWidth * chunkHeight
+
+        if activeChunks is not None:
+            # Chunks that were skipped stay empty and unchanged
+            for index in itertools.compress(range(self.numChunks), targetOccupied):
+                if index not in activeChunks:
+                    self.clear_chunk(target, index, targetOccupied)
+            for index in itertools.compress(range(self.numChunks), self.changedChunks):
+                if index not in activeChunks:
+                    self.clear_chunk(2, index, self.changedChunks)
+        # The cached chunks belong to the previous generation now
+        self.cache.clear()
+        self.dirty.clear()
+        self.current = target
+        self.computed += len(indices)
+        self.skipped += self.numChunks - len(indices)
+        self.cellsEvaluated = cellsEvaluated
+        self.boundingBox = boundingBox
+        self.boundingBoxKnown = True
+        self.changedCount = births + deaths
+        self.record_births_and_deaths(births, deaths)
+
+
+class HashLifeNode:
+    """Canonical quadtree node, level 0 nodes are single cells
+    """
+    __slots__ = ('level', 'nw', 'ne', 'sw', 'se', 'population')
+
+    def __init__(self, level: int, nw, ne, sw, se, population: int):
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.population = population
+
+
+class HashLifeEngine(GridEngine):
+    """HashLife engine, stores the universe as a quadtree of canonical nodes
+    and memoizes their future states, so repetitive patterns can be advanced
+    exponentially far
+    """
+    unbounded = True
+
+    def __init__(self, width: int, height: int, wrap: bool, rule: Rule):
+        if wrap:
+            sys.exit('Error: The hashlife engine does not support --wrap!')
+        if rule.birthWithoutNeighbors:
+            sys.exit('Error: The hashlife engine does not support rules with birth on 0 neighbors!')
+        if rule.states > 2:
+            sys.exit('Error: The hashlife engine does not support multi-state rules!')
+        super().__init__(width, height, wrap, rule)
+        self.maxNodes = DEFAULT_HASHLIFE_NODES
+        self.nodes = {}
+        self.results = {}
+        self.off = HashLifeNode(0, None, None, None, None, 0)
+        self.on = HashLifeNode(0, None, None, None, None, 1)
+        self.emptyNodes = [self.off]
+        self.blockTable = rule.get_block_table()
+        # Root node and the position of its upper left corner
+        self.root = self.empty(3)
+        self.originX = 0
+        self.originY = 0
+        self.previousRoot = None
+        self.previousOrigin = (0, 0)
+        # Leaf nodes computed since the last advance, the others were memoized
+        self.leafSteps = 0
+
+    def configure(self, settings: dict):
+        super().configure(settings)
+        self.maxNodes = settings['hashlifenodes']
+
+    def flush_cache(self):
+        """Forget all canonical nodes and memoized results. Existing nodes
+        stay valid, they are just not shared with new ones anymore.
+        """
+        self.nodes = {}
+        self.results = {}
+        self.emptyNodes = [self.off]
+
+    def join(self, nw: HashLifeNode, ne: HashLifeNode, sw: HashLifeNode, se: HashLifeNode) -> HashLifeNode:
+        """Get the canonical node with the given children
+        """
+        key = (nw, ne, sw, se)
+        node = self.nodes.get(key)
+        if node is None:
+            if len(self.nodes) + len(self.results) >= self.maxNodes:
+                self.flush_cache()
+            node = HashLifeNode(nw.level + 1, nw, ne, sw, se,
+                                nw.population + ne.population + sw.population + se.population)
+            self.nodes[key] = node
+        return node
+
+    def empty(self, level: int) -> HashLifeNode:
+        """Get an empty node of the given level
+        """
+        while len(self.emptyNodes) <= level:
+            node = self.emptyNodes[-1]
+            self.emptyNodes.append(self.join(node, node, node, node))
+        return self.emptyNodes[level]
+
+    def center(self, node: HashLifeNode) -> HashLifeNode:
+        """Get the center subnode of a node
+        """
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def expand(self, node: HashLifeNode) -> HashLifeNode:
+        """Get a node of the next level with the given node in its center
+        """
+        e = self.empty(node.level - 1)
+        return self.join(self.join(e, e, e, node.nw), self.join(e, e, node.ne, e),
+                         self.join(e, node.sw, e, e), self.join(node.se, e, e, e))
+
+    def step_leaf(self, node: HashLifeNode) -> HashLifeNode:
+        """Compute the center 2x2 cells of a 4x4 node one generation ahead
+        """
+        block = 0
+        for child, shift in ((node.nw, 0), (node.ne, 2), (node.sw, 8), (node.se, 10)):
+            block |= (child.nw.population | child.ne.population << 1 |
+                      child.sw.population << 4 | child.se.population << 5) << shift
+        result = self.blockTable[block]
+        self.leafSteps += 1
+        on, off = self.on, self.off
+        return self.join(on if result & 1 else off, on if result & 2 else off,
+                         on if result & 4 else off, on if result & 8 else off)
+
+    def successor(self, node: HashLifeNode, j: int) -> HashLifeNode:
+        """Get the center of a node 2^j generations ahead, j must not be
+        larger than the node level minus 2
+        """
+        key = (node, j)
+        result = self.results.get(key)
+        if result is not None:
+            return result
+
+        if node.population == 0:
+            result = node.nw
+        elif node.level == 2:
+            result = self.step_leaf(node)
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            # Nine overlapping subnodes of the next lower level
+            subNodes = (nw, self.join(nw.ne, ne.nw, nw.se, ne.sw), ne,
+                        self.join(nw.sw, nw.se, sw.nw, sw.ne),
+                        self.join(nw.se, ne.sw, sw.ne, se.nw),
+                        self.join(ne.sw, ne.se, se.nw, se.ne),
+                        sw, self.join(sw.ne, se.nw, sw.se, se.sw), se)
+            if j < node.level - 2:
+                # Advance by 2^j, then only take the centers
+                c00, c01, c02, c10, c11, c12, c20, c21, c22 = [self.successor(n, j) for n in subNodes]
+                result = self.join(self.join(c00.se, c01.sw, c10.ne, c11.nw),
+                                   self.join(c01.se, c02.sw, c11.ne, c12.nw),
+                                   self.join(c10.se, c11.sw, c20.ne, c21.nw),
+                                   self.join(c11.se, c12.sw, c21.ne, c22.nw))
+            else:
+                # Advance twice by 2^(j-1)
+                c00, c01, c02, c10, c11, c12, c20, c21, c22 = [self.successor(n, j - 1) for n in subNodes]
+                result = self.join(self.successor(self.join(c00, c01, c10, c11), j - 1),
+                                   self.successor(self.join(c01, c02, c11, c12), j - 1),
+                                   self.successor(self.join(c10, c11, c20, c21), j - 1),
+                                   self.successor(self.join(c11, c12, c21, c22), j - 1))
+
+        self.results[key] = result
+        return result
+
+    def grow(self):
+        """Double the size of the root node
+        """
+        self.originX -= 1 << (self.root.level - 1)
+        self.originY -= 1 << (self.root.level - 1)
+        self.root = self.expand(self.root)
+
+    def shrink(self):
+        """Halve the size of the root node as long as no cells get lost
+        """
+        while self.root.level > 3:
+            center = self.center(self.root)
+            if center.population != self.root.population:
+                break
+            self.originX += 1 << (self.root.level - 2)
+            self.originY += 1 << (self.root.level - 2)
+            self.root = center
+
+    def step_power(self, j: int):
+        """Advance the universe by 2^j generations
+        """
+        while self.root.level < j + 1:
+            self.grow()
+        # Leave enough empty space for the pattern to grow into
+        self.grow()
+        self.grow()
+        self.originX += 1 << (self.root.level - 2)
+        self.originY += 1 << (self.root.level - 2)
+        self.root = self.successor(self.root, j)
+        self.shrink()
+
+    def advance(self):
+        self.advance_by(1)
+
+    def advance_by(self, generations: int):
+        self.previousRoot = self.root
+        self.previousOrigin = (self.originX, self.originY)
+        self.leafSteps = 0
+        j = 0
+        while generations:
+            if generations & 1:
+                self.step_power(j)
+            generations >>= 1
+            j += 1
+        # Each leaf step evaluates the 2x2 center cells of a 4x4 node
+        self.cellsEvaluated = 4 * self.leafSteps
+        # Finding the births and deaths would mean comparing both quadtrees
+        self.births = self.deaths = None
+
+    @staticmethod
+    def get_node_cell(node: HashLifeNode, x: int, y: int) -> bool:
+        """Get the value of a cell, relative to the upper left corner of a node
+        """
+        size = 1 << node.level
+        if x < 0 or x >= size or y < 0 or y >= size:
+            return False
+        while node.level > 0:
+            if node.population == 0:
+                return False
+            size >>= 1
+            if y < size:
+                node = node.nw if x < size else node.ne
+            else:
+                node = node.sw if x < size else node.se
+                y -= size
+            if x >= size:
+                x -= size
+        return node.population == 1
+
+    def set_node_cell(self, node: HashLifeNode, x: int, y: int, value: bool) -> HashLifeNode:
+        """Get a copy of a node with one cell changed
+        """
+        if node.level == 0:
+            return self.on if value else self.off
+        size = 1 << (node.level - 1)
+        if y < size:
+            if x < size:
+                return self.join(self.set_node_cell(node.nw, x, y, value), node.ne, node.sw, node.se)
+            return self.join(node.nw, self.set_node_cell(node.ne, x - size, y, value), node.sw, node.se)
+        if x < size:
+            return self.join(node.nw, node.ne, self.set_node_cell(node.sw, x, y - size, value), node.se)
+        return self.join(node.nw, node.ne, node.sw, self.set_node_cell(node.se, x - size, y - size, value))
+
+    @staticmethod
+    def count_node_cells(node: HashLifeNode, x0: int, y0: int, x1: int, y1: int) -> int:
+        """Count living cells of a node inside a rectangle,
+        relative to the upper left corner of the node
+        """
+        size = 1 << node.level
+        if node.population == 0 or x1 <= 0 or y1 <= 0 or x0 >= size or y0 >= size:
+            return 0
+        if x0 <= 0 and y0 <= 0 and x1 >= size and y1 >= size:
+            return node.population
+        half = size >> 1
+        return (HashLifeEngine.count_node_cells(node.nw, x0, y0, x1, y1) +
+                HashLifeEngine.count_node_cells(node.ne, x0 - half, y0, x1 - half, y1) +
+                HashLifeEngine.count_node_cells(node.sw, x0, y0 - half, x1, y1 - half) +
+                HashLifeEngine.count_node_cells(node.se, x0 - half, y0 - half, x1 - half, y1 - half))
+
+    @staticmethod
+    def get_node_alive_cells(node: HashLifeNode, x: int, y: int):
+        """Iterate over the living cells of a node whose upper left corner is at x, y
+        """
+        if node.population == 0:
+            return
+        if node.level == 0:
+            yield (x, y)
+            return
+        half = 1 << (node.level - 1)
+        yield from HashLifeEngine.get_node_alive_cells(node.nw, x, y)
+        yield from HashLifeEngine.get_node_alive_cells(node.ne, x + half, y)
+        yield from HashLifeEngine.get_node_alive_cells(node.sw, x, y + half)
+        yield from HashLifeEngine.get_node_alive_cells(node.se, x + half, y + half)
+
+    def get_cell(self, x: int, y: int) -> bool:
+        return HashLifeEngine.get_node_cell(self.root, x - self.originX, y - self.originY)
+
+    def get_cell_changed(self, x: int, y: int) -> bool:
+        if self.previousRoot is None:
+            return True
+        previousX, previousY = self.previousOrigin
+        return self.get_cell(x, y) != HashLifeEngine.get_node_cell(self.previousRoot, x - previousX, y - previousY)
+
+    def set_cell(self, x: int, y: int, value: bool):
+        while not (self.originX <= x < self.originX + (1 << self.root.level) and
+                   self.originY <= y < self.originY + (1 << self.root.level)):
+            self.grow()
+        self.root = self.set_node_cell(self.root, x - self.originX, y - self.originY, value)
+
+    def count_alive(self) -> int:
+        return self.root.population
+
+    def count_changed(self) -> int:
+        # Comparing both quadtrees cell by cell would cost more than the step
+        return None
+
+    def get_alive_cells(self):
+        return HashLifeEngine.get_node_alive_cells(self.root, self.originX, self.originY)
+
+    def get_changed_hash(self) -> int:
+        # Cells that are alive in only one of both generations changed
+        if self.previousRoot is None:
+            return self.get_hash()
+        return self.get_hash() ^ zobrist_hash(HashLifeEngine.get_node_alive_cells(self.previousRoot, *self.previousOrigin))
+
+    def count_alive_in(self, left: int, top: int, right: int, bottom: int) -> int:
+        return HashLifeEngine.count_node_cells(self.root, left - self.originX, top - self.originY,
+                                               right - self.originX, bottom - self.originY)
+
+    def get_bounding_box(self) -> tuple[int, int, int, int]:
+        if self.root.population == 0:
+            return None
+        edges = {}
+
+        def find_edges(node: HashLifeNode) -> tuple[int, int, int, int]:
+            # Edges of the living cells, relative to the upper left corner of the node
+            if node.level == 0:
+                return (0, 0, 1, 1)
+            result = edges.get(node)
+            if result is None:
+                half = 1 << (node.level - 1)
+                left, top, right, bottom = 1 << node.level, 1 << node.level, 0, 0
+                for child, childX, childY in ((node.nw, 0, 0), (node.ne, half, 0), (node.sw, 0, half), (node.se, half, half)):
+                    if child.population:
+                        childLeft, childTop, childRight, childBottom = find_edges(child)
+                        left = min(left, childX + childLeft)
+                        top = min(top, childY + childTop)
+                        right = max(right, childX + childRight)
+                        bottom = max(bottom, childY + childBottom)
+                result = (left, top, right, bottom)
+                edges[node] = result
+            return result
+
+        left, top, right, bottom = find_edges(self.root)
+        return (self.originX + left, self.originY + top, self.originX + right, self.originY + bottom)
+
+
+class SparseEngine(GridEngine):
+    """Unbounded engine, only stores the coordinates of living cells.
+    Memory and time are proportional to the population, not the area.
+    """
+    unbounded = True
+
+    def __init__(self, width: int, height: int, wrap: bool, rule: Rule):
+        if wrap:
+            sys.exit('Error: The sparse engine does not support --wrap!')
+        if rule.birthWithoutNeighbors:
+            sys.exit('Error: The sparse engine does not support rules with birth on 0 neighbors!')
+        if rule.states > 2:
+            sys.exit('Error: The sparse engine does not support multi-state rules!')
+        super().__init__(width, height, wrap, rule)
+        self.cells = set()
+        # Cells that changed in the last generation, None means all of them
+        self.changedCells = None
+
+    def get_cell(self, x: int, y: int) -> bool:
+        return (x, y) in self.cells
+
+    def get_cell_changed(self, x: int, y: int) -> bool:
+        return self.changedCells is None or (x, y) in self.changedCells
+
+    def set_cell(self, x: int, y: int, value: bool):
+        if ((x, y) in self.cells) != value:
+            if value:
+                self.cells.add((x, y))
+            else:
+                self.cells.discard((x, y))
+            if self.changedCells is not None:
+                self.changedCells.add((x, y))
+        elif self.changedCells is not None:
+            self.changedCells.discard((x, y))
+
+    def set_run(self, x: int, y: int, length: int, value: bool):
+        run = {(runX, y) for runX in range(x, x + length)}
+        changed = run - self.cells if value else run & self.cells
+        if value:
+            self.cells |= run
+        else:
+            self.cells -= run
+        if self.changedCells is not None:
+            self.changedCells -= run
+            self.changedCells |= changed
+
+    def advance(self):
+        cells = self.cells
+        counts = collections.Counter((x + dx, y + dy) for x, y in cells
+                                     for dx, dy in ((-1, -1), (0, -1), (1, -1), (-1, 0),
+                                                    (1, 0), (-1, 1), (0, 1), (1, 1)))
+        with self.measure('rule'):
+            if self.rule.table is not None:
+                birthTable, surviveTable = self.rule.table
+                newCells = {cell for cell, aliveNeighbors in counts.items()
+                            if (surviveTable if cell in cells else birthTable)[aliveNeighbors]}
+                if surviveTable[0]:
+                    newCells.update(cell for cell in cells if cell not in counts)
+                self.cellsEvaluated = len(counts)
+            else:
+                # Look up the neighborhood of every cell that is alive or has living neighbors
+                neighborhoodTable = self.rule.neighborhoodTable
+                offsets = [(dx, dy, 1 << bit) for dx, dy, bit in Rule.NEIGHBOR_OFFSETS] + [(0, 0, Rule.CENTER_BIT)]
+                candidates = cells.union(counts)
+                newCells = {(x, y) for x, y in candidates
+                            if neighborhoodTable[sum(bit for dx, dy, bit in offsets if (x + dx, y + dy) in cells)]}
+                self.cellsEvaluated = len(candidates)
+        self.changedCells = newCells ^ cells
+        self.cells = newCells
+        # Every changed cell is a birth or a death
+        growth = len(newCells) - len(cells)
+        self.births = (len(self.changedCells) + growth) // 2
+        self.deaths = (len(self.changedCells) - growth) // 2
+
+    def count_alive(self) -> int:
+        return len(self.cells)
+
+    def count_changed(self) -> int:
+        return len(self.changedCells if self.changedCells is not None else self.cells)
+
+    def get_alive_cells(self):
+        return iter(self.cells)
+
+    def get_changed_cells(self):
+        # Before the first generation, all living cells changed from the empty grid
+        return iter(self.changedCells if self.changedCells is not None else self.cells)
+
+    def count_alive_in(self, left: int, top: int, right: int, bottom: int) -> int:
+        return sum(1 for x, y in self.cells if left <= x < right and top <= y < bottom)
+
+    def get_bounding_box(self) -> tuple[int, int, int, int]:
+        if not self.cells:
+            return None
+        xs = [x for x, _ in self.cells]
+        ys = [y for _, y in self.cells]
+        return (min(xs), min(ys), max(xs) + 1, max(ys) + 1)
+
+
+########################################################
+# Pattern files
+########################################################
+
+class RleError(ValueError):
+    """Invalid content in an RLE file
+    """
+    def __init__(self, lineNumber: int, message: str):
+        super().__init__('Error: Line ' + str(lineNumber) + ' of the RLE file: ' + message + '!')
+        self.lineNumber = lineNumber
+
+
+class RleReader:
+    """Streaming decoder for RLE (Run Length Encoded) pattern files.
+    Reads the header when created, then decodes the cell data
+    line by line while runs() is iterated.
+    """
+    # Run count, followed by a tag. Multi-state files use '.' and 'A' to 'X',
+    # with an optional prefix from 'p' to 'y' for states above 24
+    TOKEN_PATTERN = re.compile(r'(\d*)([p-y]?[A-X]|[a-z.$!])')
+    HEADER_PATTERN = re.compile(r'^x\s*=')
+    TRAILING_DIGITS_PATTERN = re.compile(r'\d+$')
+
+    def __init__(self, dataFile):
+        self.dataFile = dataFile
+        self.name = ''
+        self.author = ''
+        self.comments = []
+        self.width = 0
+        self.height = 0
+        self.rule = ''
+        # Position of the upper left corner, from #P or #R lines
+        self.offset = None
+        self.firstDataLine = ''
+        # Number of the last line read, for error messages
+        self.lineNumber = 0
+        for line in dataFile:
+            self.lineNumber += 1
+            line = line.strip(' \n\r\t')
+            if not line:
+                continue
+            if line.startswith('#'):
+                self.read_comment(line)
+            elif RleReader.HEADER_PATTERN.match(line):
+                self.read_header(line)
+            else:
+                self.firstDataLine = line
+                break
+
+    def read_comment(self, line: str):
+        """Parse a comment line
+        """
+        tag = line[1:2].upper()
+        text = line[2:].strip(' \n\r\t')
+        if tag == 'N':
+            # Pattern name
+            self.name = text
+        elif tag == 'C':
+            # Pattern comments
+            self.comments.append(text)
+        elif tag == 'O':
+            # Pattern author
+            self.author = text
+        elif tag in 'PR':
+            # Pattern offset
+            values = text.split()
+            if len(values) >= 2:
+                try:
+                    self.offset = (int(values[0]), int(values[1]))
+                except ValueError:
+                    raise RleError(self.lineNumber, 'Invalid offset "' + text + '"')
+
+    def read_header(self, line: str):
+        """Parse the header line, e.g. "x = 36, y = 9, rule = B3/S23"
+        """
+        for item in line.split(','):
+            if '=' not in item:
+                continue
+            key, value = [part.strip() for part in item.split('=', 1)]
+            key = key.lower()
+            if key in ('x', 'y'):
+                try:
+                    size = int(value)
+                except ValueError:
+                    size = -1
+                if size < 0:
+                    raise RleError(self.lineNumber, 'Invalid size "' + value + '"')
+                if key == 'x':
+                    self.width = size
+                else:
+                    self.height = size
+            elif key == 'rule':
+                self.rule = value
+
+    def runs(self):
+        """Decode the cell data, yield (x, y, length, state) for each run of cells.
+        State 0 is a dead cell, state 1 is a living cell.
+        """
+        x = 0
+        y = 0
+        pendingDigits = ''
+        lines = itertools.chain([self.firstDataLine], self.dataFile)
+        for self.lineNumber, line in enumerate(lines, self.lineNumber):
+            line = line.strip(' \n\r\t')
+            if line.startswith('#'):
+                continue
+            line = pendingDigits + line
+            # A run count may continue on the next line
+            trailingDigits = RleReader.TRAILING_DIGITS_PATTERN.search(line)
+            if trailingDigits is not None:
+                pendingDigits = trailingDigits.group(0)
+                line = line[:trailingDigits.start()]
+            else:
+                pendingDigits = ''
+            for match in RleReader.TOKEN_PATTERN.finditer(line):
+                length = int(match.group(1)) if match.group(1) else 1
+                tag = match.group(2)
+                if tag == '$':
+                    x = 0
+                    y += length
+                    continue
+                if tag == '!':
+                    return
+                if tag == 'b' or tag == '.':
+                    state = 0
+                elif len(tag) == 2:
+                    state = (ord(tag[0]) - ord('p') + 1) * 24 + ord(tag[1]) - ord('A') + 1
+                elif tag <= 'X':
+                    state = ord(tag) - ord('A') + 1
+                else:
+                    state = 1
+                yield (x, y, length, state)
+                x += length
+
+
+class Pattern:
+    """Shape that is parsed once and can be stamped onto a grid in bulk.
+    Stores one integer per row for the living cells and one for the cells
+    defined by the shape (living or explicitly dead), bit x is cell x.
+    """
+    # Loaded files by (path, modification time)
+    fileCache = {}
+
+    def __init__(self, width: int, height: int, rows: list[int], definedRows: list[int] = None,
+                 name: str='', offset: tuple[int, int] = None):
+        self.width = width
+        self.height = height
+        self.rows = rows
+        self.definedRows = definedRows if definedRows is not None else list(rows)
+        self.name = name
+        # Position of the upper left corner relative to the center, from the file
+        self.offset = offset
+        self.cells = None
+        self.transformed = {}
+
+    @staticmethod
+    def from_cells(cells) -> 'Pattern':
+        """Create a pattern from the coordinates of its living cells,
+        moved so the upper left corner of their bounding box is at 0, 0
+        """
+        cells = list(cells)
+        if not cells:
+            return Pattern(0, 0, [])
+        left = min(x for x, _ in cells)
+        top = min(y for _, y in cells)
+        rows = [0] * (max(y for _, y in cells) - top + 1)
+        for x, y in cells:
+            rows[y - top] |= 1 << (x - left)
+        return Pattern(max(x for x, _ in cells) - left + 1, len(rows), rows)
+
+    @staticmethod
+    def from_strings(lines: list[str], alive: str='o', dead: str='.') -> 'Pattern':
+        """Create a pattern from plain text rows, other characters are undefined
+        """
+        rows = []
+        definedRows = []
+        for line in lines:
+            row = defined = 0
+            for x, char in enumerate(line):
+                if char == alive:
+                    row |= 1 << x
+                    defined |= 1 << x
+                elif char == dead:
+                    defined |= 1 << x
+            rows.append(row)
+            definedRows.append(defined)
+        return Pattern(max((len(line) for line in lines), default=0), len(rows), rows, definedRows)
+
+    @staticmethod
+    def read_rle(dataFile, maxCells: int=0) -> 'Pattern':
+        """Decode a pattern from an open RLE file. Cells in states other
+        than 1 (e.g. dying cells) are dead. If maxCells is set, patterns
+        with a larger bounding box raise an RleError before they are built.
+        """
+        reader = RleReader(dataFile)
+        rows = []
+        definedRows = []
+        right = reader.width
+        if maxCells and reader.width * reader.height > maxCells:
+            raise RleError(reader.lineNumber, 'The pattern has more than ' + str(maxCells) + ' cells')
+        # Runs come row by row from left to right. The cells of a row are joined
+        # as text and converted once, instead of updating a large int per run.
+        for y, runs in itertools.groupby(reader.runs(), key=lambda run: run[1]):
+            alive = []
+            defined = []
+            end = 0
+            for x, _, length, state in runs:
+                right = max(right, x + length)
+                if maxCells and right * max(reader.height, y + 1) > maxCells:
+                    raise RleError(reader.lineNumber, 'The pattern has more than ' + str(maxCells) + ' cells')
+                gap = '0' * (x - end)
+                alive += (gap, ('1' if state == 1 else '0') * length)
+                defined += (gap, '1' * length)
+                end = x + length
+            rows += [0] * (y - len(rows))
+            definedRows += [0] * (y - len(definedRows))
+            rows.append(int(''.join(reversed(alive)) or '0', 2))
+            definedRows.append(int(''.join(reversed(defined)) or '0', 2))
+        width = max(reader.width, max((row.bit_length() for row in definedRows), default=0))
+        height = max(reader.height, len(rows))
+        rows += [0] * (height - len(rows))
+        definedRows += [0] * (height - len(definedRows))
+        return Pattern(width, height, rows, definedRows, name=reader.name, offset=reader.offset)
+
+    @staticmethod
+    def load(filename: str) -> 'Pattern':
+        """Load a pattern from a .cells or .rle file. Patterns are cached
+        until the file is modified.
+        """
+        if not os.path.isfile(filename):
+            raise IOError('A file called ' + filename + ' does not exist!')
+        path = os.path.abspath(filename)
+        key = (path, os.stat(path).st_mtime_ns)
+        pattern = Pattern.fileCache.get(key)
+        if pattern is None:
+            if os.path.splitext(filename)[1].lower() == '.rle':
+                with open(filename, 'r') as dataFile:
+                    pattern = Pattern.read_rle(dataFile)
+            else:
+                pattern = Pattern.from_strings([line.rstrip() for line in GameOfLife.load_file_plaintext(filename)])
+            # Forget older versions of the file
+            for oldKey in [oldKey for oldKey in Pattern.fileCache if oldKey[0] == path]:
+                del Pattern.fileCache[oldKey]
+            Pattern.fileCache[key] = pattern
+        return pattern
+
+    def get_cells(self) -> list[tuple[int, int]]:
+        """Get the offsets of all living cells from the upper left corner
+        """
+        if self.cells is None:
+            self.cells = [(x, y) for y, row in enumerate(self.rows)
+                          for x in range(row.bit_length()) if row >> x & 1]
+        return self.cells
+
+    def get_defined_cells(self) -> list[tuple[int, int, bool]]:
+        """Get the offsets and states of all cells defined by the pattern
+        """
+        return [(x, y, row >> x & 1 == 1) for y, (row, defined) in enumerate(zip(self.rows, self.definedRows))
+                for x in range(defined.bit_length()) if defined >> x & 1]
+
+    def transform(self, rotation: int=0, flip: bool=False) -> 'Pattern':
+        """Get the pattern mirrored horizontally if flip is set, and then rotated
+        clockwise by the given number of quarter turns. Results are cached.
+        """
+        rotation %= 4
+        if rotation == 0 and not flip:
+            return self
+        key = (rotation, flip)
+        pattern = self.transformed.get(key)
+        if pattern is None:
+            width, height = self.width, self.height
+
+            def transform_cell(x: int, y: int) -> tuple[int, int]:
+                if flip:
+                    x = width - 1 - x
+                if rotation == 1:
+                    return (height - 1 - y, x)
+                if rotation == 2:
+                    return (width - 1 - x, height - 1 - y)
+                if rotation == 3:
+                    return (y, width - 1 - x)
+                return (x, y)
+
+            newWidth, newHeight = (height, width) if rotation % 2 else (width, height)
+            rows = [0] * newHeight
+            definedRows = [0] * newHeight
+            for sourceRows, targetRows in ((self.rows, rows), (self.definedRows, definedRows)):
+                for y, row in enumerate(sourceRows):
+                    for x in range(row.bit_length()):
+                        if row >> x & 1:
+                            newX, newY = transform_cell(x, y)
+                            targetRows[newY] |= 1 << newX
+            pattern = Pattern(newWidth, newHeight, rows, definedRows, name=self.name)
+            self.transformed[key] = pattern
+        return pattern
+
+
+########################################################
+# Checkpoints
+########################################################
+
+class CheckpointFile:
+    """Binary snapshot of a grid. The file starts with a fixed size header,
+    followed by the rule string and the cells. Cells are stored row by row,
+    bit-packed with 8 cells per byte (bit x of a row is cell x), or with one
+    byte per cell holding its state for multi-state rules, optionally
+    compressed with zlib or a simple byte run length encoding.
+    The file is memory-mapped, rows are decoded one at a time while
+    rows() is iterated.
+    """
+    MAGIC = b'GOLCKPT1'
+    COMPRESSIONS = ('none', 'zlib', 'rle')
+    # Magic, compression, wrap, bits per cell (0 in older files means 1), width, height,
+    # generation, seed, area left, area top, area width, area height, viewport x,
+    # viewport y, length of the rule string
+    HEADER = struct.Struct('<8sBBBxIIqdqqIIqqH')
+    CELL_BITS = (1, 8)
+    CHUNK_SIZE = 1 << 16
+    # Bytes repeated at least 4 times are stored as a run
+    RUN_PATTERN = re.compile(rb'(.)\1{3,}', re.DOTALL)
+    # Mapped pages are released after this many bytes have been decoded
+    RELEASE_SIZE = 1 << 24
+
+    def __init__(self, filename: str):
+        if not os.path.isfile(filename):
+            sys.exit('Error: A checkpoint file called ' + filename + ' does not exist!')
+        self.filename = filename
+        with open(filename, 'rb') as dataFile:
+            self.data = mmap.mmap(dataFile.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < CheckpointFile.HEADER.size or \
+           self.data[:len(CheckpointFile.MAGIC)] != CheckpointFile.MAGIC:
+            self.close()
+            sys.exit('Error: ' + filename + ' is not a checkpoint file!')
+        (_, compression, wrap, cellBits, self.width, self.height, self.generation, self.seed,
+         self.left, self.top, self.areaWidth, self.areaHeight, self.viewportX, self.viewportY,
+         ruleLength) = CheckpointFile.HEADER.unpack_from(self.data)
+        if compression >= len(CheckpointFile.COMPRESSIONS):
+            self.close()
+            sys.exit('Error: Unknown compression in checkpoint file ' + filename + '!')
+        self.cellBits = cellBits or 1
+        if self.cellBits not in CheckpointFile.CELL_BITS:
+            self.close()
+            sys.exit('Error: Unknown cell format in checkpoint file ' + filename + '!')
+        self.compression = CheckpointFile.COMPRESSIONS[compression]
+        self.wrap = wrap == 1
+        self.rule = self.data[CheckpointFile.HEADER.size:CheckpointFile.HEADER.size + ruleLength].decode()
+        self.dataOffset = CheckpointFile.HEADER.size + ruleLength
+        self.stride = (self.areaWidth * self.cellBits + 7) // 8
+
+    def close(self):
+        self.data.close()
+
+    def rows(self):
+        """Decode the cells, yield one row at a time, bit-packed or
+        with one state per byte depending on cellBits
+        """
+        position = self.dataOffset
+        releasedUntil = 0
+        decompressor = zlib.decompressobj() if self.compression == 'zlib' else None
+        for _ in range(self.areaHeight):
+            if self.compression == 'none':
+                row = self.data[position:position + self.stride]
+                position += self.stride
+            elif self.compression == 'zlib':
+                row = bytearray()
+                while len(row) < self.stride:
+                    source = decompressor.unconsumed_tail
+                    if not source:
+                        source = self.data[position:position + CheckpointFile.CHUNK_SIZE]
+                        position += len(source)
+                    output = decompressor.decompress(source, self.stride - len(row))
+                    if not source and not output:
+                        break
+                    row += output
+            else:
+                row, position = CheckpointFile.decode_rle_row(self.data, position, self.stride)
+            if len(row) != self.stride:
+                sys.exit('Error: Checkpoint file ' + self.filename + ' is truncated!')
+            # Keep the resident memory low while reading large files
+            if position - releasedUntil >= CheckpointFile.RELEASE_SIZE and hasattr(mmap, 'MADV_DONTNEED'):
+                releaseEnd = position - position % mmap.PAGESIZE
+                self.data.madvise(mmap.MADV_DONTNEED, releasedUntil, releaseEnd - releasedUntil)
+                releasedUntil = releaseEnd
+            yield row
+
+    @staticmethod
+    def write(filename: str, info: dict, rows, compression: str='zlib'):
+        """Write a checkpoint file. Info holds the header values, rows yields
+        the rows of the area, bit-packed or with one state per byte if
+        info['cellBits'] is 8. The file is replaced atomically.
+        """
+        if compression not in CheckpointFile.COMPRESSIONS:
+            sys.exit('Error: Unknown checkpoint compression "' + compression + '"! (Available: ' +
+                     ', '.join(CheckpointFile.COMPRESSIONS) + ')')
+        rule = info['rule'].encode()
+        header = CheckpointFile.HEADER.pack(
+            CheckpointFile.MAGIC, CheckpointFile.COMPRESSIONS.index(compression), 1 if info['wrap'] else 0,
+            info.get('cellBits', 1), info['width'], info['height'], info['generation'], info['seed'],
+            info['left'], info['top'], info['areaWidth'], info['areaHeight'],
+            info['viewportX'], info['viewportY'], len(rule))
+        tmpFilename = filename + '.tmp'
+        with open(tmpFilename, 'wb') as dataFile:
+            dataFile.write(header + rule)
+            compressor = zlib.compressobj() if compression == 'zlib' else None
+            for row in rows:
+                if compression == 'zlib':
+                    dataFile.write(compressor.compress(row))
+                elif compression == 'rle':
+                    dataFile.write(CheckpointFile.encode_rle_row(row))
+                else:
+                    dataFile.write(row)
+            if compressor is not None:
+                dataFile.write(compressor.flush())
+        os.replace(tmpFilename, filename)
+
+    @staticmethod
+    def encode_rle_row(row: bytes) -> bytes:
+        """Run length encode a row. Each token starts with a varint of (length << 1 | repeated),
+        followed by a single byte for a repeated run, or by length bytes for a literal run.
+        """
+        tokens = bytearray()
+        literalStart = 0
+        for match in CheckpointFile.RUN_PATTERN.finditer(row):
+            if literalStart < match.start():
+                CheckpointFile.encode_varint(tokens, (match.start() - literalStart) << 1)
+                tokens += row[literalStart:match.start()]
+            CheckpointFile.encode_varint(tokens, ((match.end() - match.start()) << 1) | 1)
+            tokens.append(row[match.start()])
+            literalStart = match.end()
+        if literalStart < len(row):
+            CheckpointFile.encode_varint(tokens, (len(row) - literalStart) << 1)
+            tokens += row[literalStart:]
+        return bytes(tokens)
+
+    @staticmethod
+    def decode_rle_row(data, position: int, stride: int) -> tuple[bytes, int]:
+        """Decode one run length encoded row, return the row and the position after it
+        """
+        row = bytearray()
+        while len(row) < stride and position < len(data):
+            token = 0
+            shift = 0
+            while True:
+                byte = data[position]
+                position += 1
+                token |= (byte & 0x7f) << shift
+                shift += 7
+                if byte < 0x80:
+                    break
+            length = token >> 1
+            if token & 1:
+                row += data[position:position + 1] * length
+                position += 1
+            else:
+                row += data[position:position + length]
+                position += length
+        return row, position
+
+    @staticmethod
+    def encode_varint(target: bytearray, value: int):
+        while value >= 0x80:
+            target.append((value & 0x7f) | 0x80)
+            value >>= 7
+        target.append(value)
+
+
+########################################################
+# Export
+########################################################
+
+class ImageEncoder:
+    """Stdlib-only PNG and GIF encoding of bit-packed rows (bit x of a row is cell x).
+    Living cells are white, dead cells black, every cell becomes scale x scale pixels.
+    """
+    PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+    # Byte translation table that reverses the bit order, PNG pixels start at the highest bit
+    REVERSE_TABLE = bytes(int('{:08b}'.format(value)[::-1], 2) for value in range(256))
+    # Black and white, for GIF color tables
+    PALETTE = b'\x00\x00\x00\xff\xff\xff'
+    GIF_MIN_CODE_SIZE = 2
+    GIF_MAX_CODES = 4096
+
+    def __init__(self, scale: int=1):
+        self.scale = scale
+        # Byte -> the bits of its cells repeated scale times, still lowest bit first
+        self.bitTable = [sum(((1 << scale) - 1) << (bit * scale) for bit in range(8) if value >> bit & 1)
+                         .to_bytes(scale, 'little') for value in range(256)]
+        # Byte -> one color index byte per pixel
+        self.pixelTable = [bytes(value >> bit & 1 for bit in range(8) for _ in range(scale)) for value in range(256)]
+
+    def encode_png(self, rows: list[bytes], width: int) -> bytes:
+        """Encode a 1 bit grayscale PNG image
+        """
+        lineLength = (width * self.scale + 7) // 8
+        lines = []
+        for row in rows:
+            if self.scale > 1:
+                row = b''.join(map(self.bitTable.__getitem__, row))
+            line = b'\x00' + row[:lineLength].translate(ImageEncoder.REVERSE_TABLE)
+            lines.append(line * self.scale)
+        header = struct.pack('>IIBBBBB', width * self.scale, len(rows) * self.scale, 1, 0, 0, 0, 0)
+        return ImageEncoder.PNG_SIGNATURE + \
+            ImageEncoder.png_chunk(b'IHDR', header) + \
+            ImageEncoder.png_chunk(b'IDAT', zlib.compress(b''.join(lines))) + \
+            ImageEncoder.png_chunk(b'IEND', b'')
 
-# Other constants
-HUD_COL_WIDTH = 25
+    @staticmethod
+    def png_chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+    def get_pixels(self, rows: list[bytes], width: int) -> bytes:
+        """Convert rows to one color index byte per pixel, row by row
+        """
+        pixelWidth = width * self.scale
+        return b''.join(b''.join(map(self.pixelTable.__getitem__, row))[:pixelWidth] * self.scale for row in rows)
+
+    @staticmethod
+    def encode_lzw(pixels: bytes, minCodeSize: int) -> bytes:
+        """Compress color indices with the variable code size LZW of GIF images
+        """
+        clearCode = 1 << minCodeSize
+        endCode = clearCode + 1
+        codeSize = minCodeSize + 1
+        nextCode = endCode + 1
+        # (prefix code << 8 | pixel) -> code
+        table = {}
+        output = bytearray()
+        bitBuffer = clearCode
+        bitCount = codeSize
+        prefix = None
+        for pixel in pixels:
+            if prefix is None:
+                prefix = pixel
+                continue
+            key = prefix << 8 | pixel
+            code = table.get(key)
+            if code is not None:
+                prefix = code
+                continue
+            bitBuffer |= prefix << bitCount
+            bitCount += codeSize
+            if nextCode < ImageEncoder.GIF_MAX_CODES:
+                table[key] = nextCode
+                if nextCode == 1 << codeSize:
+                    codeSize += 1
+                nextCode += 1
+            else:
+                # The table is full, start over
+                bitBuffer |= clearCode << bitCount
+                bitCount += codeSize
+                table.clear()
+                codeSize = minCodeSize + 1
+                nextCode = endCode + 1
+            prefix = pixel
+            if bitCount >= 64:
+                output += (bitBuffer & 0xffffffffffffffff).to_bytes(8, 'little')
+                bitBuffer >>= 64
+                bitCount -= 64
+        if prefix is not None:
+            bitBuffer |= prefix << bitCount
+            bitCount += codeSize
+        bitBuffer |= endCode << bitCount
+        bitCount += codeSize
+        output += bitBuffer.to_bytes((bitCount + 7) // 8, 'little')
+        return bytes(output)
+
+
+class GifWriter:
+    """Animated GIF file that is written one frame at a time,
+    so frames never have to be kept in memory
+    """
+    # GIF stores the image size in 16 bits
+    MAX_SIZE = 65535
+
+    def __init__(self, filename: str, width: int, height: int, delay: int, encoder: ImageEncoder):
+        if max(width, height) * encoder.scale > GifWriter.MAX_SIZE:
+            raise ValueError('GIF images can be at most ' + str(GifWriter.MAX_SIZE) + ' pixels wide and high')
+        self.width = width
+        self.height = height
+        # Time between frames in 1/100 seconds
+        self.delay = delay
+        self.encoder = encoder
+        self.dataFile = open(filename, 'wb')
+        # Header with a global two color table, followed by an endless loop extension
+        self.dataFile.write(b'GIF89a' + struct.pack('<HHBBB', width * encoder.scale, height * encoder.scale, 0x80, 0, 0) +
+                            ImageEncoder.PALETTE + b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')
+
+    def add_frame(self, rows: list[bytes]):
+        data = ImageEncoder.encode_lzw(self.encoder.get_pixels(rows, self.width), ImageEncoder.GIF_MIN_CODE_SIZE)
+        blocks = bytearray()
+        for start in range(0, len(data), 255):
+            block = data[start:start + 255]
+            blocks.append(len(block))
+            blocks += block
+        self.dataFile.write(b'\x21\xf9\x04' + struct.pack('<BHBB', 0, self.delay, 0, 0) +
+                            b'\x2c' + struct.pack('<HHHHB', 0, 0, self.width * self.encoder.scale,
+                                                   self.height * self.encoder.scale, 0) +
+                            bytes([ImageEncoder.GIF_MIN_CODE_SIZE]) + blocks + b'\x00')
+
+    def close(self):
+        self.dataFile.write(b'\x3b')
+        self.dataFile.close()
+
+
+class Exporter(threading.Thread):
+    """Writes generations to a folder in a background thread, so encoding
+    does not stall the simulation. Frames wait in a short queue, when it is
+    full, submit() blocks until the writer has caught up.
+    Formats are PNG frames, an animated GIF, and RLE or plain text snapshots.
+    """
+    FORMATS = ('png', 'gif', 'rle', 'cells')
+    QUEUE_SIZE = 4
+    GIF_FILENAME = 'animation.gif'
+
+    def __init__(self, directory: str, formats: list[str], scale: int=1, delay: int=4,
+                 imageWidth: int=0, imageHeight: int=0):
+        super().__init__(daemon=True)
+        for exportFormat in formats:
+            if exportFormat not in Exporter.FORMATS:
+                sys.exit('Error: Unknown export format "' + exportFormat + '"! (Available: ' +
+                         ', '.join(Exporter.FORMATS) + ')')
+        if scale < 1:
+            sys.exit('Error: The export scale must be at least 1!')
+        if 'gif' in formats and max(imageWidth, imageHeight) * scale > GifWriter.MAX_SIZE:
+            sys.exit('Error: GIF images can be at most ' + str(GifWriter.MAX_SIZE) +
+                     ' pixels wide and high, lower the resolution or --export-scale!')
+        self.directory = directory
+        self.formats = formats
+        self.delay = delay
+        self.encoder = ImageEncoder(scale)
+        self.needsImage = 'png' in formats or 'gif' in formats
+        self.needsPattern = 'rle' in formats or 'cells' in formats
+        self.queue = queue.Queue(Exporter.QUEUE_SIZE)
+        self.gifWriter = None
+        self.framesSubmitted = 0
+        self.framesWritten = 0
+        self.error = None
+        os.makedirs(directory, exist_ok=True)
+
+    def submit(self, frame: dict):
+        """Queue a frame captured by GameOfLife.export_frame()
+        """
+        self.framesSubmitted += 1
+        self.queue.put(frame)
+
+    def run(self):
+        while True:
+            frame = self.queue.get()
+            if frame is None:
+                break
+            if self.error is not None:
+                # Keep taking frames, so the simulation does not block
+                continue
+            try:
+                self.write_frame(frame)
+                self.framesWritten += 1
+            except Exception as e:
+                # Any error would otherwise end the thread and leave submit() blocked
+                self.error = e
+                print('Error: Export to ' + self.directory + ' failed (' + self.describe_error() +
+                      '), later generations are not exported!', file=sys.stderr)
+
+    def describe_error(self) -> str:
+        return str(self.error) or type(self.error).__name__
+
+    def write_frame(self, frame: dict):
+        basename = os.path.join(self.directory, 'generation-{:08d}'.format(frame['generation']))
+        if 'png' in self.formats:
+            with open(basename + '.png', 'wb') as dataFile:
+                dataFile.write(self.encoder.encode_png(frame['imageRows'], frame['imageWidth']))
+        if 'gif' in self.formats:
+            if self.gifWriter is None:
+                self.gifWriter = GifWriter(os.path.join(self.directory, Exporter.GIF_FILENAME),
+                                           frame['imageWidth'], len(frame['imageRows']), self.delay, self.encoder)
+            self.gifWriter.add_frame(frame['imageRows'])
+        comments = ['Generation ' + str(frame['generation'])]
+        if 'rle' in self.formats:
+            GameOfLife.save_file_rle(basename + '.rle', frame['patternRows'], frame['patternWidth'],
+                                     comments=comments, rule=frame['rule'], offset=frame['offset'])
+        if 'cells' in self.formats:
+            GameOfLife.save_file_plaintext(basename + '.cells', frame['patternRows'], frame['patternWidth'],
+                                           comments=comments)
+
+    def close(self):
+        """Write all queued frames and finish the files
+        """
+        self.queue.put(None)
+        self.join()
+        if self.gifWriter is not None:
+            self.gifWriter.close()
+            self.gifWriter = None
+        if self.error is not None:
+            sys.exit('Error: Export to ' + self.directory + ' failed (' + self.describe_error() + ')!')
+
+
+########################################################
+# Rendering
+########################################################
+
+class TerminalRenderer:
+    """Draws the grid with ANSI escape sequences. Only cells that changed
+    since the last frame are written, and every frame is written at once.
+    """
+    # Characters for one cell, or for two cells on top of each other
+    CELL_CHARS = (u' ', u'\u2588')
+    HALF_BLOCK_CHARS = (u' ', u'\u2580', u'\u2584', u'\u2588')
+
+    def __init__(self, game: 'GameOfLife', halfBlocks: bool=False):
+        self.game = game
+        self.halfBlocks = halfBlocks
+        # Lines of the last frame, and what they showed
+        self.lines = []
+        self.lastGeneration = None
+        self.lastViewport = None
+
+    def start(self):
+        """Prepare the terminal
+        """
+        if PLATFORM == 'NT':
+            # Enables ANSI escape sequences in the Windows console
+            os.system('')
+        sys.stdout.write('\x1b[?25l')
+        self.invalidate()
+
+    def finish(self):
+        """Restore the terminal
+        """
+        sys.stdout.write('\x1b[?25h\n')
+        sys.stdout.flush()
+
+    def invalidate(self):
+        """Redraw everything with the next frame
+        """
+        self.lines = []
+
+    def line_changed(self, lineIndex: int) -> bool:
+        """Look up if any cell of a line changed in the last generation
+        """
+        game = self.game
+        rowsPerLine = 2 if self.halfBlocks else 1
+        for y in range(lineIndex * rowsPerLine, min((lineIndex + 1) * rowsPerLine, game.gridHeight)):
+            if True in game.engine.get_changed_row(game.viewportY + y, game.viewportX, game.gridWidth):
+                return True
+        return False
+
+    def build_line(self, lineIndex: int) -> str:
+        """Build the text of one line of the grid
+        """
+        game = self.game
+        if not self.halfBlocks:
+            row = game.engine.get_row(game.viewportY + lineIndex, game.viewportX, game.gridWidth)
+            return ''.join([self.CELL_CHARS[cell] for cell in row])
+        y = lineIndex * 2
+        upperRow = game.engine.get_row(game.viewportY + y, game.viewportX, game.gridWidth)
+        if y + 1 < game.gridHeight:
+            lowerRow = game.engine.get_row(game.viewportY + y + 1, game.viewportX, game.gridWidth)
+        else:
+            lowerRow = [False] * game.gridWidth
+        return ''.join([self.HALF_BLOCK_CHARS[upper + 2 * lower] for upper, lower in zip(upperRow, lowerRow)])
+
+    @staticmethod
+    def move_cursor(line: int, column: int) -> str:
+        return '\x1b[' + str(line + 1) + ';' + str(column + 1) + 'H'
+
+    def render(self):
+        """Write the changes since the last frame to the terminal
+        """
+        game = self.game
+        lineCount = (game.gridHeight + 1) // 2 if self.halfBlocks else game.gridHeight
+        viewport = (game.viewportX, game.viewportY)
+        output = []
+
+        fullRedraw = len(self.lines) != lineCount or viewport != self.lastViewport
+        if fullRedraw:
+            output.append('\x1b[2J')
+            self.lines = [None] * lineCount
+        # If exactly one generation passed, the change flags tell which lines need to be checked
+        useChangeFlags = not fullRedraw and not game.engine.unbounded and \
+            self.lastGeneration is not None and game.generation - self.lastGeneration == 1
+
+        for lineIndex in range(0, lineCount):
+            if useChangeFlags and not self.line_changed(lineIndex):
+                continue
+            line = self.build_line(lineIndex)
+            previousLine = self.lines[lineIndex]
+            if previousLine == line:
+                continue
+            self.lines[lineIndex] = line
+            if previousLine is None:
+                output.append(TerminalRenderer.move_cursor(lineIndex, 0) + line)
+                continue
+            # Only write runs of changed characters
+            column = 0
+            while column < len(line):
+                if line[column] == previousLine[column]:
+                    column += 1
+                    continue
+                start = column
+                while column < len(line) and line[column] != previousLine[column]:
+                    column += 1
+                output.append(TerminalRenderer.move_cursor(lineIndex, start) + line[start:column])
+
+        # Heads-up display
+        output.append(TerminalRenderer.move_cursor(lineCount, 0))
+        for hudLine in game.get_hud_lines():
+            output.append('\n' + hudLine + '\x1b[K')
+
+        sys.stdout.write(''.join(output))
+        sys.stdout.flush()
+        self.lastGeneration = game.generation
+        self.lastViewport = viewport
+
+
+########################################################
+# Scheduling
+########################################################
+
+class SimulationThread(threading.Thread):
+    """Advances the grid in the background, independent of drawing
+    """
+    def __init__(self, game: 'GameOfLife', step: int=0, rate: float=0.0):
+        super().__init__(daemon=True)
+        self.game = game
+        self.step = step
+        self.rate = rate
+        self.stopping = False
+        # Held while a generation is computed
+        self.lock = threading.Lock()
+        self.mayRun = threading.Event()
+        self.mayRun.set()
+        # Set when a step pause is reached, and when it is over
+        self.stepReached = threading.Event()
+        self.stepContinue = threading.Event()
+        self.pausedGeneration = None
+        # Set when the simulation ended by itself
+        self.finished = threading.Event()
+
+    def run(self):
+        nextStepTime = time.monotonic()
+        while not self.stopping:
+            self.mayRun.wait()
+            with self.lock:
+                if self.stopping:
+                    break
+                generation = self.game.generation
+                reachedStep = self.step and generation % self.step == 0 and generation != self.pausedGeneration
+                if not reachedStep:
+                    self.game.advance_grid()
+                    if self.game.stopped_on_cycle():
+                        self.finished.set()
+                        break
+            if reachedStep:
+                self.pausedGeneration = generation
+                self.stepReached.set()
+                self.stepContinue.wait()
+                self.stepContinue.clear()
+                nextStepTime = time.monotonic()
+            elif self.rate > 0.0:
+                nextStepTime += 1.0 / self.rate
+                delay = nextStepTime - time.monotonic()
+                if delay > 0.0:
+                    time.sleep(delay)
+                else:
+                    nextStepTime = time.monotonic()
+
+    @contextlib.contextmanager
+    def paused(self):
+        """Wait until the current generation is finished, and keep the
+        simulation paused while in this context
+        """
+        self.mayRun.clear()
+        with self.lock:
+            yield
+        self.mayRun.set()
+
+    def continue_step(self, step: int):
+        """Continue after a step pause
+        """
+        self.step = step
+        self.stepReached.clear()
+        self.stepContinue.set()
+
+    def stop(self):
+        """Stop the simulation and wait for the thread to end
+        """
+        self.stopping = True
+        self.mayRun.set()
+        self.stepContinue.set()
+        self.join()
 
 
 class GameOfLife:
@@ -20,7 +3580,19 @@ class GameOfLife:
         self.initMethods = {
             'random': self.fill_grid_random,
             'shape': self.fill_grid_shape,
-            'checkerboard': self.fill_grid_checkerboard
+            'checkerboard': self.fill_grid_checkerboard,
+            'blocks': self.fill_grid_blocks,
+            'repeat': self.fill_grid_repeat
+        }
+        self.engines = {
+            'python': ListEngine,
+            'active': ActiveEngine,
+            'numpy': NumpyEngine,
+            'bitpacked': BitEngine,
+            'tiled': TileEngine,
+            'chunked': ChunkedEngine,
+            'hashlife': HashLifeEngine,
+            'sparse': SparseEngine
         }
         self.initialized = False
         self.gridWidth = 0
@@ -28,42 +3600,137 @@ class GameOfLife:
         self.numGridCells = 0
         self.sleepTime = 0.0
         self.generation = 0
+        self.jump = 1
         self.randomThreshold = 0.0
         self.seed = 0
         self.wrap = False
+        self.follow = False
+        self.viewportX = 0
+        self.viewportY = 0
         self.lastCalculationTime = 0.0
+        self.profiler = None
+        self.decoupled = False
+        self.simRate = 0.0
+        self.simRateLimit = 0.0
+        self.renderRate = 0.0
+        self.checkpointEvery = 0
+        self.checkpointFilename = ''
+        self.checkpointCompression = ''
+        self.exportEvery = 0
+        self.exporter = None
+        self.stats = None
+        self.stopOnCycle = False
+        self.cycleHistorySize = 0
+        self.gridHash = None
+        self.hashHistory = {}
+        self.hashGenerations = collections.deque()
+        self.cycle = None
         self.initMethod = ''
         self.fillshape = ''
         self.shapeFilename = ''
-        self.grid = []
-        self.changeGrid = []
-        self.ruleSet = ''
-        self.ruleSetValSurvive = ''
-        self.ruleSetValBirth = ''
+        self.blockSize = 1
+        self.repeatGap = 0
+        self.engineName = ''
+        self.engine = None
+        self.renderer = None
+        self.ruleSetString = ''
+        self.rule = None
 
     def init(self, settings: dict):
-        """Get settings from dictionary, initialize grid
+        """Get settings from dictionary, initialize grid.
+        When resuming, size, rules, wrap and seed are taken from the checkpoint file.
         """
+        if settings['resume']:
+            checkpoint = CheckpointFile(settings['resume'])
+            settings = dict(settings,
+                            resolution=(checkpoint.width, checkpoint.height),
+                            ruleset=checkpoint.rule,
+                            wrap=checkpoint.wrap,
+                            randomseed=int(checkpoint.seed) if checkpoint.seed.is_integer() else checkpoint.seed)
+            checkpoint.close()
         self.initMethod = settings['initmethod']
         self.gridWidth = settings['resolution'][0]
         self.gridHeight = settings['resolution'][1]
         self.numGridCells = self.gridWidth * self.gridHeight
         self.sleepTime = 1.0 / settings['fps']
         self.generation = 0
+        self.jump = settings['jump']
         self.randomThreshold = settings['randomthreshold']
         self.seed = settings['randomseed']
         self.wrap = settings['wrap']
+        self.follow = settings['follow']
+        self.viewportX = 0
+        self.viewportY = 0
         self.lastCalculationTime = 0.0
+        self.decoupled = settings['decoupled']
+        self.simRate = 0.0
+        self.simRateLimit = settings['simrate']
+        self.renderRate = 0.0
+        self.checkpointEvery = settings['checkpointevery']
+        self.checkpointFilename = settings['checkpointfile']
+        self.checkpointCompression = settings['checkpointcompression']
+        if self.checkpointCompression not in CheckpointFile.COMPRESSIONS:
+            sys.exit('Error: Unknown checkpoint compression "' + self.checkpointCompression + '"! (Available: ' +
+                     ', '.join(CheckpointFile.COMPRESSIONS) + ')')
+        self.stopOnCycle = settings['stoponcycle']
+        self.cycleHistorySize = 0
+        self.gridHash = None
+        self.cycle = None
+        if self.stopOnCycle:
+            self.enable_cycle_detection(settings['cyclehistory'])
         self.fillshape = settings['fillshape']
         self.shapeFilename = settings['shapefile']
-        self.grid = GameOfLife.new_grid(self.gridWidth, self.gridHeight)
-        self.changeGrid = GameOfLife.new_grid(
-            self.gridWidth, self.gridHeight, defaultValue=True)
+        self.blockSize = settings['blocksize']
+        self.repeatGap = settings['repeatgap']
+        if self.blockSize < 1:
+            sys.exit('Error: The block size must be at least 1!')
         # Ruleset parser
-        self.ruleSet, self.ruleSetValSurvive, self.ruleSetValBirth = GameOfLife.parse_ruleset(
-            settings['ruleset'])
+        self.ruleSetString = settings['ruleset']
+        self.rule = GameOfLife.parse_ruleset(settings['ruleset'])
+        # Engine
+        self.engineName = settings['engine']
+        if self.engineName not in self.engines:
+            sys.exit('Error: Unknown engine "' + self.engineName + '"! (Available: ' +
+                     ', '.join(self.engines.keys()) + ')')
+        self.engine = self.engines[self.engineName](
+            self.gridWidth, self.gridHeight, self.wrap, self.rule)
+        self.engine.configure(settings)
+        self.profiler = None
+        if settings['profile']:
+            self.enable_profiling()
+        self.stats = None
+        if settings['stats']:
+            self.enable_stats(settings['statshistory'], settings['stats'])
+        # Renderer
+        if settings['renderer'] == 'ansi':
+            self.renderer = TerminalRenderer(self, halfBlocks=settings['halfblocks'])
+        elif settings['renderer'] == 'plain':
+            self.renderer = None
+        else:
+            sys.exit('Error: Unknown renderer "' + settings['renderer'] + '"! (Available: ansi, plain)')
+        # Exporter
+        self.exportEvery = settings['exportevery']
+        self.exporter = None
+        if settings['export']:
+            if self.exportEvery < 1:
+                sys.exit('Error: The export interval must be at least 1!')
+            self.exporter = Exporter(settings['exportdir'], settings['export'].split(','),
+                                     scale=settings['exportscale'], delay=max(1, round(100 / settings['fps'])),
+                                     imageWidth=self.gridWidth, imageHeight=self.gridHeight)
+            self.exporter.start()
         self.initialized = True
 
+    def close(self):
+        """Finish the export and release resources held by the engine
+        """
+        if self.exporter is not None:
+            self.exporter.close()
+            self.exporter = None
+        if self.stats is not None:
+            self.stats.close()
+        if self.engine is not None:
+            self.engine.close()
+
 ########################################################
 # Conversion
 ########################################################
@@ -81,6 +3748,19 @@ class GameOfLife:
         """
         return (i % self.gridWidth, i / self.gridWidth)
 
+    def engine_coord(self, coord: tuple[int, int]) -> tuple[int, int]:
+        """Convert XY coordinates to coordinates for the engine,
+        return None if the cell is outside of the grid
+        """
+        if self.engine.unbounded:
+            return coord
+        if self.wrap:
+            x, y = coord
+            return (x % self.gridWidth, y % self.gridHeight)
+        if self.is_inside_grid(coord):
+            return coord
+        return None
+
 ########################################################
 # Get / Set
 ########################################################
@@ -88,117 +3768,259 @@ class GameOfLife:
     def get_cell(self, coord: tuple[int, int]) -> bool:
         """Get the value of a cell
         """
-        if self.wrap:
-            return self.grid[self.coord_to_index(coord)]
-        else:
-            if self.is_inside_grid(coord):
-                return self.grid[self.coord_to_index(coord)]
+        engineCoord = self.engine_coord(coord)
+        if engineCoord is None:
             return False
+        return self.engine.get_cell(*engineCoord)
 
     def get_cell_changed(self, coord: tuple[int, int]) -> bool:
         """Look up if the value of a cell has changed in the last advance() call
         """
-        if self.wrap:
-            return self.changeGrid[self.coord_to_index(coord)]
-        else:
-            if self.is_inside_grid(coord):
-                return self.changeGrid[self.coord_to_index(coord)]
+        engineCoord = self.engine_coord(coord)
+        if engineCoord is None:
             return False
+        return self.engine.get_cell_changed(*engineCoord)
 
     def set_cell(self, coord: tuple[int, int], value: bool):
         """Set value of a cell
         """
-        if self.is_inside_grid(coord) or self.wrap:
-            cellIndex = self.coord_to_index(coord)
-            currentValue = self.grid[cellIndex]
-            if currentValue != value:
-                self.grid[cellIndex] = value
-                self.changeGrid[cellIndex] = True
-            else:
-                self.changeGrid[cellIndex] = False
+        engineCoord = self.engine_coord(coord)
+        if engineCoord is not None:
+            self.engine.set_cell(*engineCoord, value)
+
+    def set_run(self, coord: tuple[int, int], length: int, value: bool):
+        """Set value of a horizontal run of cells, starting at coord
+        """
+        x, y = coord
+        if self.engine.unbounded:
+            self.engine.set_run(x, y, length, value)
+        elif self.wrap:
+            x = x % self.gridWidth
+            y = y % self.gridHeight
+            length = min(length, self.gridWidth)
+            while length > 0:
+                partLength = min(length, self.gridWidth - x)
+                self.engine.set_run(x, y, partLength, value)
+                length -= partLength
+                x = 0
+        elif 0 <= y < self.gridHeight:
+            start = max(x, 0)
+            end = min(x + length, self.gridWidth)
+            if start < end:
+                self.engine.set_run(start, y, end - start, value)
+
+    def stamp_pattern(self, pattern: Pattern, positions, rotation: int=0, flip: bool=False, drawDead: bool=False):
+        """Stamp copies of a pattern with their upper left corners at the given
+        positions, mirrored and rotated as in Pattern.transform(). All copies are
+        combined first, so every row of the grid is written only once.
+        If drawDead is set, dead cells defined by the pattern are cleared.
+        """
+        pattern = pattern.transform(rotation, flip)
+        positions = list(positions)
+        if not positions or pattern.height == 0:
+            return
+        if not self.engine.packedRows:
+            # Engines that store single cells are fastest when setting them one by one
+            cells = pattern.get_defined_cells() if drawDead else [(x, y, True) for x, y in pattern.get_cells()]
+            bounded = not self.wrap and not self.engine.unbounded
+            for x, y in positions:
+                for dx, dy, alive in cells:
+                    cellX = x + dx
+                    cellY = y + dy
+                    if self.wrap:
+                        cellX %= self.gridWidth
+                        cellY %= self.gridHeight
+                    elif bounded and not (0 <= cellX < self.gridWidth and 0 <= cellY < self.gridHeight):
+                        continue
+                    self.engine.set_cell(cellX, cellY, alive)
+            return
+        # Combined rows relative to originX, by grid row
+        originX = min(x for x, _ in positions)
+        if self.wrap:
+            originX = 0
+            positions = [(x % self.gridWidth, y) for x, y in positions]
+        gridMask = (1 << self.gridWidth) - 1
+        patternRows = [(rowIndex, pattern.rows[rowIndex], pattern.definedRows[rowIndex] if drawDead else pattern.rows[rowIndex])
+                       for rowIndex in range(0, pattern.height)]
+        patternRows = [row for row in patternRows if row[2]]
+        combined = {}
+        for x, y in positions:
+            shift = x - originX
+            fold = self.wrap and shift + pattern.width > self.gridWidth
+            for rowIndex, alive, defined in patternRows:
+                alive <<= shift
+                defined <<= shift
+                rowY = y + rowIndex
+                if self.wrap:
+                    rowY %= self.gridHeight
+                elif not self.engine.unbounded and not 0 <= rowY < self.gridHeight:
+                    continue
+                if fold:
+                    # Fold the parts beyond the right edge back onto the grid
+                    foldedAlive = foldedDefined = 0
+                    while defined:
+                        foldedAlive = (foldedAlive & ~(defined & gridMask)) | (alive & gridMask)
+                        foldedDefined |= defined & gridMask
+                        alive >>= self.gridWidth
+                        defined >>= self.gridWidth
+                    alive, defined = foldedAlive, foldedDefined
+                entry = combined.get(rowY)
+                if entry is None:
+                    combined[rowY] = [alive, defined]
+                elif drawDead:
+                    # Later copies overwrite earlier ones
+                    entry[0] = (entry[0] & ~defined) | alive
+                    entry[1] |= defined
+                else:
+                    entry[0] |= alive
+                    entry[1] |= defined
+
+        rows = []
+        for rowY, (alive, defined) in combined.items():
+            left = originX
+            if not self.wrap and not self.engine.unbounded:
+                # Clip at the edges of the grid
+                if left < 0:
+                    alive >>= -left
+                    defined >>= -left
+                    left = 0
+                alive &= gridMask >> left
+                defined &= gridMask >> left
+            if defined:
+                rows.append((rowY, left, alive, defined))
+        self.engine.stamp_rows(rows)
+
+########################################################
+# Viewport
+########################################################
+
+    def set_viewport(self, coord: tuple[int, int]):
+        """Set the upper left corner of the visible part of an unbounded grid
+        """
+        if self.engine.unbounded:
+            self.viewportX, self.viewportY = coord
+
+    def get_bounding_box(self) -> tuple[int, int, int, int]:
+        """Get the rectangle (left, top, right, bottom) around all living cells,
+        right and bottom are exclusive. Returns None if there are no living cells.
+        """
+        return self.engine.get_bounding_box()
+
+    def center_viewport(self):
+        """Center the viewport on the living cells
+        """
+        boundingBox = self.get_bounding_box()
+        if boundingBox is not None:
+            left, top, right, bottom = boundingBox
+            self.set_viewport(((left + right - self.gridWidth) // 2, (top + bottom - self.gridHeight) // 2))
+
+    def count_alive_in_viewport(self) -> int:
+        """Count all living cells in the visible part of the grid
+        """
+        return self.engine.count_alive_in(self.viewportX, self.viewportY,
+                                          self.viewportX + self.gridWidth, self.viewportY + self.gridHeight)
 
 ########################################################
 # Fill grid
 ########################################################
 
+    def fill_grid_rows(self, rows):
+        """Fill the grid row by row from integers, bit x of a row is cell x.
+        The rows are written directly into the storage of the engine.
+        """
+        stride = (self.gridWidth + 7) // 8
+        for y, bits in enumerate(rows):
+            self.engine.set_packed_row(y, bits.to_bytes(stride, 'little'), 0, self.gridWidth)
+
+    @staticmethod
+    def random_row_bits(generator: random.Random, width: int, threshold: float) -> int:
+        """Get a row of random bits, each one set with the probability threshold.
+        Every set bit of the threshold (32 bits precision) combines one random word
+        with the result, from the lowest bit up: OR for 1 bits and AND for 0 bits.
+        """
+        probability = min(max(round(threshold * (1 << 32)), 0), 1 << 32)
+        if probability == 0:
+            return 0
+        if probability == 1 << 32:
+            return (1 << width) - 1
+        precision = 32
+        while not probability & 1:
+            probability >>= 1
+            precision -= 1
+        bits = 0
+        for _ in range(0, precision):
+            bits = (bits | generator.getrandbits(width)) if probability & 1 else (bits & generator.getrandbits(width))
+            probability >>= 1
+        return bits
+
+    @staticmethod
+    def pattern_row_bits(pattern: str, offset: int, width: int) -> int:
+        """Repeat a pattern of '0' and '1' characters over a row, starting
+        with the character at offset, and convert it to bits
+        """
+        repeats = (offset + width) // len(pattern) + 1
+        return int((pattern * repeats)[offset:offset + width][::-1] or '0', 2)
+
     def fill_grid_random(self):
-        """Fill grid randomly
+        """Fill grid randomly, a whole row at once. The grid only
+        depends on the seed, the threshold and the grid width.
         """
-        random.seed(self.seed)
-        for y in range(0, self.gridHeight):
-            for x in range(0, self.gridWidth):
-                tIndex = self.coord_to_index((x, y))
-                if random.random() < self.randomThreshold:
-                    self.grid[tIndex] = True
-                else:
-                    self.grid[tIndex] = False
+        generator = random.Random(self.seed)
+        self.fill_grid_rows(GameOfLife.random_row_bits(generator, self.gridWidth, self.randomThreshold)
+                            for _ in range(0, self.gridHeight))
+
+    # Built-in shapes as offsets of their living cells from the center
+    SHAPE_CELLS = {
+        'double-u': [(-1, -1), (-1, -2), (-1, -3), (0, -3), (1, -3), (1, -2), (1, -1),
+                     (-1, 1), (-1, 2), (-1, 3), (0, 3), (1, 3), (1, 2), (1, 1)],
+        'r-pentomino': [(0, 0), (-1, 0), (0, 1), (0, -1), (1, -1)],
+        'f': [(0, 0), (0, -1), (0, -2), (0, -3), (-1, -3), (1, -3), (0, -4), (0, -5),
+              (0, -6), (1, -6), (2, -6), (-1, -6), (-2, -6)],
+        'line': [(dx, 0) for dx in range(-23, 23)]
+    }
 
     def draw_shape(self, coord: tuple[int, int], shape: str, drawDeadFiledata: bool=True):
+        """Draw a built-in shape, or the shape file if shape is "file", centered on coord
+        """
+        if shape == 'file':
+            if os.path.splitext(self.shapeFilename)[1].lower() == '.rle' and os.path.isfile(self.shapeFilename) and \
+               os.path.getsize(self.shapeFilename) > STREAM_PATTERN_SIZE:
+                self.stream_rle_file(coord, self.shapeFilename, drawDeadFiledata)
+            else:
+                self.draw_pattern(coord, Pattern.load(self.shapeFilename), drawDeadFiledata)
+        elif shape in GameOfLife.SHAPE_CELLS:
+            cells = GameOfLife.SHAPE_CELLS[shape]
+            x, y = coord
+            self.stamp_pattern(Pattern.from_cells(cells),
+                               [(x + min(dx for dx, _ in cells), y + min(dy for _, dy in cells))])
+
+    def draw_pattern(self, coord: tuple[int, int], pattern: Pattern, drawDeadFiledata: bool=True):
+        """Draw a pattern centered on coord, unless the pattern file defines an offset to coord
+        """
+        x, y = coord
+        if pattern.offset is not None:
+            position = (x + pattern.offset[0], y + pattern.offset[1])
+        else:
+            position = (x - pattern.width // 2, y - pattern.height // 2)
+        self.stamp_pattern(pattern, [position], drawDead=drawDeadFiledata)
+
+    def stream_rle_file(self, coord: tuple[int, int], filename: str, drawDeadFiledata: bool=True):
+        """Draw an RLE file run by run while it is read, placed like draw_pattern().
+        Unlike a Pattern, this never holds the whole shape in memory, but runs
+        are written one at a time and nothing is cached.
+        """
         x, y = coord
-        # Double-U
-        if shape == 'double-u':
-            # Upper U
-            self.set_cell((x - 1, y - 1), True)
-            self.set_cell((x - 1, y - 2), True)
-            self.set_cell((x - 1, y - 3), True)
-            self.set_cell((x, y - 3), True)
-            self.set_cell((x + 1, y - 3), True)
-            self.set_cell((x + 1, y - 2), True)
-            self.set_cell((x + 1, y - 1), True)
-
-            # Lower U
-            self.set_cell((x - 1, y + 1), True)
-            self.set_cell((x - 1, y + 2), True)
-            self.set_cell((x - 1, y + 3), True)
-            self.set_cell((x, y + 3), True)
-            self.set_cell((x + 1, y + 3), True)
-            self.set_cell((x + 1, y + 2), True)
-            self.set_cell((x + 1, y + 1), True)
-        # R-Pentomino
-        elif shape == 'r-pentomino':
-            self.set_cell((x, y), True)
-            self.set_cell((x - 1, y), True)
-            self.set_cell((x, y + 1), True)
-            self.set_cell((x, y - 1), True)
-            self.set_cell((x + 1, y - 1), True)
-        # F
-        elif shape == 'f':
-            self.set_cell((x, y), True)
-            self.set_cell((x, y - 1), True)
-            self.set_cell((x, y - 2), True)
-            self.set_cell((x, y - 3), True)
-            self.set_cell((x - 1, y - 3), True)
-            self.set_cell((x + 1, y - 3), True)
-            self.set_cell((x, y - 4), True)
-            self.set_cell((x, y - 5), True)
-            self.set_cell((x, y - 6), True)
-            self.set_cell((x + 1, y - 6), True)
-            self.set_cell((x + 2, y - 6), True)
-            self.set_cell((x - 1, y - 6), True)
-            self.set_cell((x - 2, y - 6), True)
-        # Line
-        elif shape == 'line':
-            lineLength = 20
-            for x1 in range(x - lineLength, x + lineLength):
-                self.set_cell((x1, y), True)
-                self.set_cell((x1 - 1, y), True)
-                self.set_cell((x1 - 2, y), True)
-                self.set_cell((x1 - 3, y), True)
-                self.set_cell((x1 + 1, y), True)
-                self.set_cell((x1 + 2, y), True)
-                self.set_cell((x1 + 3, y), True)
-        # Load shape from file
-        elif shape == 'file':
-            shapeData = GameOfLife.load_shape_data(self.shapeFilename)
-            offsetX = int(len(shapeData[0]) / 2)
-            offsetY = int(len(shapeData) / 2)
-            for target_y, shapeLine in enumerate(shapeData):
-                for target_x, char in enumerate(shapeLine):
-                    if char == 'o':
-                        self.set_cell(
-                            (x - offsetX + target_x, y - offsetY + target_y), True)
-                    elif char == '.' and drawDeadFiledata:
-                        self.set_cell((x + target_x, y + target_y), False)
+        with open(filename, 'r') as dataFile:
+            reader = RleReader(dataFile)
+            if reader.offset is not None:
+                originX = x + reader.offset[0]
+                originY = y + reader.offset[1]
+            else:
+                originX = x - reader.width // 2
+                originY = y - reader.height // 2
+            for runX, runY, length, state in reader.runs():
+                if state == 1 or drawDeadFiledata:
+                    self.set_run((originX + runX, originY + runY), length, state == 1)
 
     def fill_grid_shape(self):
         """Put double U shape in center of grid
@@ -207,19 +4029,254 @@ class GameOfLife:
             (int(self.gridWidth / 2), int(self.gridHeight / 2)), self.fillshape)
 
     def fill_grid_checkerboard(self, size: int=1):
-        """Fill grid with small checkers
+        """Fill grid with small checkers, alternating runs of size cells
+        along the cell indices
         """
-        for y in range(0, self.gridHeight):
-            for x in range(0, self.gridWidth):
-                cellIndex = self.coord_to_index((x, y))
-                self.grid[cellIndex] = True if (
-                    (cellIndex / size) % 2 == 0) else False
+        pattern = '1' * size + '0' * size
+        self.fill_grid_rows(GameOfLife.pattern_row_bits(pattern, (self.gridWidth * y) % len(pattern), self.gridWidth)
+                            for y in range(0, self.gridHeight))
+
+    def fill_grid_blocks(self):
+        """Fill grid with a checkerboard of square blocks of the block size
+        """
+        size = self.blockSize
+        patterns = ('1' * size + '0' * size, '0' * size + '1' * size)
+        self.fill_grid_rows(GameOfLife.pattern_row_bits(patterns[(y // size) % 2], 0, self.gridWidth)
+                            for y in range(0, self.gridHeight))
+
+    def fill_grid_repeat(self):
+        """Fill grid with copies of the shape file, separated by the repeat gap.
+        Copies that do not fit into the grid completely are left out.
+        """
+        pattern = Pattern.load(self.shapeFilename)
+        if pattern.width == 0 or pattern.height == 0:
+            sys.exit('Error: The shape file ' + self.shapeFilename + ' contains no cells!')
+        periodX = pattern.width + self.repeatGap
+        periodY = pattern.height + self.repeatGap
+        copiesX = (self.gridWidth + self.repeatGap) // periodX
+        copiesY = (self.gridHeight + self.repeatGap) // periodY
+        # Multiplying a row with this puts copies side by side, they do not overlap
+        copies = sum(1 << (periodX * i) for i in range(0, copiesX))
+        rowBits = [row * copies for row in pattern.rows] + [0] * self.repeatGap
+        self.fill_grid_rows(rowBits[y % periodY] if y < copiesY * periodY else 0
+                            for y in range(0, self.gridHeight))
 
     def fill_grid(self):
         """Fill the grid using one of the available methods
         """
         self.initMethods[self.initMethod]()
 
+########################################################
+# Checkpoints
+########################################################
+
+    def save_checkpoint(self, filename: str, compression: str='zlib'):
+        """Save the grid and generation to a binary checkpoint file.
+        Unbounded engines only save the area around the living cells,
+        multi-state rules also save the dying cells.
+        """
+        if self.engine.unbounded:
+            boundingBox = self.get_bounding_box()
+            left, top, right, bottom = boundingBox if boundingBox is not None else (0, 0, 0, 0)
+        else:
+            left, top, right, bottom = 0, 0, self.gridWidth, self.gridHeight
+        info = {
+            'width': self.gridWidth,
+            'height': self.gridHeight,
+            'wrap': self.wrap,
+            'generation': self.generation,
+            'seed': self.seed,
+            'rule': self.ruleSetString,
+            'left': left,
+            'top': top,
+            'areaWidth': right - left,
+            'areaHeight': bottom - top,
+            'viewportX': self.viewportX,
+            'viewportY': self.viewportY,
+            'cellBits': 8 if self.rule.states > 2 else 1
+        }
+        if self.rule.states > 2:
+            rows = (self.engine.get_state_row(y, left, right - left) for y in range(top, bottom))
+        else:
+            rows = (self.engine.get_packed_row(y, left, right - left) for y in range(top, bottom))
+        CheckpointFile.write(filename, info, rows, compression)
+
+    def load_checkpoint(self, filename: str):
+        """Load the grid and generation from a binary checkpoint file.
+        The grid must have the size, rules and wrap mode stored in the file.
+        """
+        checkpoint = CheckpointFile(filename)
+        try:
+            if (checkpoint.width, checkpoint.height, checkpoint.wrap) != (self.gridWidth, self.gridHeight, self.wrap):
+                sys.exit('Error: Checkpoint ' + filename + ' was saved with a different resolution or wrap setting!')
+            if GameOfLife.parse_ruleset(checkpoint.rule).name != self.rule.name:
+                sys.exit('Error: Checkpoint ' + filename + ' was saved with different rules!')
+            if not self.engine.unbounded and checkpoint.areaHeight > 0 and \
+               (checkpoint.left < 0 or checkpoint.top < 0 or
+                checkpoint.left + checkpoint.areaWidth > self.gridWidth or
+                checkpoint.top + checkpoint.areaHeight > self.gridHeight):
+                sys.exit('Error: The cells of checkpoint ' + filename + ' do not fit into the grid!')
+            for y, row in enumerate(checkpoint.rows(), checkpoint.top):
+                if checkpoint.cellBits == 8:
+                    self.engine.set_state_row(y, row, checkpoint.left, checkpoint.areaWidth)
+                else:
+                    self.engine.set_packed_row(y, row, checkpoint.left, checkpoint.areaWidth)
+            self.generation = checkpoint.generation
+            self.set_viewport((checkpoint.viewportX, checkpoint.viewportY))
+        finally:
+            checkpoint.close()
+
+########################################################
+# Export
+########################################################
+
+    def export_frame(self):
+        """Hand the current generation to the exporter. Only the rows are
+        copied here, they are encoded in the exporter thread. Images show the
+        viewport, snapshots of unbounded grids the area around all living cells.
+        """
+        if self.exporter.error is not None:
+            # The export failed, only count the frame
+            self.exporter.framesSubmitted += 1
+            return
+        frame = {'generation': self.generation, 'rule': self.rule.name}
+        if self.exporter.needsImage:
+            frame['imageWidth'] = self.gridWidth
+            frame['imageRows'] = [self.engine.get_packed_row(self.viewportY + y, self.viewportX, self.gridWidth)
+                                  for y in range(0, self.gridHeight)]
+        if self.exporter.needsPattern:
+            if self.engine.unbounded:
+                boundingBox = self.get_bounding_box()
+                left, top, right, bottom = boundingBox if boundingBox is not None else (0, 0, 0, 0)
+            else:
+                left, top, right, bottom = 0, 0, self.gridWidth, self.gridHeight
+            frame['patternWidth'] = right - left
+            frame['patternRows'] = [self.engine.get_packed_row(y, left, right - left) for y in range(top, bottom)]
+            # Relative to the center of the grid, where shape files are drawn
+            frame['offset'] = (left - int(self.gridWidth / 2), top - int(self.gridHeight / 2))
+        self.exporter.submit(frame)
+
+########################################################
+# Profiling
+########################################################
+
+    def enable_profiling(self):
+        """Start collecting phase timings and counters, see get_profile()
+        """
+        self.profiler = Profiler()
+        self.engine.profiler = self.profiler
+
+    def measure(self, phase: str):
+        """Time a phase of the main loop, if profiling is enabled
+        """
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.measure(phase)
+
+    def enable_stats(self, historySize: int=DEFAULT_STATS_HISTORY, filename: str=''):
+        """Record the population, births, deaths and bounding box of every
+        step, see get_stats_history(). All rows are written to a CSV file
+        if a filename is given.
+        """
+        if historySize < 1:
+            sys.exit('Error: The stats history must be at least 1!')
+        self.stats = StatsRecorder(historySize, filename)
+
+    def get_stats_history(self) -> list[dict]:
+        """Get the most recent rows of the generation statistics,
+        None if they are not recorded
+        """
+        if self.stats is None:
+            return None
+        return self.stats.get_history()
+
+    def get_profile(self) -> dict:
+        """Get the collected timings and counters together with the
+        grid settings they were measured with, None if profiling is disabled
+        """
+        if self.profiler is None:
+            return None
+        profile = {
+            'engine': self.engineName,
+            'width': self.gridWidth,
+            'height': self.gridHeight,
+            'wrap': self.wrap,
+            'rule': self.rule.name,
+            'jump': self.jump,
+            'generation': self.generation,
+            'population': self.count_alive()
+        }
+        profile.update(self.profiler.get_stats())
+        profile['engineStats'] = self.engine.get_stats()
+        return profile
+
+    def save_profile(self, filename: str):
+        """Write the collected timings and counters to a JSON file
+        """
+        with open(filename, 'w') as profileFile:
+            json.dump(self.get_profile(), profileFile, indent=2)
+
+########################################################
+# Cycle detection
+########################################################
+
+    def enable_cycle_detection(self, historySize: int=DEFAULT_CYCLE_HISTORY):
+        """Hash every generation, and remember the hashes of the last
+        historySize generations to detect static and periodic grids
+        """
+        if historySize < 1:
+            sys.exit('Error: The cycle history must hold at least one generation!')
+        self.cycleHistorySize = historySize
+        self.gridHash = None
+        self.cycle = None
+
+    def reset_cycle_detection(self):
+        """Forget the history and hash the current grid from scratch.
+        Needs to be called after cells were set directly.
+        """
+        self.gridHash = self.engine.get_hash()
+        self.hashHistory = {}
+        self.hashGenerations = collections.deque()
+        self.cycle = None
+        self.record_hash()
+
+    def record_hash(self):
+        """Look up the hash of the current generation in the history, then add it
+        """
+        firstGeneration = self.hashHistory.get(self.gridHash)
+        if firstGeneration is not None:
+            if self.cycle is None:
+                self.cycle = (firstGeneration, self.generation - firstGeneration)
+            return
+        self.hashHistory[self.gridHash] = self.generation
+        self.hashGenerations.append((self.generation, self.gridHash))
+        if len(self.hashGenerations) > self.cycleHistorySize:
+            _, gridHash = self.hashGenerations.popleft()
+            del self.hashHistory[gridHash]
+
+    def update_cycle_detection(self):
+        """Update the grid hash after a generation was computed. Only the
+        cells that changed are hashed, unless several generations were skipped
+        or the rule has dying states.
+        """
+        if self.jump == 1 and self.rule.states == 2:
+            self.gridHash ^= self.engine.get_changed_hash()
+        else:
+            self.gridHash = self.engine.get_hash()
+        self.record_hash()
+
+    def get_cycle(self) -> tuple[int, int]:
+        """Get (first generation, period) once the grid repeats itself, otherwise None.
+        A period of 1 means the grid became static. With a jump, the period is a
+        multiple of the jump. Cycles longer than the history are not detected.
+        """
+        return self.cycle
+
+    def stopped_on_cycle(self) -> bool:
+        """Return True if the run should end, because a cycle was found
+        """
+        return self.stopOnCycle and self.cycle is not None
+
 ########################################################
 # Evaluation
 ########################################################
@@ -233,114 +4290,210 @@ class GameOfLife:
             return False
         return True
 
-    def count_alive_neighbors(self, coord: tuple[int, int]) -> int:
-        """Count living neighbor cells of given cell
-        """
-        # Unpack coordinates
-        x, y = coord
-
-        # Count alive neighbors
-        aliveNeighbors = 0
-        if self.get_cell((x - 1, y)):  # left
-            aliveNeighbors += 1
-        if self.get_cell((x + 1, y)):  # right
-            aliveNeighbors += 1
-        if self.get_cell((x, y - 1)):  # top
-            aliveNeighbors += 1
-        if self.get_cell((x, y + 1)):  # bottom
-            aliveNeighbors += 1
-        if self.get_cell((x - 1, y - 1)):  # top left
-            aliveNeighbors += 1
-        if self.get_cell((x + 1, y - 1)):  # top right
-            aliveNeighbors += 1
-        if self.get_cell((x - 1, y + 1)):  # bottom left
-            aliveNeighbors += 1
-        if self.get_cell((x + 1, y + 1)):  # bottom right
-            aliveNeighbors += 1
-        return aliveNeighbors
-
-    def check_cell(self, coord: tuple[int, int]) -> bool:
-        """Check a cell against the rules, return True if
-        it should be alive and False if it should be dead
-        """
-        aliveNeighbors = self.count_alive_neighbors(coord)
-        if self.get_cell(coord):
-            if aliveNeighbors in self.ruleSetValSurvive:
-                return True
-        else:
-            if aliveNeighbors in self.ruleSetValBirth:
-                return True
-        return False
-
     def count_alive(self) -> int:
         """Count all living cells on the grid
         """
-        alive = 0
-        for cell in self.grid:
-            if cell:
-                alive += 1
-        return alive
+        return self.engine.count_alive()
 
 ########################################################
 # Action
 ########################################################
 
     def advance_grid(self):
-        """Compute a new generation of the grid
+        """Compute a new generation of the grid, or skip
+        ahead by several generations if a jump is set
         """
-        timeStart = time.time()
-        tmpGrid = GameOfLife.new_grid(self.gridWidth, self.gridHeight)
-        for y in range(0, self.gridHeight):
-            for x in range(0, self.gridWidth):
-                tmpGrid[self.coord_to_index((x, y))] = self.check_cell((x, y))
-        self.grid = tmpGrid
-        self.generation += 1
-        self.lastCalculationTime = time.time() - timeStart
+        if self.cycleHistorySize > 0 and self.gridHash is None:
+            with self.measure('hash'):
+                self.reset_cycle_detection()
+        if self.exporter is not None and self.exporter.framesSubmitted == 0:
+            # Start with the generation before the first step
+            with self.measure('io'):
+                self.export_frame()
+        if self.stats is not None and self.stats.rows == 0:
+            self.stats.record(self.generation, self.engine)
+        timeStart = time.perf_counter()
+        if self.jump > 1:
+            self.engine.advance_by(self.jump)
+        else:
+            self.engine.advance()
+        self.generation += self.jump
+        self.lastCalculationTime = time.perf_counter() - timeStart
+        if self.profiler is not None:
+            self.profiler.add_time('step', self.lastCalculationTime)
+            self.profiler.record_generations(self.generation, self.jump,
+                                             self.engine.cellsEvaluated, self.engine.count_changed())
+        if self.stats is not None:
+            with self.measure('io'):
+                self.stats.record(self.generation, self.engine)
+        if self.cycleHistorySize > 0:
+            with self.measure('hash'):
+                self.update_cycle_detection()
+        if self.checkpointEvery > 0 and \
+           self.generation // self.checkpointEvery != (self.generation - self.jump) // self.checkpointEvery:
+            with self.measure('io'):
+                self.save_checkpoint(self.checkpointFilename, self.checkpointCompression)
+        if self.exporter is not None and \
+           self.generation // self.exportEvery != (self.generation - self.jump) // self.exportEvery:
+            with self.measure('io'):
+                self.export_frame()
+        if self.follow:
+            self.center_viewport()
+
+    def get_hud_lines(self) -> list[str]:
+        """Get the lines of the heads-up display
+        """
+        return ['',
+                ('Generation: ' + str(self.generation)).ljust(HUD_COL_WIDTH) +
+                ('Alive: ' + str(self.count_alive())).ljust(HUD_COL_WIDTH) +
+                ('Calc time: ' +
+                 '{:0.4f}'.format(self.lastCalculationTime) + ' sec').ljust(HUD_COL_WIDTH) +
+                ('Resolution: ' + str(self.gridWidth) + 'x' + str(self.gridHeight)).ljust(HUD_COL_WIDTH) +
+                (('Sim: ' + '{:0.1f}'.format(self.simRate) + ' gen/s').ljust(HUD_COL_WIDTH) if self.renderRate > 0.0 else '') +
+                (('Render: ' + '{:0.1f}'.format(self.renderRate) + ' fps').ljust(HUD_COL_WIDTH) if self.renderRate > 0.0 else '') +
+                (('Viewport: ' + str(self.viewportX) + ', ' + str(self.viewportY)).ljust(HUD_COL_WIDTH) if self.engine.unbounded else '') +
+                (('Cycle: ' + GameOfLife.describe_cycle(self.cycle)).ljust(HUD_COL_WIDTH) if self.cycle is not None else ''),
+                ('Engine: ' + self.engineName).ljust(HUD_COL_WIDTH) +
+                ('Init method: ' + self.initMethod).ljust(HUD_COL_WIDTH) +
+                (('Seed: ' + (str(self.seed) if self.seed != 0 else '(random)')).ljust(HUD_COL_WIDTH) if self.initMethod == 'random' else '') +
+                (('Threshold: ' + str(self.randomThreshold)).ljust(HUD_COL_WIDTH) if self.initMethod == 'random' else '') +
+                (('Shape: ' + str(self.fillshape)).ljust(HUD_COL_WIDTH) if self.initMethod == 'shape' else '') +
+                (('Block size: ' + str(self.blockSize)).ljust(HUD_COL_WIDTH) if self.initMethod == 'blocks' else '') +
+                (('Shape: ' + os.path.basename(self.shapeFilename)).ljust(HUD_COL_WIDTH) if self.initMethod == 'repeat' else '') +
+                ('Rules: ' + self.rule.name).ljust(HUD_COL_WIDTH)] + \
+               ([self.profiler.get_hud_line() + self.engine.describe_stats()] if self.profiler is not None else []) + \
+               ['',
+                'Press CTRL+C to quit!']
 
     def draw(self):
         """Draw the grid to the screen
         """
-        bufferStr = ''
+        gridLines = ['']
         for y in range(0, self.gridHeight):
-            gridLine = ''
-            for x in range(0, self.gridWidth):
-                gridIndex = self.coord_to_index((x, y))
-                gridLine += u'\u2588' if self.grid[gridIndex] else u' '
-            bufferStr = bufferStr + '\n' + gridLine
-        print(bufferStr)
-        print('\n' +
-              ('Generation: ' + str(self.generation)).ljust(HUD_COL_WIDTH) +
-              ('Alive: ' + str(self.count_alive())).ljust(HUD_COL_WIDTH) +
-              ('Calc time: ' +
-               '{:0.4f}'.format(self.lastCalculationTime) + ' sec').ljust(HUD_COL_WIDTH) +
-              ('Resolution: ' + str(self.gridWidth) + 'x' + str(self.gridHeight)).ljust(HUD_COL_WIDTH) +
-              '\n' +
-              ('Init method: ' + self.initMethod).ljust(HUD_COL_WIDTH) +
-              (('Seed: ' + (str(self.seed) if self.seed != 0 else '(random)')).ljust(HUD_COL_WIDTH) if self.initMethod == 'random' else '') +
-              (('Threshold: ' + str(self.randomThreshold)).ljust(HUD_COL_WIDTH) if self.initMethod == 'random' else '') +
-              (('Shape: ' + str(self.fillshape)).ljust(HUD_COL_WIDTH) if self.initMethod == 'shape' else '') +
-              ('Rules: ' + (self.ruleSet if self.ruleSet != 'p' else (''.join(str(x)
-                                                                              for x in self.ruleSetValSurvive) + '/' + ''.join(str(x) for x in self.ruleSetValBirth)))).ljust(HUD_COL_WIDTH)
-              )
-        print('\nPress CTRL+C to quit!')
+            gridLines.append(''.join([u'\u2588' if cell else u' ' for cell in
+                                      self.engine.get_row(self.viewportY + y, self.viewportX, self.gridWidth)]))
+        print('\n'.join(gridLines + self.get_hud_lines()))
 
-    def run(self, step=0):
-        GameOfLife.clear_screen()
-        self.draw()
-        while True:
-            if step and (self.generation % step == 0):
+    def render_frame(self):
+        """Draw the grid with the selected renderer
+        """
+        if self.renderer is None:
+            with self.measure('clear'):
                 GameOfLife.clear_screen()
+            with self.measure('render'):
                 self.draw()
-                res = raw_input('Reached generation ' + str(self.generation) + '. Do another ' + str(
-                    step) + ' [enter], stop [n], or continue forever [c]? [enter/n/c] ').lower()
-                if res == 'n':
+        else:
+            with self.measure('render'):
+                self.renderer.render()
+
+    def run(self, step=0):
+        if self.decoupled:
+            self.run_decoupled(step)
+            return
+        if self.renderer is not None:
+            self.renderer.start()
+        try:
+            self.render_frame()
+            while True:
+                if step and (self.generation % step == 0):
+                    self.render_frame()
+                    res = input('Reached generation ' + str(self.generation) + '. Do another ' + str(
+                        step) + ' [enter], stop [n], or continue forever [c]? [enter/n/c] ').lower()
+                    if res == 'n':
+                        return
+                    if res == 'c':
+                        step = 0
+                    if self.renderer is not None:
+                        self.renderer.invalidate()
+                self.advance_grid()
+                self.render_frame()
+                if self.stopped_on_cycle():
+                    return
+                time.sleep(self.sleepTime)
+        finally:
+            if self.renderer is not None:
+                self.renderer.finish()
+
+    def run_decoupled(self, step=0):
+        """Compute generations in a background thread, and draw the
+        latest finished generation at the target frame rate
+        """
+        simulation = SimulationThread(self, step=step, rate=self.simRateLimit)
+        if self.renderer is not None:
+            self.renderer.start()
+        simulation.start()
+        try:
+            nextFrameTime = time.monotonic()
+            windowStart = nextFrameTime
+            windowGeneration = self.generation
+            windowFrames = 0
+            while True:
+                with simulation.paused():
+                    self.render_frame()
+                    generation = self.generation
+                windowFrames += 1
+
+                # Measure simulation and drawing speed separately
+                now = time.monotonic()
+                if now - windowStart >= RATE_WINDOW:
+                    self.simRate = (generation - windowGeneration) / (now - windowStart)
+                    self.renderRate = windowFrames / (now - windowStart)
+                    windowStart = now
+                    windowGeneration = generation
+                    windowFrames = 0
+
+                if simulation.finished.is_set():
+                    self.render_frame()
                     return
-                if res == 'c':
-                    step = 0
-            self.advance_grid()
-            GameOfLife.clear_screen()
-            self.draw()
-            time.sleep(self.sleepTime)
+
+                if simulation.stepReached.is_set():
+                    with simulation.paused():
+                        self.render_frame()
+                    res = input('Reached generation ' + str(self.generation) + '. Do another ' + str(
+                        step) + ' [enter], stop [n], or continue forever [c]? [enter/n/c] ').lower()
+                    if res == 'n':
+                        return
+                    if res == 'c':
+                        step = 0
+                    if self.renderer is not None:
+                        self.renderer.invalidate()
+                    simulation.continue_step(step)
+                    nextFrameTime = windowStart = time.monotonic()
+                    windowGeneration = self.generation
+                    windowFrames = 0
+                    continue
+
+                # Wait for the next frame, frames that are already late are skipped
+                nextFrameTime += self.sleepTime
+                now = time.monotonic()
+                if nextFrameTime > now:
+                    time.sleep(nextFrameTime - now)
+                else:
+                    nextFrameTime = now
+        finally:
+            simulation.stop()
+            if self.renderer is not None:
+                self.renderer.finish()
+
+    def run_headless(self, generations: int=0) -> float:
+        """Compute generations without drawing or waiting, counted from
+        the current generation, and return the time it took in seconds.
+        0 generations runs forever.
+        """
+        lastGeneration = self.generation + generations
+        timeStart = time.perf_counter()
+        while (generations == 0 or self.generation < lastGeneration) and not self.stopped_on_cycle():
+            if generations > 0 and lastGeneration - self.generation < self.jump:
+                # Shorten the last jump, so the target is not overshot
+                jump = self.jump
+                self.jump = lastGeneration - self.generation
+                try:
+                    self.advance_grid()
+                finally:
+                    self.jump = jump
+            else:
+                self.advance_grid()
+        return time.perf_counter() - timeStart
 
     @staticmethod
     def load_file_plaintext(filename: str) -> list[str]:
@@ -363,88 +4516,101 @@ class GameOfLife:
     def load_file_rle(filename: str) -> dict:
         """Load shape data from RLE (Run Length Encoded) file
         """
-        try:
-            with open(filename, 'rb') as dataFile:
-                lines = dataFile.readlines()
-        except:
-            print('Error reason from file ' + filename)
-            lines = []
-
-        rawPattern = ''
         dataDict = {
             'name' : '',
             'author': '',
             'width': 0,
             'height': 0,
             'rule': {},
-            'comments' : []
+            'comments' : [],
+            'offset': None,
+            'cells': []
         }
+        try:
+            dataFile = open(filename, 'r')
+        except OSError:
+            print('Error reason from file ' + filename)
+            return dataDict
 
-        for line in lines:
-            line = line.decode()
-            # Parse or comment lines
-            if line.startswith('#'):
-                if line.upper().startswith('#N'):
-                    # Pattern name
-                    dataDict['name'] = line.lstrip('#N ').strip(' \n\r\t')
-                elif line.upper().startswith('#C'):
-                    # Pattern comments
-                    dataDict['comments'].append(line.lstrip('#Cc ').strip(' \n\r\t'))
-                elif line.upper().startswith('#O'):
-                    # Pattern author
-                    dataDict['author'] = line.lstrip('#Oo ').strip(' \n\r\t')
-                continue
+        with dataFile:
+            reader = RleReader(dataFile)
+            resultLines = []
+            for x, y, length, state in reader.runs():
+                while len(resultLines) <= y:
+                    resultLines.append([])
+                resultLines[y].append(('o' if state == 1 else '.') * length)
 
-            # Parse meta line
-            elif ',' in line:
-                # Break up line
-                width, height, rule = line.split(',')
+        dataDict['name'] = reader.name
+        dataDict['author'] = reader.author
+        dataDict['width'] = reader.width
+        dataDict['height'] = reader.height
+        dataDict['comments'] = reader.comments
+        dataDict['offset'] = reader.offset
+        if reader.rule:
+            rule = GameOfLife.parse_ruleset(reader.rule)
+            dataDict['rule'] = { 'birth': rule.birth, 'survive': rule.survive, 'name': rule.name }
+        dataDict['cells'] = [''.join(runs) for runs in resultLines]
 
-                # Parse width and height
-                width = int(width.split('=')[1].strip())
-                height = int(height.split('=')[1].strip())
+        return dataDict
 
-                # Parse rule
-                r1, r2 = rule.split('=')[1].strip().lower().split('/')
-                if r1.startswith('b'):
-                    _, ruleSurvive, ruleBirth = GameOfLife.parse_ruleset(r2[1:] + '/' + r1[1:])
-                else:
-                    _, ruleSurvive, ruleBirth = GameOfLife.parse_ruleset(r1[1:] + '/' + r2[1:])
-                
-                dataDict['width'] = width
-                dataDict['height'] = height
-                dataDict['rule'] = { 'birth': ruleBirth, 'survive': ruleSurvive }
+    @staticmethod
+    def packed_row_string(row: bytes, width: int) -> str:
+        """Convert a bit-packed row to a string of 0 and 1 characters,
+        without the trailing dead cells
+        """
+        bits = int.from_bytes(row, 'little') & ((1 << width) - 1)
+        return '{:b}'.format(bits)[::-1] if bits else ''
 
-                continue
+    @staticmethod
+    def save_file_rle(filename: str, rows: list[bytes], width: int, name: str='', comments: list[str]=(),
+                      rule: str='', offset: tuple[int, int] = None):
+        """Save bit-packed rows to an RLE (Run Length Encoded) file
+        """
+        with open(filename, 'w') as dataFile:
+            dataFile.write(GameOfLife.encode_rle(rows, width, name, comments, rule, offset))
 
-            # Collect cell data
-            else:
-                rawPattern += line.strip(' \n\r\t')
-                
-        # Now parse collected cell data
-        patternRows = rawPattern.rstrip('!').split('$')
-        resultLines = []
-        for lineIndex, row in enumerate(patternRows):
-            tmpStr = ''
-            resultLines.append('')
-            for c in row:
-                if c.isdigit():
-                    tmpStr += c
-                else:
-                    if tmpStr == '':
-                        numCells = 1
-                    else:
-                        numCells = int(tmpStr)
-                    for _ in range(numCells):
-                        if c == 'b':
-                            resultLines[lineIndex] = resultLines[lineIndex] + '.'
-                        else:
-                            resultLines[lineIndex] = resultLines[lineIndex] + 'o'
-                    tmpStr = ''
-        
-        dataDict['cells'] = resultLines
+    @staticmethod
+    def encode_rle(rows: list[bytes], width: int, name: str='', comments: list[str]=(),
+                   rule: str='', offset: tuple[int, int] = None) -> str:
+        """Encode bit-packed rows as RLE (Run Length Encoded) text,
+        the offset is written as a #R line
+        """
+        lines = ['#N ' + name] if name else []
+        lines += ['#C ' + comment for comment in comments]
+        if offset is not None:
+            lines.append('#R ' + str(offset[0]) + ' ' + str(offset[1]))
+        lines.append('x = ' + str(width) + ', y = ' + str(len(rows)) + (', rule = ' + rule if rule else ''))
+        tokens = []
+        pendingRows = 0
+        for row in rows:
+            cells = GameOfLife.packed_row_string(row, width)
+            if cells:
+                if pendingRows:
+                    tokens.append((str(pendingRows) if pendingRows > 1 else '') + '$')
+                    pendingRows = 0
+                for run in PACKED_RUN_PATTERN.findall(cells):
+                    token = RLE_RUN_TOKENS.get(run)
+                    if token is None:
+                        token = RLE_RUN_TOKENS[run] = (str(len(run)) if len(run) > 1 else '') + \
+                            ('o' if run[0] == '1' else 'b')
+                    tokens.append(token)
+            pendingRows += 1
+        tokens.append('!')
+        # Lines of up to 70 characters, without splitting tokens
+        lines += RLE_LINE_PATTERN.findall(''.join(tokens))
+        return '\n'.join(lines) + '\n'
 
-        return dataDict
+    @staticmethod
+    def save_file_plaintext(filename: str, rows: list[bytes], width: int, name: str='', comments: list[str]=()):
+        """Save bit-packed rows to a plain text (.cells) file
+        """
+        lines = ['!Name: ' + name] if name else []
+        lines += ['!' + comment for comment in comments]
+        for row in rows:
+            # Empty lines are not read back, so empty rows keep one dead cell
+            lines.append(GameOfLife.packed_row_string(row, width).translate(PLAINTEXT_TABLE) or '.')
+        with open(filename, 'w') as dataFile:
+            dataFile.write('\n'.join(lines) + '\n')
 
     @staticmethod
     def load_shape_data(filename: str) -> list[str]:
@@ -469,27 +4635,17 @@ class GameOfLife:
         return [defaultValue] * width * height
 
     @staticmethod
-    def parse_ruleset(ruleSetString: str) -> tuple:
-        ruleSet = ruleSetString.lower()
-
-        # Catch specially named rule sets
-        if ruleSet == 'original':
-            ruleSet = '23/3'
-        elif ruleSet == 'copyworld':
-            ruleSet = '1357/1357'
+    def parse_ruleset(ruleSetString: str) -> Rule:
+        """Compile a rule string into lookup tables
+        """
+        return Rule.parse(ruleSetString)
 
-        if '/' in ruleSet:
-            (ruleSurvive, ruleBirth) = ruleSet.split('/')
-            if not ruleSurvive.isdigit() or not ruleBirth.isdigit():
-                sys.exit(
-                    'Error: Both parts of the rule string must be numeric! (Format (int)survive/(int)birth)')
-            ruleSurvive = [int(n) for n in ruleSurvive]
-            ruleBirth = [int(n) for n in ruleBirth]
-            ruleSet = 'p'
-        else:
-            # Could not parse a reasonable rule set
-            pass
-        return (ruleSet, ruleSurvive, ruleBirth)
+    @staticmethod
+    def describe_cycle(cycle: tuple[int, int]) -> str:
+        """Describe a (first generation, period) tuple for the user
+        """
+        firstGeneration, period = cycle
+        return ('static' if period == 1 else 'period ' + str(period)) + ' since ' + str(firstGeneration)
 
     @staticmethod
     def clear_screen():
@@ -508,20 +4664,80 @@ def setup_options():
     optGroup = optparse.OptionGroup(
         parser, 'General options', 'Options for the simulation engine')
     optGroup.add_option('--rules', type='str', dest='ruleset',
-                        help='Rules of the system ["original", "copyworld", "[s]/[b]"]', metavar='RULESET', default='original')
+                        help='Rules of the system ["original", "copyworld", "[s]/[b]", "B[b]/S[s]", "B[b]/S[s]/C[states]"]', metavar='RULESET', default='original')
     optGroup.add_option('--resolution', type='int', dest='resolution', nargs=2,
                         help='Grid resolution', default=(DEFAULT_GRID_WIDTH, DEFAULT_GRID_HEIGHT), metavar='WIDTH HEIGHT')
     optGroup.add_option('--fps', type='int', dest='fps',
                         help='Frames per second', default=DEFAULT_FPS)
     optGroup.add_option('--step', type='int',
                         dest='step', help='Pause every n generations', default=0)
+    optGroup.add_option('--renderer', type='str', dest='renderer',
+                        help='Terminal renderer ("ansi", "plain")', default='ansi')
+    optGroup.add_option('--half-blocks', action='store_true', dest='halfblocks',
+                        help='Draw two rows of cells per line of text (ansi renderer only)', default=False)
+    optGroup.add_option('--decoupled', action='store_true', dest='decoupled',
+                        help='Compute generations in a background thread, independent of the frame rate', default=False)
+    optGroup.add_option('--sim-rate', type='float', dest='simrate',
+                        help='Maximum generations per second in decoupled mode (0 = unlimited)', default=0.0, metavar='RATE')
+    optGroup.add_option('--headless', action='store_true', dest='headless',
+                        help='Compute generations without drawing anything', default=False)
+    optGroup.add_option('--generations', type='int', dest='generations',
+                        help='Number of generations to compute in headless mode, counted from the resumed generation (0 = forever)', default=0, metavar='N')
     optGroup.add_option('--wrap', action='store_true', dest='wrap',
                         help='Set for torodial space', default=False)
+    optGroup.add_option('--engine', type='str', dest='engine',
+                        help='Simulation engine ("python", "active", "numpy", "bitpacked", "tiled", "chunked", "hashlife", "sparse")', default=DEFAULT_ENGINE)
+    optGroup.add_option('--follow', action='store_true', dest='follow',
+                        help='Keep the viewport centered on the living cells (unbounded engines only)', default=False)
+    optGroup.add_option('--workers', type='int', dest='workers',
+                        help='Number of worker processes (bitpacked engine only)', default=1, metavar='N')
+    optGroup.add_option('--jump', type='int', dest='jump',
+                        help='Number of generations to compute per frame', default=1, metavar='N')
+    optGroup.add_option('--checkpoint-every', type='int', dest='checkpointevery',
+                        help='Save a checkpoint every n generations (0 = never)', default=0, metavar='N')
+    optGroup.add_option('--checkpoint-file', type='str', dest='checkpointfile',
+                        help='Path of the checkpoint file', default='gol.checkpoint', metavar='FILE')
+    optGroup.add_option('--checkpoint-compression', type='str', dest='checkpointcompression',
+                        help='Compression of checkpoint files ("none", "zlib", "rle")', default='zlib')
+    optGroup.add_option('--resume', type='str', dest='resume',
+                        help='Continue from a checkpoint file instead of filling the grid', default='', metavar='FILE')
+    optGroup.add_option('--export', type='str', dest='export',
+                        help='Comma separated export formats ("png", "gif", "rle", "cells")', default='', metavar='FORMATS')
+    optGroup.add_option('--export-every', type='int', dest='exportevery',
+                        help='Export every n generations', default=1, metavar='N')
+    optGroup.add_option('--export-dir', type='str', dest='exportdir',
+                        help='Folder for exported files', default='export', metavar='FOLDER')
+    optGroup.add_option('--export-scale', type='int', dest='exportscale',
+                        help='Width and height of a cell in exported images, in pixels', default=1, metavar='N')
+    optGroup.add_option('--stats', type='str', dest='stats',
+                        help='Write the population, births, deaths and bounding box of every step to a CSV file', default='', metavar='FILE')
+    optGroup.add_option('--stats-history', type='int', dest='statshistory',
+                        help='Number of steps whose statistics are kept in memory', default=DEFAULT_STATS_HISTORY, metavar='N')
+    optGroup.add_option('--stop-on-cycle', action='store_true', dest='stoponcycle',
+                        help='Stop when the grid becomes static or periodic', default=False)
+    optGroup.add_option('--cycle-history', type='int', dest='cyclehistory',
+                        help='Number of generations to compare with when detecting cycles', default=DEFAULT_CYCLE_HISTORY, metavar='N')
+    optGroup.add_option('--tile-size', type='int', dest='tilesize',
+                        help='Width and height of the memoized tiles (tiled engine only)', default=DEFAULT_TILE_SIZE, metavar='N')
+    optGroup.add_option('--tile-cache', type='int', dest='tilecache',
+                        help='Maximum number of cached tiles (tiled engine only)', default=DEFAULT_TILE_CACHE, metavar='N')
+    optGroup.add_option('--chunk-size', type='int', dest='chunksize',
+                        help='Width and height of the chunks, a multiple of 8 (chunked engine only)', default=DEFAULT_CHUNK_SIZE, metavar='N')
+    optGroup.add_option('--chunk-cache', type='int', dest='chunkcache',
+                        help='Maximum number of chunks held in memory (chunked engine only)', default=DEFAULT_CHUNK_CACHE, metavar='N')
+    optGroup.add_option('--chunk-dir', type='str', dest='chunkdir',
+                        help='Folder for the chunk file (chunked engine only, default: temporary folder)', default='', metavar='FOLDER')
+    optGroup.add_option('--profile', type='str', dest='profile',
+                        help='Measure where the time goes, show it in the HUD and write it to a JSON file on exit', default='', metavar='FILE')
+    optGroup.add_option('--cprofile', type='str', dest='cprofile',
+                        help='Write cProfile statistics of the whole run to a file (for pstats)', default='', metavar='FILE')
+    optGroup.add_option('--hashlife-nodes', type='int', dest='hashlifenodes',
+                        help='Maximum number of cached HashLife nodes before the cache is flushed', default=DEFAULT_HASHLIFE_NODES, metavar='N')
     parser.add_option_group(optGroup)
     optGroup = optparse.OptionGroup(
         parser, 'Fill options', 'Options for grid initialization')
     optGroup.add_option('--method', type='str', dest='initmethod',
-                        help='Method of grid initialization ("random", "shape", "checkerboard")', default='random')
+                        help='Method of grid initialization ("random", "shape", "checkerboard", "blocks", "repeat")', default='random')
     optGroup.add_option('--seed', type='int', dest='randomseed',
                         help='Random seed', default=time.time(), metavar='SEED')
     optGroup.add_option('--threshold', type='float', dest='randomthreshold',
@@ -530,11 +4746,22 @@ def setup_options():
                         help='Shape for filling ("double-u", "r-pentomino", "f", "line", "file")', default='double-u')
     optGroup.add_option('--shapefile', type='str', dest='shapefile',
                         help='Path to an ASCII shape data file', default='')
+    optGroup.add_option('--block-size', type='int', dest='blocksize',
+                        help='Width and height of the blocks for the "blocks" method', default=8, metavar='N')
+    optGroup.add_option('--repeat-gap', type='int', dest='repeatgap',
+                        help='Empty cells between the copies of the shape file for the "repeat" method', default=2, metavar='N')
     parser.add_option_group(optGroup)
 
     return parser
 
 
+def default_settings() -> dict:
+    """Get a settings dictionary with all default values,
+    for using GameOfLife without the command line
+    """
+    return vars(setup_options().get_default_values())
+
+
 def main():
     # Set up
     parser = setup_options()
@@ -545,14 +4772,44 @@ def main():
     print('Game of Life')
     print('\nSettings:')
     print(str(optionsDict))
-    _ = input(
-        'Press ENTER to start the Game of Life!\nPress CTRL+C to cancel!')
+    if not options.headless:
+        _ = input(
+            'Press ENTER to start the Game of Life!\nPress CTRL+C to cancel!')
 
     # Play
+    codeProfile = None
+    if options.cprofile:
+        codeProfile = cProfile.Profile()
+        codeProfile.enable()
     game = GameOfLife()
     game.init(settings=optionsDict)
-    game.fill_grid()
-    game.run(step=options.step)
+    try:
+        if options.resume:
+            with game.measure('io'):
+                game.load_checkpoint(options.resume)
+        else:
+            game.fill_grid()
+        if options.headless:
+            firstGeneration = game.generation
+            calculationTime = game.run_headless(generations=options.generations)
+            # A resumed run starts at the generation of the checkpoint
+            generationsComputed = game.generation - firstGeneration
+            print('Generation: ' + str(game.generation) +
+                  ', Alive: ' + str(game.count_alive()) +
+                  ', Time: ' + '{:0.4f}'.format(calculationTime) + ' sec' +
+                  ', Generations/sec: ' + '{:0.2f}'.format(generationsComputed / calculationTime if calculationTime > 0 else 0.0) +
+                  (', Cycle: ' + GameOfLife.describe_cycle(game.get_cycle()) if game.get_cycle() is not None else ''))
+        else:
+            game.run(step=options.step)
+            if game.stopped_on_cycle():
+                print('Stopped, the grid is ' + GameOfLife.describe_cycle(game.get_cycle()) + '.')
+    finally:
+        game.close()
+        if options.profile:
+            game.save_profile(options.profile)
+        if codeProfile is not None:
+            codeProfile.disable()
+            codeProfile.dump_stats(options.cprofile)
 
 
 if __name__ == "__main__":
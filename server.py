@@ -0,0 +1,595 @@
+import io
+import os
+import sys
+import json
+import zlib
+import base64
+import socket
+import signal
+import asyncio
+import optparse
+import traceback
+import itertools
+import collections
+import http.client
+import concurrent.futures
+
+import gol
+
+# Defaults
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_ENGINE = 'bitpacked'
+DEFAULT_MAX_SESSIONS = 64
+DEFAULT_MAX_CELLS = 1 << 26
+DEFAULT_SNAPSHOTS = 4
+DEFAULT_MAX_GENERATIONS = 100000
+MAX_POSITIONS = 65536
+MAX_REQUEST_SIZE = 1 << 26
+
+# Settings that clients may choose when creating a session, everything
+# that reads or writes files on the server is left out
+SESSION_SETTINGS = ('resolution', 'ruleset', 'wrap', 'engine', 'jump', 'initmethod', 'randomseed', 'randomthreshold',
+                    'fillshape', 'blocksize', 'stoponcycle', 'cyclehistory', 'tilesize', 'tilecache', 'hashlifenodes')
+# Smallest values of the integer settings
+INT_SETTINGS = {'jump': 1, 'blocksize': 1, 'cyclehistory': 1, 'tilesize': 1, 'tilecache': 1, 'hashlifenodes': 1}
+BOOL_SETTINGS = ('wrap', 'stoponcycle')
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+SESSION_NOT_FOUND = -32001
+SNAPSHOT_NOT_FOUND = -32002
+SIMULATION_ERROR = -32003
+
+HTTP_STATUS = {200: 'OK', 204: 'No Content', 400: 'Bad Request', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class Session:
+    """One game and the snapshots of its cells that were sent to clients,
+    which later requests can use as the base of a diff
+    """
+    def __init__(self, sessionId: int, game: gol.GameOfLife):
+        self.id = sessionId
+        self.game = game
+        # Only one request works on a game at a time
+        self.lock = asyncio.Lock()
+        # Generation -> (area, bit-packed rows)
+        self.snapshots = collections.OrderedDict()
+
+    def info(self) -> dict:
+        game = self.game
+        return {
+            'session': self.id,
+            'width': game.gridWidth,
+            'height': game.gridHeight,
+            'wrap': game.wrap,
+            'engine': game.engineName,
+            'rule': game.rule.name,
+            'unbounded': game.engine.unbounded,
+            'generation': game.generation,
+            'cycle': game.get_cycle()
+        }
+
+
+class SimulationServer:
+    """JSON-RPC 2.0 server for many concurrent Game of Life sessions.
+    Requests are HTTP POSTs, connections are kept alive. Everything that
+    touches a grid runs in a thread pool, so the event loop never waits
+    for a simulation, and different sessions are stepped concurrently.
+    """
+    def __init__(self, workers: int, maxSessions: int=DEFAULT_MAX_SESSIONS, maxCells: int=DEFAULT_MAX_CELLS,
+                 snapshots: int=DEFAULT_SNAPSHOTS, maxGenerations: int=DEFAULT_MAX_GENERATIONS):
+        self.pool = concurrent.futures.ThreadPoolExecutor(max(1, workers))
+        self.maxSessions = maxSessions
+        self.maxCells = maxCells
+        self.snapshotCount = snapshots
+        self.maxGenerations = maxGenerations
+        self.sessions = {}
+        # Sessions that are being created, they count towards maxSessions
+        self.pendingSessions = 0
+        self.sessionIds = itertools.count(1)
+        self.methods = {
+            'create': self.create,
+            'close': self.close_session,
+            'sessions': self.list_sessions,
+            'info': self.info,
+            'load': self.load,
+            'step': self.step,
+            'cells': self.cells
+        }
+
+    async def run_in_pool(self, function, *args):
+        """Run a function in the thread pool. The simulation reports
+        invalid settings with sys.exit(), those and all other errors
+        of the simulation become RPC errors.
+        """
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, function, *args)
+        except RpcError:
+            raise
+        except SystemExit as e:
+            raise RpcError(SIMULATION_ERROR, str(e))
+        except Exception as e:
+            raise RpcError(SIMULATION_ERROR, 'Error: ' + (str(e) or type(e).__name__))
+
+    def get_session(self, params: dict) -> Session:
+        session = self.sessions.get(params.get('session'))
+        if session is None:
+            raise RpcError(SESSION_NOT_FOUND, 'Unknown session ' + repr(params.get('session')))
+        return session
+
+    @staticmethod
+    def get_int(params: dict, key: str, default: int=None, minimum: int=None, maximum: int=None) -> int:
+        value = params.get(key, default)
+        if not isinstance(value, int) or isinstance(value, bool) or (minimum is not None and value < minimum) or \
+           (maximum is not None and value > maximum):
+            raise RpcError(INVALID_PARAMS, 'Parameter "' + key + '" must be an integer' +
+                           (' of at least ' + str(minimum) if minimum is not None else '') +
+                           (' and' if minimum is not None and maximum is not None else '') +
+                           (' of at most ' + str(maximum) if maximum is not None else ''))
+        return value
+
+    @staticmethod
+    def check_settings(settings: dict, game: gol.GameOfLife):
+        """Check the types and ranges of the session settings, which the
+        command line parser would have checked for gol.py
+        """
+        def invalid(key: str, description: str):
+            raise RpcError(INVALID_PARAMS, 'Setting "' + key + '" must be ' + description)
+
+        def is_number(value) -> bool:
+            return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+        resolution = settings['resolution']
+        if not isinstance(resolution, (list, tuple)) or len(resolution) != 2 or \
+           not all(isinstance(value, int) and not isinstance(value, bool) and value > 0 for value in resolution):
+            invalid('resolution', '[width, height] with positive integers')
+        for key, minimum in INT_SETTINGS.items():
+            value = settings[key]
+            if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+                invalid(key, 'an integer of at least ' + str(minimum))
+        for key in BOOL_SETTINGS:
+            if not isinstance(settings[key], bool):
+                invalid(key, 'true or false')
+        if not is_number(settings['randomseed']):
+            invalid('randomseed', 'a number')
+        if not is_number(settings['randomthreshold']) or not 0 <= settings['randomthreshold'] <= 1:
+            invalid('randomthreshold', 'a number between 0 and 1')
+        if not isinstance(settings['ruleset'], str):
+            invalid('ruleset', 'a string')
+        for key, names in (('engine', game.engines), ('initmethod', game.initMethods),
+                           ('fillshape', gol.GameOfLife.SHAPE_CELLS)):
+            if not isinstance(settings[key], str) or settings[key] not in names:
+                invalid(key, 'one of ' + ', '.join(names))
+
+########################################################
+# Methods
+########################################################
+
+    async def create(self, params: dict) -> dict:
+        """Create a session. Params: settings (a dict with keys of SESSION_SETTINGS),
+        fill (fill the grid with the init method, default true)
+        """
+        if len(self.sessions) + self.pendingSessions >= self.maxSessions:
+            raise RpcError(SIMULATION_ERROR, 'Error: Too many sessions (at most ' + str(self.maxSessions) + ')!')
+        settings = gol.default_settings()
+        settings.update({
+            'engine': DEFAULT_ENGINE,
+            'headless': True,
+            'renderer': 'plain'
+        })
+        requested = params.get('settings', {})
+        if not isinstance(requested, dict):
+            raise RpcError(INVALID_PARAMS, 'Parameter "settings" must be an object')
+        for key, value in requested.items():
+            if key not in SESSION_SETTINGS:
+                raise RpcError(INVALID_PARAMS, 'Unknown or unsupported setting "' + key + '"')
+            settings[key] = value
+        game = gol.GameOfLife()
+        SimulationServer.check_settings(settings, game)
+        width, height = settings['resolution']
+        settings['resolution'] = (width, height)
+        if width * height > self.maxCells:
+            raise RpcError(INVALID_PARAMS, 'The grid must have between 1 and ' + str(self.maxCells) + ' cells')
+        fill = params.get('fill', True)
+
+        def create_game() -> gol.GameOfLife:
+            try:
+                game.init(settings)
+                if fill:
+                    game.fill_grid()
+            except BaseException:
+                game.close()
+                raise
+            return game
+
+        # Reserve the slot, other requests run while the game is created
+        self.pendingSessions += 1
+        try:
+            session = Session(next(self.sessionIds), await self.run_in_pool(create_game))
+        finally:
+            self.pendingSessions -= 1
+        self.sessions[session.id] = session
+        return session.info()
+
+    async def close_session(self, params: dict) -> bool:
+        """Close a session and release its grid
+        """
+        session = self.get_session(params)
+        async with session.lock:
+            self.sessions.pop(session.id, None)
+            await self.run_in_pool(session.game.close)
+        return True
+
+    async def list_sessions(self, params: dict) -> list[dict]:
+        return [session.info() for session in self.sessions.values()]
+
+    async def info(self, params: dict) -> dict:
+        return self.get_session(params).info()
+
+    async def load(self, params: dict) -> dict:
+        """Draw a pattern. Params: pattern (the file contents), format ("rle" or "cells"),
+        positions (upper left corners of the copies, default: one copy centered like
+        --shapefile), rotation, flip, drawDead (also clear the dead cells of the pattern)
+        """
+        session = self.get_session(params)
+        text = params.get('pattern')
+        if not isinstance(text, str):
+            raise RpcError(INVALID_PARAMS, 'Parameter "pattern" must be a string')
+        patternFormat = params.get('format', 'rle')
+        if patternFormat not in ('rle', 'cells'):
+            raise RpcError(INVALID_PARAMS, 'Unknown pattern format "' + str(patternFormat) + '" (Available: rle, cells)')
+        positions = params.get('positions')
+        if positions is not None:
+            if not isinstance(positions, list) or len(positions) > MAX_POSITIONS:
+                raise RpcError(INVALID_PARAMS, 'Parameter "positions" must be a list of at most ' +
+                               str(MAX_POSITIONS) + ' [x, y] pairs')
+            try:
+                positions = [(int(x), int(y)) for x, y in positions]
+            except (TypeError, ValueError):
+                raise RpcError(INVALID_PARAMS, 'Parameter "positions" must be a list of [x, y] pairs')
+        rotation = SimulationServer.get_int(params, 'rotation', 0)
+        flip = bool(params.get('flip', False))
+        drawDead = bool(params.get('drawDead', False))
+
+        def parse() -> gol.Pattern:
+            if patternFormat == 'rle':
+                try:
+                    pattern = gol.Pattern.read_rle(io.StringIO(text), maxCells=self.maxCells)
+                except gol.RleError as e:
+                    raise RpcError(INVALID_PARAMS, str(e))
+            else:
+                pattern = gol.Pattern.from_strings([line.rstrip().lower() for line in text.splitlines()
+                                                    if line[:1].lower() in ('o', '.')])
+            # All copies together may not be larger than a grid
+            if pattern.width * pattern.height * (len(positions) if positions is not None else 1) > self.maxCells:
+                raise RpcError(INVALID_PARAMS, 'The pattern and its copies must have at most ' +
+                               str(self.maxCells) + ' cells')
+            return pattern
+
+        def draw(pattern: gol.Pattern) -> dict:
+            game = session.game
+            if positions is None:
+                game.draw_pattern((int(game.gridWidth / 2), int(game.gridHeight / 2)),
+                                  pattern.transform(rotation, flip), drawDead)
+            else:
+                game.stamp_pattern(pattern, positions, rotation, flip, drawDead)
+            if game.cycleHistorySize > 0:
+                game.reset_cycle_detection()
+            return {'generation': game.generation, 'population': game.count_alive()}
+
+        # Patterns can be large, parse them without holding the session
+        pattern = await self.run_in_pool(parse)
+        async with session.lock:
+            return await self.run_in_pool(draw, pattern)
+
+    async def step(self, params: dict) -> dict:
+        """Compute generations. Params: generations (default 1). Stops early
+        when the session was created with stoponcycle and the grid repeats.
+        """
+        session = self.get_session(params)
+        generations = SimulationServer.get_int(params, 'generations', 1, minimum=1, maximum=self.maxGenerations)
+
+        def advance() -> dict:
+            game = session.game
+            seconds = game.run_headless(generations)
+            return {'generation': game.generation, 'population': game.count_alive(),
+                    'cycle': game.get_cycle(), 'seconds': seconds}
+
+        async with session.lock:
+            return await self.run_in_pool(advance)
+
+    async def cells(self, params: dict) -> dict:
+        """Get the cells of an area. Params: area ([left, top, width, height], default
+        the grid, or the viewport of unbounded engines), format ("binary" or "rle"),
+        base (generation of an earlier response for the same area, to only get the
+        cells that changed since then).
+        Binary data is base64 encoded and zlib compressed, rows of (width + 7) // 8
+        bytes where bit x is cell left + x. Diffs hold the cells that toggled, as
+        binary data to XOR with the base, or as RLE text of the toggled cells.
+        """
+        session = self.get_session(params)
+        game = session.game
+        cellFormat = params.get('format', 'binary')
+        if cellFormat not in ('binary', 'rle'):
+            raise RpcError(INVALID_PARAMS, 'Unknown cell format "' + str(cellFormat) + '" (Available: binary, rle)')
+        if 'area' in params:
+            try:
+                left, top, width, height = [int(value) for value in params['area']]
+            except (TypeError, ValueError):
+                raise RpcError(INVALID_PARAMS, 'Parameter "area" must be [left, top, width, height]')
+            if width < 0 or height < 0 or width * height > self.maxCells or \
+               (not game.engine.unbounded and (left < 0 or top < 0 or
+                                               left + width > game.gridWidth or top + height > game.gridHeight)):
+                raise RpcError(INVALID_PARAMS, 'The area must be inside the grid')
+            area = (left, top, width, height)
+        else:
+            area = None
+        base = SimulationServer.get_int(params, 'base', minimum=0) if params.get('base') is not None else None
+
+        def get_cells() -> dict:
+            # The viewport can move during a step, so it is read under the session lock
+            cellArea = area or (game.viewportX, game.viewportY, game.gridWidth, game.gridHeight)
+            left, top, width, height = cellArea
+            rows = [game.engine.get_packed_row(y, left, width) for y in range(top, top + height)]
+            result = {'generation': game.generation, 'area': list(cellArea), 'format': cellFormat, 'base': None}
+            outputRows = rows
+            if base is not None:
+                baseSnapshot = session.snapshots.get(base)
+                if baseSnapshot is None or baseSnapshot[0] != cellArea:
+                    raise RpcError(SNAPSHOT_NOT_FOUND, 'No snapshot of generation ' + repr(base) + ' for this area')
+                # XOR all rows at once
+                stride = (width + 7) // 8
+                toggled = int.from_bytes(b''.join(rows), 'little') ^ int.from_bytes(b''.join(baseSnapshot[1]), 'little')
+                data = toggled.to_bytes(stride * height, 'little')
+                outputRows = [data[stride * y:stride * (y + 1)] for y in range(0, height)]
+                result['base'] = base
+            if cellFormat == 'binary':
+                result['data'] = base64.b64encode(zlib.compress(b''.join(outputRows))).decode()
+            else:
+                result['data'] = gol.GameOfLife.encode_rle(outputRows, width, rule=game.rule.name)
+            session.snapshots[game.generation] = (cellArea, rows)
+            session.snapshots.move_to_end(game.generation)
+            while len(session.snapshots) > self.snapshotCount:
+                session.snapshots.popitem(last=False)
+            return result
+
+        async with session.lock:
+            return await self.run_in_pool(get_cells)
+
+########################################################
+# Protocol
+########################################################
+
+    async def handle_rpc(self, request) -> dict:
+        """Handle one JSON-RPC request, return the response or None for notifications
+        """
+        if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' or \
+           not isinstance(request.get('method'), str):
+            return {'jsonrpc': '2.0', 'id': None,
+                    'error': {'code': INVALID_REQUEST, 'message': 'Invalid request'}}
+        requestId = request.get('id')
+        params = request.get('params', {})
+        try:
+            method = self.methods.get(request['method'])
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, 'Unknown method "' + request['method'] + '"')
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, 'Params must be an object')
+            response = {'jsonrpc': '2.0', 'id': requestId, 'result': await method(params)}
+        except RpcError as e:
+            response = {'jsonrpc': '2.0', 'id': requestId, 'error': {'code': e.code, 'message': e.message}}
+        except Exception:
+            traceback.print_exc()
+            response = {'jsonrpc': '2.0', 'id': requestId,
+                        'error': {'code': INTERNAL_ERROR, 'message': 'Internal error'}}
+        return response if 'id' in request else None
+
+    async def handle_body(self, body: bytes) -> bytes:
+        try:
+            request = json.loads(body)
+        except ValueError:
+            return json.dumps({'jsonrpc': '2.0', 'id': None,
+                               'error': {'code': PARSE_ERROR, 'message': 'Parse error'}}).encode()
+        if isinstance(request, list):
+            # Batch, the requests run concurrently
+            if not request:
+                responses = await self.handle_rpc(None)
+            else:
+                responses = [response for response in
+                             await asyncio.gather(*[self.handle_rpc(item) for item in request])
+                             if response is not None]
+        else:
+            responses = await self.handle_rpc(request)
+        return json.dumps(responses).encode() if responses else b''
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve HTTP requests on one connection until the client closes it
+        """
+        try:
+            while True:
+                requestLine = await reader.readline()
+                if not requestLine:
+                    break
+                parts = requestLine.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                keepAlive = len(parts) == 3 and parts[2] == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                length = int(headers.get('content-length', '0') or 0)
+                if len(parts) != 3:
+                    status, body = 400, b''
+                    keepAlive = False
+                elif parts[0] != 'POST':
+                    status, body = 405, b''
+                elif length > MAX_REQUEST_SIZE:
+                    status, body = 413, b''
+                    keepAlive = False
+                else:
+                    body = await self.handle_body(await reader.readexactly(length))
+                    status = 200 if body else 204
+                await SimulationServer.write_response(writer, status, body, keepAlive)
+                if not keepAlive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except Exception:
+            # Last resort, answer with an error instead of dropping the connection
+            traceback.print_exc()
+            body = json.dumps({'jsonrpc': '2.0', 'id': None,
+                               'error': {'code': INTERNAL_ERROR, 'message': 'Internal error'}}).encode()
+            try:
+                await SimulationServer.write_response(writer, 500, body, False)
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def write_response(writer: asyncio.StreamWriter, status: int, body: bytes, keepAlive: bool):
+        head = 'HTTP/1.1 ' + str(status) + ' ' + HTTP_STATUS[status] + '\r\n' + \
+               ('Allow: POST\r\n' if status == 405 else '') + \
+               ('Content-Type: application/json\r\n' if body else '') + \
+               'Content-Length: ' + str(len(body)) + '\r\n' + \
+               ('' if keepAlive else 'Connection: close\r\n') + '\r\n'
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    def close(self):
+        """Close all sessions and stop the thread pool
+        """
+        for session in self.sessions.values():
+            session.game.close()
+        self.sessions = {}
+        self.pool.shutdown()
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix socket
+    """
+    def __init__(self, socketPath: str, timeout: float=None):
+        super().__init__('localhost', timeout=timeout)
+        self.socketPath = socketPath
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socketPath)
+
+
+class ServerClient:
+    """Blocking client for the simulation server, e.g.
+        client = ServerClient(port=8765)
+        session = client.call('create', settings={'resolution': [64, 64]})['session']
+        client.call('step', session=session, generations=100)
+    """
+    def __init__(self, host: str=DEFAULT_HOST, port: int=DEFAULT_PORT, unixSocket: str='', timeout: float=None):
+        if unixSocket:
+            self.connection = UnixHTTPConnection(unixSocket, timeout=timeout)
+        else:
+            self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+        self.requestIds = itertools.count(1)
+
+    def call(self, method: str, **params):
+        """Call a method, return its result or raise an RpcError
+        """
+        request = {'jsonrpc': '2.0', 'method': method, 'params': params, 'id': next(self.requestIds)}
+        self.connection.request('POST', '/', json.dumps(request), {'Content-Type': 'application/json'})
+        response = json.loads(self.connection.getresponse().read())
+        if 'error' in response:
+            raise RpcError(response['error']['code'], response['error']['message'])
+        return response['result']
+
+    @staticmethod
+    def decode_cells(result: dict, baseRows: list[bytes] = None) -> list[bytes]:
+        """Get the bit-packed rows of a binary cells result, diffs are applied to baseRows
+        """
+        _, _, width, height = result['area']
+        stride = (width + 7) // 8
+        data = zlib.decompress(base64.b64decode(result['data']))
+        if result['base'] is not None:
+            data = (int.from_bytes(data, 'little') ^ int.from_bytes(b''.join(baseRows), 'little')).to_bytes(len(data), 'little')
+        return [data[stride * y:stride * (y + 1)] for y in range(0, height)]
+
+    def close(self):
+        self.connection.close()
+
+
+async def serve(options):
+    simulationServer = SimulationServer(options.workers, options.maxsessions, options.maxcells, options.snapshots,
+                                        options.maxgenerations)
+    if options.unixsocket:
+        server = await asyncio.start_unix_server(simulationServer.handle_connection, options.unixsocket)
+        address = options.unixsocket
+    else:
+        server = await asyncio.start_server(simulationServer.handle_connection, options.host, options.port)
+        address = 'http://' + options.host + ':' + str(server.sockets[0].getsockname()[1])
+    print('Listening on ' + address, file=sys.stderr)
+    # Shut down cleanly when terminated
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, AttributeError, RuntimeError):
+        # Not supported on this platform, or not running in the main thread
+        pass
+    try:
+        async with server:
+            await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        simulationServer.close()
+        if options.unixsocket and os.path.exists(options.unixsocket):
+            os.remove(options.unixsocket)
+
+
+def setup_options():
+    parser = optparse.OptionParser(usage='%prog [options]',
+                                   description='Serve Game of Life sessions over JSON-RPC')
+    parser.add_option('--host', type='str', dest='host',
+                      help='Address to listen on', default=DEFAULT_HOST)
+    parser.add_option('--port', type='int', dest='port',
+                      help='Port to listen on (0 = any free port)', default=DEFAULT_PORT)
+    parser.add_option('--unix-socket', type='str', dest='unixsocket',
+                      help='Listen on a Unix socket instead of a port', default='', metavar='PATH')
+    parser.add_option('--workers', type='int', dest='workers',
+                      help='Number of threads that compute generations', default=os.cpu_count() or 1, metavar='N')
+    parser.add_option('--max-sessions', type='int', dest='maxsessions',
+                      help='Maximum number of open sessions', default=DEFAULT_MAX_SESSIONS, metavar='N')
+    parser.add_option('--max-cells', type='int', dest='maxcells',
+                      help='Maximum number of cells of a grid or a requested area', default=DEFAULT_MAX_CELLS, metavar='N')
+    parser.add_option('--max-generations', type='int', dest='maxgenerations',
+                      help='Maximum number of generations computed by one step request',
+                      default=DEFAULT_MAX_GENERATIONS, metavar='N')
+    parser.add_option('--snapshots', type='int', dest='snapshots',
+                      help='Number of sent generations per session that diffs can be based on',
+                      default=DEFAULT_SNAPSHOTS, metavar='N')
+    return parser
+
+
+def main():
+    parser = setup_options()
+    options, _ = parser.parse_args()
+    asyncio.run(serve(options))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print('Cancelled.')
@@ -0,0 +1,277 @@
+import os
+import sys
+import csv
+import json
+import time
+import optparse
+import multiprocessing
+
+import gol
+
+# Defaults
+DEFAULT_SOUPS = 1000
+DEFAULT_SOUP_WIDTH = 32
+DEFAULT_SOUP_HEIGHT = 32
+DEFAULT_MAX_GENERATIONS = 5000
+DEFAULT_ENGINE = 'bitpacked'
+
+# Cells closer than this (in both directions) belong to the same object,
+# so oscillators like the toad stay in one piece in all phases
+OBJECT_DISTANCE = 2
+
+# Common objects in all phases, as plain text rows
+KNOWN_OBJECTS = {
+    'block': ['oo', 'oo'],
+    'beehive': ['.oo.', 'o..o', '.oo.'],
+    'loaf': ['.oo.', 'o..o', '.o.o', '..o.'],
+    'boat': ['oo.', 'o.o', '.o.'],
+    'tub': ['.o.', 'o.o', '.o.'],
+    'pond': ['.oo.', 'o..o', 'o..o', '.oo.'],
+    'ship': ['oo.', 'o.o', '.oo'],
+    'long boat': ['oo..', 'o.o.', '.o.o', '..o.'],
+    'barge': ['.o..', 'o.o.', '.o.o', '..o.'],
+    'mango': ['.oo..', 'o..o.', '.o..o', '..oo.'],
+    'aircraft carrier': ['oo..', 'o..o', '..oo'],
+    'snake': ['oo.o', 'o.oo'],
+    'blinker': ['ooo'],
+    'toad': [['.ooo', 'ooo.'], ['..o.', 'o..o', 'o..o', '.o..']],
+    'beacon': [['oo..', 'oo..', '..oo', '..oo'], ['oo..', 'o...', '...o', '..oo']],
+    'glider': [['.o.', '..o', 'ooo'], ['o.o', '.oo', '.o.']]
+}
+OBJECT_COLUMNS = list(KNOWN_OBJECTS.keys()) + ['other']
+CSV_COLUMNS = ['seed', 'population', 'lifespan', 'period', 'generations'] + OBJECT_COLUMNS
+
+
+def canonical_form(cells) -> tuple:
+    """Get a representation of a set of cells that is the same
+    for all translations, rotations and reflections
+    """
+    forms = []
+    for transform in (lambda x, y: (x, y), lambda x, y: (-x, y), lambda x, y: (x, -y), lambda x, y: (-x, -y),
+                      lambda x, y: (y, x), lambda x, y: (-y, x), lambda x, y: (y, -x), lambda x, y: (-y, -x)):
+        transformed = [transform(x, y) for x, y in cells]
+        left = min(x for x, _ in transformed)
+        top = min(y for _, y in transformed)
+        forms.append(tuple(sorted((x - left, y - top) for x, y in transformed)))
+    return min(forms)
+
+
+def build_object_names() -> dict:
+    """Map the canonical forms of all phases of the known objects to their names
+    """
+    names = {}
+    for name, phases in KNOWN_OBJECTS.items():
+        if isinstance(phases[0], str):
+            phases = [phases]
+        for rows in phases:
+            cells = [(x, y) for y, row in enumerate(rows) for x, char in enumerate(row) if char == 'o']
+            names[canonical_form(cells)] = name
+    return names
+
+
+OBJECT_NAMES = build_object_names()
+
+
+def census(game: gol.GameOfLife) -> dict:
+    """Split the living cells into objects and count them by name
+    """
+    aliveCells = set(game.engine.get_alive_cells())
+    counts = dict.fromkeys(OBJECT_COLUMNS, 0)
+    offsets = [(dx, dy) for dy in range(-OBJECT_DISTANCE, OBJECT_DISTANCE + 1)
+               for dx in range(-OBJECT_DISTANCE, OBJECT_DISTANCE + 1) if dx or dy]
+    while aliveCells:
+        # Collect one object. Positions are unwrapped, so objects
+        # crossing the edge of a toroidal grid keep their shape.
+        start = aliveCells.pop()
+        objectCells = [start]
+        pending = [start]
+        positions = {start: start}
+        while pending:
+            cell = pending.pop()
+            x, y = positions[cell]
+            for dx, dy in offsets:
+                neighbor = (x + dx, y + dy)
+                if game.wrap:
+                    neighborCell = (neighbor[0] % game.gridWidth, neighbor[1] % game.gridHeight)
+                else:
+                    neighborCell = neighbor
+                if neighborCell in aliveCells:
+                    aliveCells.discard(neighborCell)
+                    positions[neighborCell] = neighbor
+                    objectCells.append(neighborCell)
+                    pending.append(neighborCell)
+        name = OBJECT_NAMES.get(canonical_form([positions[cell] for cell in objectCells]), 'other')
+        counts[name] += 1
+    return counts
+
+
+# Settings shared by all soups of a worker process
+soupWorker = {}
+
+
+def init_soup_worker(settings: dict):
+    soupWorker['settings'] = settings
+
+
+def run_soup(seed: int) -> dict:
+    """Run one soup until it stabilizes or reaches the generation limit
+    """
+    settings = dict(soupWorker['settings'], randomseed=seed)
+    game = gol.GameOfLife()
+    game.init(settings)
+    try:
+        game.fill_grid()
+        game.run_headless(generations=settings['generations'])
+        cycle = game.get_cycle()
+        result = {
+            'seed': seed,
+            'population': game.count_alive(),
+            'lifespan': cycle[0] if cycle is not None else None,
+            'period': cycle[1] if cycle is not None else None,
+            'generations': game.generation
+        }
+        result.update(census(game))
+    finally:
+        game.close()
+    return result
+
+
+class ResultFile:
+    """Results file in JSONL or CSV format, depending on the extension.
+    Existing results are read on open, so an interrupted search
+    continues with the seeds that are still missing.
+    """
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.csv = os.path.splitext(filename)[1].lower() == '.csv'
+        self.results = []
+        validSize = 0
+        if os.path.isfile(filename):
+            with open(filename, 'r', newline='') as dataFile:
+                lines = dataFile.readlines()
+            # The last line is incomplete if a run was killed while writing
+            if lines and not lines[-1].endswith('\n'):
+                lines.pop()
+            validSize = sum(len(line.encode()) for line in lines)
+            if self.csv:
+                for row in csv.DictReader(lines):
+                    self.results.append({key: (int(value) if value != '' else None) for key, value in row.items()})
+            else:
+                self.results = [json.loads(line) for line in lines if line.strip()]
+        self.dataFile = open(filename, 'a+', newline='')
+        self.dataFile.truncate(validSize)
+        self.writer = None
+        if self.csv:
+            self.writer = csv.DictWriter(self.dataFile, fieldnames=CSV_COLUMNS, lineterminator='\n')
+            if validSize == 0:
+                self.writer.writeheader()
+
+    def done_seeds(self) -> set[int]:
+        return {result['seed'] for result in self.results}
+
+    def write(self, result: dict):
+        """Append one result, and flush it to disk right away
+        """
+        if self.writer is not None:
+            self.writer.writerow(result)
+        else:
+            self.dataFile.write(json.dumps(result) + '\n')
+        self.dataFile.flush()
+        self.results.append(result)
+
+    def close(self):
+        self.dataFile.close()
+
+
+def summarize(results: list[dict]) -> dict:
+    """Aggregate statistics over all soups
+    """
+    stabilized = [result for result in results if result['lifespan'] is not None]
+    longest = max(stabilized, key=lambda result: result['lifespan'], default=None)
+    return {
+        'soups': len(results),
+        'stabilized': len(stabilized),
+        'meanLifespan': sum(result['lifespan'] for result in stabilized) / len(stabilized) if stabilized else None,
+        'longestLifespan': longest['lifespan'] if longest is not None else None,
+        'longestLifespanSeed': longest['seed'] if longest is not None else None,
+        'meanPopulation': sum(result['population'] for result in results) / len(results) if results else None,
+        'objects': {name: sum(result[name] for result in results) for name in OBJECT_COLUMNS}
+    }
+
+
+def setup_options():
+    parser = optparse.OptionParser(usage='%prog [options]',
+                                   description='Run many random soups and collect statistics about how they end')
+    parser.add_option('--soups', type='int', dest='soups',
+                      help='Number of soups to run', default=DEFAULT_SOUPS, metavar='N')
+    parser.add_option('--first-seed', type='int', dest='firstseed',
+                      help='Seed of the first soup, the following soups use the next seeds', default=1, metavar='SEED')
+    parser.add_option('--threshold', type='float', dest='randomthreshold',
+                      help='Cell threshold for random initialization', default=0.5, metavar='THRESHOLD')
+    parser.add_option('--resolution', type='int', dest='resolution', nargs=2,
+                      help='Soup size', default=(DEFAULT_SOUP_WIDTH, DEFAULT_SOUP_HEIGHT), metavar='WIDTH HEIGHT')
+    parser.add_option('--rules', type='str', dest='ruleset',
+                      help='Rules of the system', default='original', metavar='RULESET')
+    parser.add_option('--wrap', action='store_true', dest='wrap',
+                      help='Set for torodial space', default=False)
+    parser.add_option('--engine', type='str', dest='engine',
+                      help='Simulation engine (bounded engines only)', default=DEFAULT_ENGINE)
+    parser.add_option('--generations', type='int', dest='generations',
+                      help='Maximum number of generations per soup', default=DEFAULT_MAX_GENERATIONS, metavar='N')
+    parser.add_option('--cycle-history', type='int', dest='cyclehistory',
+                      help='Number of generations to compare with when detecting cycles',
+                      default=gol.DEFAULT_CYCLE_HISTORY, metavar='N')
+    parser.add_option('--processes', type='int', dest='processes',
+                      help='Number of worker processes', default=os.cpu_count() or 1, metavar='N')
+    parser.add_option('--output', type='str', dest='output',
+                      help='Results file, .jsonl or .csv (appended to and resumed from)', default='soups.jsonl', metavar='FILE')
+    return parser
+
+
+def main():
+    parser = setup_options()
+    options, _ = parser.parse_args()
+
+    settings = gol.default_settings()
+    settings.update({
+        'initmethod': 'random',
+        'randomthreshold': options.randomthreshold,
+        'resolution': options.resolution,
+        'ruleset': options.ruleset,
+        'wrap': options.wrap,
+        'engine': options.engine,
+        'generations': options.generations,
+        'stoponcycle': True,
+        'cyclehistory': options.cyclehistory,
+        'headless': True
+    })
+    if settings['engine'] in ('hashlife', 'sparse'):
+        sys.exit('Error: Soups on unbounded engines never stabilize while gliders escape, use a bounded engine!')
+
+    resultFile = ResultFile(options.output)
+    doneSeeds = resultFile.done_seeds()
+    seeds = [seed for seed in range(options.firstseed, options.firstseed + options.soups) if seed not in doneSeeds]
+    print('Running ' + str(len(seeds)) + ' soups (' + str(options.soups - len(seeds)) + ' already done)', file=sys.stderr)
+
+    timeStart = time.perf_counter()
+    pool = multiprocessing.Pool(max(1, options.processes), initializer=init_soup_worker, initargs=(settings,))
+    try:
+        for count, result in enumerate(pool.imap_unordered(run_soup, seeds, chunksize=16), 1):
+            resultFile.write(result)
+            if count % 100 == 0 or count == len(seeds):
+                elapsed = time.perf_counter() - timeStart
+                print('{} / {} soups, {:0.1f} soups/sec'.format(count, len(seeds), count / elapsed), file=sys.stderr)
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+        resultFile.close()
+
+    print(json.dumps(summarize(resultFile.results), indent=2))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print('Cancelled.')
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+
+import gol
+
+
+ENGINES = ['python', 'active', 'numpy', 'bitpacked', 'tiled', 'chunked', 'hashlife', 'sparse']
+SIZE = (37, 21)
+GENERATIONS = 6
+
+
+def new_game(engine: str, rule: str='original', fill: bool=False) -> gol.GameOfLife:
+    """Create a game, filled with a seeded random grid if fill is set
+    """
+    game = gol.GameOfLife()
+    settings = gol.default_settings()
+    settings.update(engine=engine, resolution=SIZE, ruleset=rule, randomseed=11)
+    game.init(settings)
+    if fill:
+        game.fill_grid()
+    return game
+
+
+def get_states(game: gol.GameOfLife) -> list[bytes]:
+    """Get the states of all cells of the grid
+    """
+    width, height = SIZE
+    return [game.engine.get_state_row(y, 0, width) for y in range(0, height)]
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, 'test.checkpoint')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def check_round_trip(self, engine: str, compression: str, rule: str='original'):
+        """Save a checkpoint of a running game, load it into an empty game
+        and check that both grids stay equal in the next generations
+        """
+        try:
+            game = new_game(engine, rule, fill=True)
+        except SystemExit as error:
+            self.skipTest(str(error))
+        game.run_headless(GENERATIONS)
+        game.save_checkpoint(self.filename, compression)
+        resumed = new_game(engine, rule)
+        resumed.load_checkpoint(self.filename)
+        self.assertEqual(resumed.generation, GENERATIONS)
+        for _ in range(0, GENERATIONS):
+            self.assertEqual(get_states(resumed), get_states(game))
+            self.assertEqual(resumed.count_alive(), game.count_alive())
+            game.advance_grid()
+            resumed.advance_grid()
+        game.close()
+        resumed.close()
+
+    def test_round_trips(self):
+        for engine in ENGINES:
+            for compression in gol.CheckpointFile.COMPRESSIONS:
+                with self.subTest(engine=engine, compression=compression):
+                    self.check_round_trip(engine, compression)
+
+    def test_generations_rule(self):
+        # The dying cells are saved, too, otherwise the next generations differ
+        for engine in ('python', 'active', 'numpy'):
+            for compression in gol.CheckpointFile.COMPRESSIONS:
+                with self.subTest(engine=engine, compression=compression):
+                    self.check_round_trip(engine, compression, 'B2/S/C4')
+
+    def test_header(self):
+        game = new_game('python', 'B2/S/C4', fill=True)
+        game.run_headless(3)
+        game.save_checkpoint(self.filename, 'rle')
+        checkpoint = gol.CheckpointFile(self.filename)
+        try:
+            self.assertEqual((checkpoint.width, checkpoint.height, checkpoint.generation, checkpoint.cellBits),
+                             (SIZE[0], SIZE[1], 3, 8))
+            self.assertEqual(gol.GameOfLife.parse_ruleset(checkpoint.rule).name, game.rule.name)
+        finally:
+            checkpoint.close()
+
+    def test_mismatches(self):
+        game = new_game('python', fill=True)
+        game.save_checkpoint(self.filename)
+        other = gol.GameOfLife()
+        settings = gol.default_settings()
+        settings.update(engine='python', resolution=(SIZE[0] + 1, SIZE[1]))
+        other.init(settings)
+        with self.assertRaises(SystemExit):
+            other.load_checkpoint(self.filename)
+        with self.assertRaises(SystemExit):
+            new_game('python', 'B36/S23').load_checkpoint(self.filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import random
+import unittest
+
+import gol
+
+
+RULES = ['original', '23/36', 'B36/S23', 'B2-a/S12', 'B2/S/C3', '345/2/4']
+SIZES = [(1, 1), (2, 3), (17, 9), (65, 5), (40, 33)]
+GENERATIONS = 8
+# A pattern grows by at most one cell per generation, so a border this wide
+# keeps the reference grid edge out of reach of the unbounded engines
+BORDER = GENERATIONS + 1
+
+
+def random_cells(size: tuple[int, int], seed: int) -> list[tuple[int, int]]:
+    """Pick the living cells of a random starting pattern
+    """
+    rng = random.Random(seed)
+    width, height = size
+    return [(x, y) for y in range(height) for x in range(width) if rng.random() < 0.35]
+
+
+def run_engine(engine: str, size: tuple[int, int], wrap: bool, rule: str,
+               cells: list[tuple[int, int]], border: int=0) -> list:
+    """Step a pattern and record the cells, changes, population and bounding box of every generation.
+    The grid is enlarged by border dead cells on every side.
+    """
+    game = gol.GameOfLife()
+    settings = gol.default_settings()
+    width, height = size
+    settings.update(engine=engine, resolution=(width + 2 * border, height + 2 * border),
+                    wrap=wrap, ruleset=rule, randomthreshold=0.0)
+    game.init(settings)
+    for x, y in cells:
+        game.set_cell((x + border, y + border), True)
+    coords = [(x, y) for y in range(height + 2 * border) for x in range(width + 2 * border)]
+    history = [[game.get_cell(coord) for coord in coords]]
+    for _ in range(GENERATIONS):
+        game.advance_grid()
+        history.append(([game.get_cell(coord) for coord in coords],
+                        [game.get_cell_changed(coord) for coord in coords],
+                        game.count_alive(), game.get_bounding_box()))
+    game.close()
+    return history
+
+
+class EngineEquivalenceTest(unittest.TestCase):
+    def check_engine(self, engine: str, unbounded: bool=False):
+        """Compare an engine against the python engine on all rules and sizes.
+        Unbounded engines are compared against a python grid with a wide dead border.
+        """
+        rng = random.Random(engine)
+        border = BORDER if unbounded else 0
+        for size in SIZES:
+            for wrap in (False, True):
+                for rule in RULES:
+                    cells = random_cells(size, rng.randrange(1 << 16))
+                    with self.subTest(size=size, wrap=wrap, rule=rule):
+                        try:
+                            result = run_engine(engine, size, wrap, rule, cells, border)
+                        except SystemExit as error:
+                            self.skipTest(str(error))
+                        reference = run_engine('python', size, wrap, rule, cells, border)
+                        # Avoid assertEqual, its diff of the long histories takes minutes
+                        self.assertTrue(result == reference, 'cells differ from the python engine')
+
+    def test_active(self):
+        self.check_engine('active')
+
+    def test_numpy(self):
+        self.check_engine('numpy')
+
+    def test_bitpacked(self):
+        self.check_engine('bitpacked')
+
+    def test_tiled(self):
+        self.check_engine('tiled')
+
+    def test_chunked(self):
+        self.check_engine('chunked')
+
+    def test_hashlife(self):
+        self.check_engine('hashlife', unbounded=True)
+
+    def test_sparse(self):
+        self.check_engine('sparse', unbounded=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
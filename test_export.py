@@ -0,0 +1,207 @@
+import os
+import zlib
+import random
+import struct
+import tempfile
+import unittest
+
+import gol
+
+
+SIZE = (23, 11)
+SCALE = 2
+GENERATIONS = 6
+EXPORT_EVERY = 2
+
+
+def read_png(data: bytes) -> list[list[int]]:
+    """Decode a 1 bit grayscale PNG image into rows of pixels, checking every chunk
+    """
+    assert data[:8] == gol.ImageEncoder.PNG_SIGNATURE
+    position = 8
+    compressed = b''
+    while position < len(data):
+        length, tag = struct.unpack('>I4s', data[position:position + 8])
+        chunk = data[position + 8:position + 8 + length]
+        assert struct.unpack('>I', data[position + 8 + length:position + 12 + length])[0] == zlib.crc32(tag + chunk)
+        if tag == b'IHDR':
+            width, height, bitDepth, colorType = struct.unpack('>IIBB', chunk[:10])
+            assert (bitDepth, colorType) == (1, 0)
+        elif tag == b'IDAT':
+            compressed += chunk
+        position += 12 + length
+    data = zlib.decompress(compressed)
+    lineLength = (width + 7) // 8 + 1
+    lines = [data[y * lineLength:(y + 1) * lineLength] for y in range(0, height)]
+    assert all(line[0] == 0 for line in lines)
+    return [[line[1 + x // 8] >> (7 - x % 8) & 1 for x in range(0, width)] for line in lines]
+
+
+def decode_lzw(data: bytes, minCodeSize: int) -> bytes:
+    """Decompress the variable code size LZW of GIF images
+    """
+    clearCode = 1 << minCodeSize
+    endCode = clearCode + 1
+    output = bytearray()
+    bitBuffer = int.from_bytes(data, 'little')
+    position = 0
+    table = None
+    previous = None
+    codeSize = minCodeSize + 1
+    while True:
+        code = bitBuffer >> position & ((1 << codeSize) - 1)
+        position += codeSize
+        if code == clearCode:
+            table = [bytes([value]) for value in range(0, clearCode)] + [b'', b'']
+            codeSize = minCodeSize + 1
+            previous = None
+            continue
+        if code == endCode:
+            return bytes(output)
+        if previous is None:
+            entry = table[code]
+        else:
+            entry = table[code] if code < len(table) else previous + previous[:1]
+            if len(table) < gol.ImageEncoder.GIF_MAX_CODES:
+                table.append(previous + entry[:1])
+        if len(table) == 1 << codeSize and codeSize < 12:
+            codeSize += 1
+        output += entry
+        previous = entry
+
+
+def read_gif(data: bytes) -> tuple[int, int, list[bytes]]:
+    """Decode an animated GIF into its size and the color indices of every frame
+    """
+    assert data[:6] == b'GIF89a'
+    width, height, flags = struct.unpack('<HHB', data[6:11])
+    # Skip the global color table
+    position = 13 + 3 * (2 << (flags & 7)) if flags & 0x80 else 13
+    frames = []
+
+    def read_blocks(position: int) -> tuple[bytes, int]:
+        blocks = b''
+        while data[position]:
+            blocks += data[position + 1:position + 1 + data[position]]
+            position += 1 + data[position]
+        return blocks, position + 1
+
+    while data[position] != 0x3b:
+        if data[position] == 0x21:
+            _, position = read_blocks(position + 2)
+        else:
+            assert data[position] == 0x2c
+            frameWidth, frameHeight = struct.unpack('<HH', data[position + 5:position + 9])
+            assert (frameWidth, frameHeight) == (width, height)
+            minCodeSize = data[position + 10]
+            blocks, position = read_blocks(position + 11)
+            frames.append(decode_lzw(blocks, minCodeSize))
+    return width, height, frames
+
+
+def scale_rows(cells: list[list[bool]], scale: int) -> list[list[int]]:
+    """Turn every cell into scale x scale pixels
+    """
+    return [[int(cell) for cell in row for _ in range(0, scale)] for row in cells for _ in range(0, scale)]
+
+
+class ImageEncoderTest(unittest.TestCase):
+    def test_png(self):
+        rng = random.Random(1)
+        for width in (1, 7, 8, 9, 30):
+            for scale in (1, 3):
+                with self.subTest(width=width, scale=scale):
+                    cells = [[rng.random() < 0.5 for _ in range(0, width)] for _ in range(0, 5)]
+                    rows = [gol.Pattern.from_strings([''.join('o' if cell else '.' for cell in row)]).rows[0]
+                            .to_bytes((width + 7) // 8, 'little') for row in cells]
+                    png = gol.ImageEncoder(scale).encode_png(rows, width)
+                    self.assertEqual(read_png(png), scale_rows(cells, scale))
+
+    def test_lzw_round_trip(self):
+        rng = random.Random(2)
+        # Long and random enough to fill the code table several times
+        for pixels in (b'', b'\x01', b'\x00' * 5000, bytes(rng.random() < 0.3 for _ in range(0, 40000)),
+                       bytes(rng.randrange(4) for _ in range(0, 20000))):
+            with self.subTest(length=len(pixels)):
+                data = gol.ImageEncoder.encode_lzw(pixels, gol.ImageEncoder.GIF_MIN_CODE_SIZE)
+                self.assertEqual(decode_lzw(data, gol.ImageEncoder.GIF_MIN_CODE_SIZE), pixels)
+
+    def test_gif_size_limit(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(ValueError):
+                gol.GifWriter(os.path.join(directory, 'big.gif'), 40000, 2, 4, gol.ImageEncoder(2))
+            with self.assertRaises(SystemExit):
+                gol.Exporter(directory, ['gif'], imageWidth=70000, imageHeight=2)
+            # Other formats have no such limit
+            gol.Exporter(directory, ['png'], imageWidth=70000, imageHeight=2)
+
+
+class ExporterTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def new_game(self, export: str='') -> gol.GameOfLife:
+        game = gol.GameOfLife()
+        settings = gol.default_settings()
+        settings.update(engine='bitpacked', resolution=SIZE, randomseed=4, randomthreshold=0.4,
+                        export=export, exportevery=EXPORT_EVERY, exportdir=self.directory.name, exportscale=SCALE)
+        game.init(settings)
+        game.fill_grid()
+        return game
+
+    def test_formats(self):
+        # The expected grids of the exported generations
+        reference = self.new_game()
+        width, height = SIZE
+        grids = {}
+        for generation in range(0, GENERATIONS + 1):
+            if generation % EXPORT_EVERY == 0:
+                grids[generation] = [[reference.get_cell((x, y)) for x in range(0, width)] for y in range(0, height)]
+            reference.advance_grid()
+        reference.close()
+
+        game = self.new_game('png,gif,rle,cells')
+        for _ in range(0, GENERATIONS):
+            game.advance_grid()
+        game.close()
+
+        for generation, cells in grids.items():
+            with self.subTest(generation=generation):
+                basename = os.path.join(self.directory.name, 'generation-{:08d}'.format(generation))
+                with open(basename + '.png', 'rb') as dataFile:
+                    self.assertEqual(read_png(dataFile.read()), scale_rows(cells, SCALE))
+                alive = {(x, y) for y, row in enumerate(cells) for x, cell in enumerate(row) if cell}
+                for extension in ('.rle', '.cells'):
+                    pattern = gol.Pattern.load(basename + extension)
+                    self.assertEqual((pattern.width, pattern.height), SIZE)
+                    self.assertEqual(set(pattern.get_cells()), alive)
+                self.assertEqual(gol.Pattern.load(basename + '.rle').offset, (-(width // 2), -(height // 2)))
+
+        with open(os.path.join(self.directory.name, gol.Exporter.GIF_FILENAME), 'rb') as dataFile:
+            gifWidth, gifHeight, frames = read_gif(dataFile.read())
+        self.assertEqual((gifWidth, gifHeight), (width * SCALE, height * SCALE))
+        self.assertEqual([list(frame) for frame in frames],
+                         [sum(scale_rows(cells, SCALE), []) for _, cells in sorted(grids.items())])
+
+    def test_writer_error(self):
+        # A failing writer must not block the simulation
+        exporter = gol.Exporter(self.directory.name, ['png'])
+
+        def write_frame(frame: dict):
+            raise struct.error('broken')
+
+        exporter.write_frame = write_frame
+        exporter.start()
+        for generation in range(0, gol.Exporter.QUEUE_SIZE * 4):
+            exporter.submit({'generation': generation})
+        with self.assertRaises(SystemExit):
+            exporter.close()
+        self.assertIsInstance(exporter.error, struct.error)
+        self.assertEqual(exporter.framesWritten, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import random
+import tempfile
+import unittest
+
+import gol
+
+
+ENGINES = ['python', 'active', 'numpy', 'bitpacked', 'tiled', 'chunked', 'hashlife', 'sparse']
+GLIDER = 'x = 3, y = 3\nbo$2bo$3o!\n'
+
+
+def fill(engine: str='python', size: tuple[int, int]=(37, 21), **settings) -> list[list[bool]]:
+    """Fill a grid with the given settings and get its cells
+    """
+    game = gol.GameOfLife()
+    gameSettings = gol.default_settings()
+    gameSettings.update(engine=engine, resolution=size, **settings)
+    game.init(gameSettings)
+    game.fill_grid()
+    width, height = size
+    cells = [[game.get_cell((x, y)) for x in range(0, width)] for y in range(0, height)]
+    game.close()
+    return cells
+
+
+class FillTest(unittest.TestCase):
+    def test_random_seed(self):
+        grid = fill(randomseed=3, randomthreshold=0.3)
+        self.assertEqual(fill(randomseed=3, randomthreshold=0.3), grid)
+        self.assertNotEqual(fill(randomseed=4, randomthreshold=0.3), grid)
+        # The rows only depend on the seed, the threshold and the grid width
+        self.assertEqual(fill(size=(37, 40), randomseed=3, randomthreshold=0.3)[:21], grid)
+
+    def test_random_engines(self):
+        grid = fill(randomseed=5, randomthreshold=0.4)
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                try:
+                    self.assertEqual(fill(engine, randomseed=5, randomthreshold=0.4), grid)
+                except SystemExit as error:
+                    self.skipTest(str(error))
+
+    def test_random_threshold(self):
+        self.assertFalse(any(any(row) for row in fill(randomthreshold=0.0)))
+        self.assertTrue(all(all(row) for row in fill(randomthreshold=1.0)))
+        alive = sum(sum(row) for row in fill(size=(200, 200), randomseed=1, randomthreshold=0.3))
+        self.assertAlmostEqual(alive / 40000, 0.3, delta=0.02)
+
+    def test_random_row_bits(self):
+        # Thresholds with few set bits only need few random words
+        generator = random.Random(9)
+        self.assertEqual(gol.GameOfLife.random_row_bits(generator, 64, 0.5), random.Random(9).getrandbits(64))
+        self.assertEqual(gol.GameOfLife.random_row_bits(generator, 10, 0.0), 0)
+        self.assertEqual(gol.GameOfLife.random_row_bits(generator, 10, 1.0), 0b1111111111)
+
+    def test_checkerboard(self):
+        grid = fill(initmethod='checkerboard')
+        self.assertTrue(all(cell == ((37 * y + x) % 2 == 0) for y, row in enumerate(grid) for x, cell in enumerate(row)))
+
+    def test_blocks(self):
+        grid = fill(initmethod='blocks', blocksize=4)
+        self.assertTrue(all(cell == ((x // 4 + y // 4) % 2 == 0) for y, row in enumerate(grid) for x, cell in enumerate(row)))
+
+    def test_shape(self):
+        grid = fill(initmethod='shape', fillshape='r-pentomino')
+        alive = {(x, y) for y, row in enumerate(grid) for x, cell in enumerate(row) if cell}
+        self.assertEqual(alive, {(18 + dx, 10 + dy) for dx, dy in gol.GameOfLife.SHAPE_CELLS['r-pentomino']})
+
+    def test_repeat(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'glider.rle')
+            with open(filename, 'w') as dataFile:
+                dataFile.write(GLIDER)
+            grid = fill(size=(20, 9), initmethod='repeat', shapefile=filename, repeatgap=2)
+            # Copies every 5 cells, the fifth one does not fit
+            glider = {(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)}
+            expected = {(x + 5 * i, y + 5 * j) for x, y in glider for i in range(0, 4) for j in range(0, 2)}
+            self.assertEqual({(x, y) for y, row in enumerate(grid) for x, cell in enumerate(row) if cell}, expected)
+            with open(filename, 'w') as dataFile:
+                dataFile.write('x = 0, y = 0\n!')
+            with self.assertRaises(SystemExit):
+                fill(initmethod='repeat', shapefile=filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import io
+import unittest
+
+import gol
+
+
+ENGINES = ['python', 'active', 'numpy', 'bitpacked', 'tiled', 'chunked', 'hashlife', 'sparse']
+SIZE = (29, 13)
+# An asymmetric pattern with defined dead cells and an undefined corner
+SHAPE = ['oo.', 'o..', '.o.', ' oo']
+
+
+def stamp_reference(grid: dict, pattern: gol.Pattern, positions, wrap: bool, drawDead: bool):
+    """Stamp the defined cells of a pattern cell by cell, later copies overwrite earlier ones
+    """
+    width, height = SIZE
+    for x, y in positions:
+        for dx, dy, alive in pattern.get_defined_cells():
+            if not alive and not drawDead:
+                continue
+            cellX, cellY = x + dx, y + dy
+            if wrap:
+                cellX, cellY = cellX % width, cellY % height
+            elif not (0 <= cellX < width and 0 <= cellY < height):
+                continue
+            grid[cellX, cellY] = alive
+
+
+class PatternTest(unittest.TestCase):
+    def test_read_rle(self):
+        pattern = gol.Pattern.read_rle(io.StringIO('#P 1 2\nx = 3, y = 2\nobo$2A!'))
+        self.assertEqual((pattern.width, pattern.height, pattern.offset), (3, 2, (1, 2)))
+        self.assertEqual(pattern.rows, [0b101, 0b011])
+        self.assertEqual(pattern.definedRows, [0b111, 0b011])
+
+    def test_read_rle_max_cells(self):
+        with self.assertRaises(gol.RleError):
+            gol.Pattern.read_rle(io.StringIO('x = 10, y = 10\no!'), maxCells=99)
+        # Runs beyond the declared size count as well
+        with self.assertRaises(gol.RleError):
+            gol.Pattern.read_rle(io.StringIO('x = 1, y = 1\n200o!'), maxCells=99)
+        self.assertEqual(gol.Pattern.read_rle(io.StringIO('x = 9, y = 11\no!'), maxCells=99).height, 11)
+
+    def test_from_strings(self):
+        pattern = gol.Pattern.from_strings(SHAPE)
+        self.assertEqual((pattern.width, pattern.height), (3, 4))
+        self.assertEqual(pattern.get_cells(), [(0, 0), (1, 0), (0, 1), (1, 2), (1, 3), (2, 3)])
+        self.assertEqual(pattern.definedRows, [0b111, 0b111, 0b111, 0b110])
+
+    def test_transform(self):
+        pattern = gol.Pattern.from_strings(SHAPE)
+        rotated = pattern.transform(1)
+        self.assertEqual((rotated.width, rotated.height), (4, 3))
+        # Clockwise, the bottom row becomes the left column
+        self.assertEqual(rotated.rows, [0b1100, 0b1011, 0b0001])
+        self.assertEqual(rotated.definedRows, [0b1110, 0b1111, 0b1111])
+        self.assertEqual(pattern.transform(flip=True).rows, [0b110, 0b100, 0b010, 0b011])
+        self.assertEqual(pattern.transform(2).rows, [0b011, 0b010, 0b100, 0b110])
+        self.assertIs(pattern.transform(4), pattern)
+        self.assertIs(pattern.transform(1), rotated)
+        for rotation in range(0, 4):
+            for flip in (False, True):
+                with self.subTest(rotation=rotation, flip=flip):
+                    result = pattern.transform(rotation, flip)
+                    # Turning the rest of the way back gives the (mirrored) pattern again
+                    back = gol.Pattern(result.width, result.height, result.rows, result.definedRows).transform(4 - rotation)
+                    self.assertEqual(back.rows, pattern.transform(flip=flip).rows)
+                    self.assertEqual(back.definedRows, pattern.transform(flip=flip).definedRows)
+
+    def test_stamp_pattern(self):
+        pattern = gol.Pattern.from_strings(SHAPE)
+        # Overlapping copies, and copies across every edge of the grid
+        positions = [(3, 2), (4, 3), (-1, 5), (27, -2), (12, 11), (26, 10)]
+        for engine in ENGINES:
+            for wrap in (False, True):
+                for drawDead in (False, True):
+                    for rotation, flip in ((0, False), (1, True), (3, False)):
+                        with self.subTest(engine=engine, wrap=wrap, drawDead=drawDead, rotation=rotation, flip=flip):
+                            self.check_stamp(engine, wrap, pattern, positions, rotation, flip, drawDead)
+
+    def check_stamp(self, engine: str, wrap: bool, pattern: gol.Pattern, positions, rotation: int, flip: bool,
+                    drawDead: bool):
+        game = gol.GameOfLife()
+        settings = gol.default_settings()
+        settings.update(engine=engine, resolution=SIZE, wrap=wrap, randomseed=2, randomthreshold=0.5)
+        try:
+            game.init(settings)
+        except SystemExit as error:
+            self.skipTest(str(error))
+        game.fill_grid()
+        width, height = SIZE
+        grid = {(x, y): game.get_cell((x, y)) for y in range(0, height) for x in range(0, width)}
+        game.stamp_pattern(pattern, positions, rotation, flip, drawDead)
+        stamp_reference(grid, pattern.transform(rotation, flip), positions, wrap, drawDead)
+        result = {(x, y): game.get_cell((x, y)) for y in range(0, height) for x in range(0, width)}
+        game.close()
+        self.assertEqual(result, grid)
+
+
+if __name__ == '__main__':
+    unittest.main()
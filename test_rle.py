@@ -0,0 +1,71 @@
+import io
+import unittest
+
+import gol
+
+
+def read(text: str) -> tuple[gol.RleReader, list[tuple[int, int, int, int]]]:
+    """Read a pattern from a string, return the reader and all of its runs
+    """
+    reader = gol.RleReader(io.StringIO(text))
+    return reader, list(reader.runs())
+
+
+class RleReaderTest(unittest.TestCase):
+    def test_header_and_comments(self):
+        reader, runs = read('#N Glider\n#O Richard K. Guy\n#C A small ship\n#C Period 4\n'
+                            'x = 3, y = 3, rule = B3/S23\nbob$2bo$3o!\n')
+        self.assertEqual(reader.name, 'Glider')
+        self.assertEqual(reader.author, 'Richard K. Guy')
+        self.assertEqual(reader.comments, ['A small ship', 'Period 4'])
+        self.assertEqual((reader.width, reader.height, reader.rule), (3, 3, 'B3/S23'))
+        self.assertIsNone(reader.offset)
+        self.assertEqual(runs, [(0, 0, 1, 0), (1, 0, 1, 1), (2, 0, 1, 0), (0, 1, 2, 0), (2, 1, 1, 1),
+                                (0, 2, 3, 1)])
+
+    def test_offsets(self):
+        self.assertEqual(read('#P -3 4\nx = 1, y = 1\no!')[0].offset, (-3, 4))
+        self.assertEqual(read('#R 5 -6\nx = 1, y = 1\no!')[0].offset, (5, -6))
+
+    def test_invalid_offset(self):
+        with self.assertRaises(gol.RleError) as context:
+            read('#N Test\n#P a b\nx = 1, y = 1\no!')
+        self.assertEqual(context.exception.lineNumber, 2)
+        self.assertIn('Line 2', str(context.exception))
+
+    def test_invalid_size(self):
+        with self.assertRaises(gol.RleError) as context:
+            read('x = 3, y = -1\no!')
+        self.assertEqual(context.exception.lineNumber, 1)
+        with self.assertRaises(gol.RleError):
+            read('x = three, y = 1\no!')
+
+    def test_blank_rows(self):
+        # A run count before $ skips rows
+        self.assertEqual(read('x = 2, y = 4\no3$bo!')[1], [(0, 0, 1, 1), (0, 3, 1, 0), (1, 3, 1, 1)])
+
+    def test_multi_state_tokens(self):
+        _, runs = read('x = 6, y = 1, rule = B2/S/C3\n.A2BpAxX!')
+        self.assertEqual([(x, length, state) for x, _, length, state in runs],
+                         [(0, 1, 0), (1, 1, 1), (2, 2, 2), (4, 1, 25), (5, 1, 240)])
+
+    def test_run_count_across_lines(self):
+        # The run count 12 is split over two lines
+        self.assertEqual(read('x = 12, y = 1\n1\n2o!')[1], [(0, 0, 12, 1)])
+
+    def test_comments_between_data_lines(self):
+        self.assertEqual(read('x = 3, y = 2\n3o$\n#C Middle\n3o!')[1], [(0, 0, 3, 1), (0, 1, 3, 1)])
+
+    def test_data_after_end(self):
+        self.assertEqual(read('x = 1, y = 1\no!\nooo\n')[1], [(0, 0, 1, 1)])
+
+    def test_truncated_file(self):
+        # Runs up to the end of the file are kept, a trailing run count is dropped
+        self.assertEqual(read('x = 5, y = 2\n2o$b')[1], [(0, 0, 2, 1), (0, 1, 1, 0)])
+        self.assertEqual(read('x = 5, y = 2\n2o$3')[1], [(0, 0, 2, 1)])
+        reader, runs = read('#N Empty\nx = 5, y = 2\n')
+        self.assertEqual((reader.name, runs), ('Empty', []))
+
+
+if __name__ == '__main__':
+    unittest.main()
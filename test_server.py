@@ -0,0 +1,138 @@
+import os
+import json
+import socket
+import asyncio
+import tempfile
+import threading
+import unittest
+
+import gol
+import server
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix sockets are not available')
+class ServerTest(unittest.TestCase):
+    MAX_SESSIONS = 4
+    MAX_GENERATIONS = 1000
+
+    @classmethod
+    def setUpClass(cls):
+        """Run the server in a background thread, on a Unix socket in a temporary folder
+        """
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.socketPath = os.path.join(cls.directory.name, 'gol.sock')
+        options, _ = server.setup_options().parse_args([
+            '--unix-socket', cls.socketPath, '--workers', '2', '--max-sessions', str(cls.MAX_SESSIONS),
+            '--max-cells', '100000', '--max-generations', str(cls.MAX_GENERATIONS)])
+        cls.loop = asyncio.new_event_loop()
+        cls.task = cls.loop.create_task(server.serve(options))
+        cls.thread = threading.Thread(target=cls.loop.run_until_complete, args=(cls.task,))
+        cls.thread.start()
+        while not os.path.exists(cls.socketPath):
+            cls.thread.join(0.01)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.loop.call_soon_threadsafe(cls.task.cancel)
+        cls.thread.join()
+        cls.loop.close()
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.client = server.ServerClient(unixSocket=self.socketPath, timeout=30)
+
+    def tearDown(self):
+        for info in self.client.call('sessions'):
+            self.client.call('close', session=info['session'])
+        self.client.close()
+
+    def assertRpcError(self, code: int, method: str, **params):
+        with self.assertRaises(server.RpcError) as context:
+            self.client.call(method, **params)
+        self.assertEqual(context.exception.code, code)
+        return context.exception
+
+    def create(self, **settings) -> int:
+        settings.setdefault('resolution', [40, 30])
+        settings.setdefault('randomseed', 7)
+        return self.client.call('create', settings=settings)['session']
+
+    def local_game(self, **settings) -> gol.GameOfLife:
+        """Create the game a session with the same settings holds
+        """
+        game = gol.GameOfLife()
+        gameSettings = gol.default_settings()
+        gameSettings.update(engine=server.DEFAULT_ENGINE, resolution=(40, 30), randomseed=7, **settings)
+        game.init(gameSettings)
+        game.fill_grid()
+        return game
+
+    def test_sessions(self):
+        session = self.create(ruleset='B36/S23', wrap=True)
+        info = self.client.call('info', session=session)
+        self.assertEqual((info['width'], info['height'], info['wrap'], info['engine'], info['generation']),
+                         (40, 30, True, server.DEFAULT_ENGINE, 0))
+        self.assertEqual([info['session'] for info in self.client.call('sessions')], [session])
+        self.assertTrue(self.client.call('close', session=session))
+        self.assertRpcError(server.SESSION_NOT_FOUND, 'info', session=session)
+
+    def test_step_matches_local_game(self):
+        session = self.create()
+        game = self.local_game()
+        game.run_headless(25)
+        result = self.client.call('step', session=session, generations=25)
+        self.assertEqual((result['generation'], result['population']), (25, game.count_alive()))
+        rows = server.ServerClient.decode_cells(self.client.call('cells', session=session))
+        self.assertEqual(rows, [game.engine.get_packed_row(y) for y in range(0, 30)])
+        game.close()
+
+    def test_cell_diffs(self):
+        session = self.create()
+        first = self.client.call('cells', session=session, area=[5, 5, 20, 10])
+        baseRows = server.ServerClient.decode_cells(first)
+        self.client.call('step', session=session, generations=3)
+        diff = self.client.call('cells', session=session, area=[5, 5, 20, 10], base=first['generation'])
+        full = self.client.call('cells', session=session, area=[5, 5, 20, 10])
+        self.assertEqual(diff['base'], 0)
+        self.assertEqual(server.ServerClient.decode_cells(diff, baseRows), server.ServerClient.decode_cells(full))
+        self.assertRpcError(server.SNAPSHOT_NOT_FOUND, 'cells', session=session, base=1)
+        self.assertRpcError(server.INVALID_PARAMS, 'cells', session=session, base=[1])
+        self.assertRpcError(server.INVALID_PARAMS, 'cells', session=session, area=[30, 0, 20, 10])
+
+    def test_load(self):
+        glider = 'x = 3, y = 3\nbo$2bo$3o!'
+        empty = self.client.call('create', settings={'resolution': [40, 30]}, fill=False)['session']
+        result = self.client.call('load', session=empty, pattern=glider, positions=[[0, 0], [10, 0], [20, 5]])
+        self.assertEqual(result['population'], 15)
+        cells = self.client.call('cells', session=empty, area=[0, 0, 3, 3], format='rle')
+        self.assertIn('bo$2bo$3o!', cells['data'])
+        error = self.assertRpcError(server.INVALID_PARAMS, 'load', session=empty, pattern='#P a b\n' + glider)
+        self.assertIn('Line 1', error.message)
+        self.assertRpcError(server.INVALID_PARAMS, 'load', session=empty, pattern='x = 1, y = 1\n999999999o!')
+        self.assertRpcError(server.INVALID_PARAMS, 'load', session=empty, pattern=glider,
+                            positions=[[0, 0]] * (server.MAX_POSITIONS + 1))
+
+    def test_invalid_requests(self):
+        self.assertRpcError(server.METHOD_NOT_FOUND, 'nope')
+        for settings in ({'tilesize': 'x', 'engine': 'tiled'}, {'initmethod': 'nope'}, {'jump': 'abc'},
+                         {'resolution': [-8, -8]}, {'shapefile': 'secret.rle'}, {'resolution': [1000, 1000]}):
+            self.assertRpcError(server.INVALID_PARAMS, 'create', settings=settings)
+        self.assertRpcError(server.SIMULATION_ERROR, 'create', settings={'ruleset': 'B9/S'})
+        session = self.create()
+        self.assertRpcError(server.INVALID_PARAMS, 'step', session=session, generations=self.MAX_GENERATIONS + 1)
+        self.assertRpcError(server.INVALID_PARAMS, 'step', session=session, generations=0)
+
+    def test_concurrent_creates_respect_limit(self):
+        # A batch runs its requests concurrently
+        batch = [{'jsonrpc': '2.0', 'method': 'create', 'params': {'settings': {'resolution': [200, 200]}}, 'id': i}
+                 for i in range(0, self.MAX_SESSIONS + 3)]
+        connection = server.UnixHTTPConnection(self.socketPath, timeout=30)
+        connection.request('POST', '/', json.dumps(batch), {'Content-Type': 'application/json'})
+        responses = json.loads(connection.getresponse().read())
+        connection.close()
+        self.assertEqual(sum(1 for response in responses if 'result' in response), self.MAX_SESSIONS)
+        self.assertEqual(len(self.client.call('sessions')), self.MAX_SESSIONS)
+
+
+if __name__ == '__main__':
+    unittest.main()